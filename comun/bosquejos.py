@@ -0,0 +1,78 @@
+import heapq
+import math
+from collections import Counter
+
+import numpy as np
+
+class HyperLogLog:
+    """
+    Conteo aproximado de valores distintos en memoria fija: 2**precision
+    registros de un byte (16 KB con la precisión por defecto, error típico
+    de ~0.8%).
+
+    Usa `hash()` de Python, así que el resultado puede variar un poco entre
+    ejecuciones (fijar PYTHONHASHSEED si se necesita repetible).
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registros = np.zeros(1 << precision, dtype=np.uint8)
+
+    def agregar(self, valores):
+        """Agrega un lote de valores (hashables) de una vez."""
+        hashes = np.fromiter((hash(v) for v in valores), dtype=np.int64).view(np.uint64)
+        if not len(hashes):
+            return
+        bits = 64 - self.precision
+        indices = (hashes >> np.uint64(bits)).astype(np.intp)
+        resto = hashes & np.uint64((1 << bits) - 1)
+        # Posición del primer 1 en los `bits` bits restantes (bits + 1 si son todos cero)
+        _, exponente = np.frexp(resto.astype(np.float64))
+        rango = np.where(resto > 0, bits - exponente + 1, bits + 1).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rango)
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimado = alfa * m * m / np.sum(np.ldexp(1.0, -self.registros.astype(np.int32)))
+        ceros = int(np.count_nonzero(self.registros == 0))
+        if estimado <= 2.5 * m and ceros:
+            estimado = m * math.log(m / ceros)   # Corrección para pocos valores (linear counting)
+        return int(round(estimado))
+
+class Frecuentes:
+    """
+    Valores más frecuentes aproximados (resumen de Misra-Gries) con como
+    mucho `capacidad` contadores. Cada lote se cuenta con Counter y, si se
+    pasa de la capacidad, se resta a todos el contador número capacidad+1
+    y se descartan los que quedan en cero.
+
+    Los conteos reportados se quedan cortos por a lo sumo `error`; todo
+    valor que aparezca más de total / (capacidad + 1) veces está en el resumen.
+    """
+
+    def __init__(self, capacidad=1000):
+        self.capacidad = capacidad
+        self.contadores = Counter()
+        self.total = 0
+        self.error = 0
+
+    def agregar(self, valores, conteos=None):
+        """
+        Agrega un lote de valores (lista o arreglo) de una vez; con `conteos`,
+        cada valor distinto del lote junto con las veces que aparece.
+        """
+        if conteos is None:
+            self.contadores.update(valores)
+            self.total += len(valores)
+        else:
+            self.contadores.update(dict(zip(valores, conteos.tolist())))
+            self.total += int(conteos.sum())
+        if len(self.contadores) > self.capacidad:
+            umbral = heapq.nlargest(self.capacidad + 1, self.contadores.values())[-1]
+            self.contadores = Counter({v: c - umbral for v, c in self.contadores.items() if c > umbral})
+            self.error += umbral
+
+    def top(self, k=10):
+        """[(valor, conteo mínimo)] de los k más frecuentes."""
+        return self.contadores.most_common(k)
@@ -0,0 +1,100 @@
+import csv
+import itertools
+import json
+import os
+from collections import Counter
+
+BUFFER_CUARENTENA = 256 * 1024
+CAMPOS = ("origen", "fila", "paso", "motivo", "datos")
+# json.dumps con opciones arma un encoder por llamada; este se reutiliza en cada fila
+_JSON_COMPACTO = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+class Cuarentena:
+    """
+    Registro de filas rechazadas compartido por todos los pasos: una línea por
+    fila con el archivo de origen, el número de fila, el paso, un código de
+    motivo corto y la fila misma en JSON compacto.
+
+    El archivo se abre para agregar al final, con buffer propio, y cada paso
+    escribe sus rechazos apenas los encuentra: en memoria solo quedan los
+    conteos por paso y motivo, de donde salen las tasas de rechazo (`metricas`).
+    Con `reiniciar` se empieza un archivo nuevo en vez de agregar.
+    """
+
+    def __init__(self, ruta, reiniciar=False, buffer=BUFFER_CUARENTENA):
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        nuevo = reiniciar or not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        self.ruta = ruta
+        self.archivo = open(ruta, "w" if reiniciar else "a", newline="", encoding="utf-8", buffering=buffer)
+        self.escritor = csv.writer(self.archivo, delimiter=";")
+        if nuevo:
+            self.escritor.writerow(CAMPOS)
+        self.evaluadas = Counter()     # (origen, paso) -> filas que revisó el paso
+        self.rechazadas = Counter()    # (origen, paso, motivo) -> filas rechazadas
+
+    def rechazar(self, origen, paso, filas, motivos, datos, evaluadas=0):
+        """
+        Registra los rechazos de un lote de `paso`: `filas` (números de fila),
+        `motivos` (un código por fila, o uno solo para todas) y `datos` (un dict
+        por fila). `evaluadas` son las filas que el paso revisó en este lote,
+        rechazadas o no; con ellas se calculan las tasas.
+        """
+        datos = list(map(_JSON_COMPACTO.encode, datos))
+        self._escribir(origen, paso, list(filas), motivos, datos, evaluadas)
+
+    def rechazar_df(self, origen, paso, rechazadas, motivos, evaluadas=0):
+        """Como `rechazar`, para las filas rechazadas en un DataFrame; el índice es el número de fila."""
+        datos = []
+        if len(rechazadas):
+            datos = rechazadas.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n").split("\n")
+        self._escribir(origen, paso, rechazadas.index.tolist(), motivos, datos, evaluadas)
+
+    def _escribir(self, origen, paso, filas, motivos, datos, evaluadas):
+        motivos = [motivos] * len(filas) if isinstance(motivos, str) else list(motivos)
+        self.evaluadas[(origen, paso)] += evaluadas
+        self.rechazadas.update(zip(itertools.repeat(origen), itertools.repeat(paso), motivos))
+        self.escritor.writerows(zip(itertools.repeat(origen), filas, itertools.repeat(paso), motivos, datos))
+
+    def metricas(self):
+        """Por origen y paso: filas evaluadas, rechazadas, tasa de rechazo y rechazos por motivo."""
+        por_paso = {}
+
+        def entrada(origen, paso):
+            return por_paso.setdefault((origen, paso), {"origen": origen, "paso": paso, "evaluadas": 0,
+                                                         "rechazadas": 0, "tasa": None, "motivos": {}})
+
+        for (origen, paso), evaluadas in self.evaluadas.items():
+            entrada(origen, paso)["evaluadas"] = evaluadas
+        for (origen, paso, motivo), cantidad in self.rechazadas.most_common():
+            metrica = entrada(origen, paso)
+            metrica["rechazadas"] += cantidad
+            metrica["motivos"][motivo] = cantidad
+        for metrica in por_paso.values():
+            if metrica["evaluadas"]:
+                metrica["tasa"] = round(metrica["rechazadas"] / metrica["evaluadas"], 6)
+        return list(por_paso.values())
+
+    def cerrar(self):
+        """Vacía el buffer y cierra; deja las métricas en <ruta>_metricas.json y las devuelve."""
+        self.archivo.close()
+        metricas = self.metricas()
+        with open(os.path.splitext(self.ruta)[0] + "_metricas.json", "w", encoding="utf-8") as f:
+            json.dump(metricas, f, ensure_ascii=False, indent=2)
+        return metricas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        if not self.archivo.closed:
+            self.cerrar()
+
+def lineas_metricas(metricas, motivos_por_paso=3):
+    """Líneas de texto para imprimir un resumen de `Cuarentena.metricas()`."""
+    lineas = []
+    for m in metricas:
+        tasa = f"{m['tasa']:.2%}" if m["tasa"] is not None else "-"
+        motivos = ", ".join(f"{motivo} {n}" for motivo, n in list(m["motivos"].items())[:motivos_por_paso])
+        lineas.append(f"{m['origen']} · {m['paso']}: {m['rechazadas']} de {m['evaluadas']} ({tasa})"
+                      + (f" — {motivos}" if motivos else ""))
+    return lineas
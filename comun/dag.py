@@ -0,0 +1,154 @@
+import glob
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Textos que pd.read_csv convierte en NaN por defecto (keep_default_na=True)
+VALORES_NULOS_CSV = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+def como_releido(df, encoding="utf-8"):
+    """
+    Devuelve el DataFrame tal como quedaría tras `df.to_csv(ruta, index=False)`
+    (UTF-8) y `pd.read_csv(ruta, dtype=str, encoding=encoding)`: índice nuevo,
+    todo como texto, los valores nulos de read_csv como NaN y, si `encoding`
+    no es UTF-8, los bytes UTF-8 decodificados con ese encoding. Sirve para
+    pasar DataFrames en memoria entre pasos que antes se comunicaban por CSV
+    sin cambiar el resultado.
+    """
+    recodificar = encoding.lower().replace("_", "-") not in ("utf-8", "utf8")
+
+    def texto(valor):
+        valor = str(valor)
+        return valor.encode("utf-8").decode(encoding) if recodificar else valor
+
+    columnas = {}
+    for columna in df.columns:
+        serie = df[columna]
+        valores = np.full(len(serie), np.nan, dtype=object)
+        presentes = serie.notna().to_numpy()
+        valores[presentes] = [texto(v) for v in serie.to_numpy()[presentes]]
+        valores[pd.Series(valores).isin(VALORES_NULOS_CSV).to_numpy()] = np.nan
+        columnas[texto(columna)] = valores
+    return pd.DataFrame(columnas, columns=list(columnas), index=pd.RangeIndex(len(df)))
+
+def _huella_archivo(ruta):
+    estado = os.stat(ruta)
+    return f"{os.path.abspath(ruta)}|{estado.st_size}|{estado.st_mtime_ns}"
+
+class _Paso:
+    def __init__(self, nombre, funcion, dependencias, fuente, codigo, salida, adaptar, escribir):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.dependencias = list(dependencias)
+        self.fuente = fuente
+        self.codigo = codigo
+        self.salida = salida
+        self.adaptar = adaptar
+        self.escribir = escribir
+
+class DAG:
+    """
+    Ejecuta pasos de DataFrame -> DataFrame en orden de dependencias, pasando
+    los DataFrames en memoria.
+
+    La salida de cada paso se guarda en `carpeta_cache` (pickle) bajo una clave
+    que combina el código del paso con las claves de sus dependencias (o la
+    ruta, tamaño y fecha del archivo fuente). Si se edita un paso cambian su
+    clave y la de todos los que dependen de él, y solo esos se vuelven a
+    ejecutar; los demás se leen de la caché o ni se tocan.
+    """
+
+    def __init__(self, carpeta_cache):
+        self.carpeta_cache = carpeta_cache
+        self.pasos = {}
+        self._claves = {}
+
+    def agregar(self, nombre, funcion, dependencias=(), fuente=None, codigo="", salida=None,
+                adaptar=None, escribir=None):
+        """
+        `fuente` es (ruta, leer) para los pasos sin dependencias: se llama
+        `leer(ruta)`. `adaptar(df)` se aplica a cada entrada antes de
+        `funcion(*entradas)`. `salida` es el CSV que se escribe si el paso se
+        pide como objetivo (con `escribir(df, ruta)`, por defecto to_csv sin índice).
+        """
+        if nombre in self.pasos:
+            raise ValueError(f"❌ Paso repetido: {nombre}")
+        for dependencia in dependencias:
+            if dependencia not in self.pasos:
+                raise ValueError(f"❌ {nombre} depende de {dependencia}, que no está registrado antes")
+        if not dependencias and fuente is None:
+            raise ValueError(f"❌ {nombre} no tiene dependencias ni archivo fuente")
+        self.pasos[nombre] = _Paso(nombre, funcion, dependencias, fuente, codigo, salida, adaptar, escribir)
+
+    def finales(self):
+        """Pasos de los que no depende ningún otro."""
+        usados = {d for paso in self.pasos.values() for d in paso.dependencias}
+        return [nombre for nombre in self.pasos if nombre not in usados]
+
+    def clave(self, nombre):
+        if nombre not in self._claves:
+            paso = self.pasos[nombre]
+            sha256 = hashlib.sha256()
+            sha256.update(nombre.encode("utf-8"))
+            sha256.update(paso.codigo.encode("utf-8") if isinstance(paso.codigo, str) else paso.codigo)
+            if paso.fuente is not None:
+                sha256.update(_huella_archivo(paso.fuente[0]).encode("utf-8"))
+            for dependencia in paso.dependencias:
+                sha256.update(self.clave(dependencia).encode("ascii"))
+            self._claves[nombre] = sha256.hexdigest()
+        return self._claves[nombre]
+
+    def _ruta_cache(self, nombre):
+        return os.path.join(self.carpeta_cache, f"{nombre}-{self.clave(nombre)[:16]}.pkl")
+
+    def _guardar_cache(self, nombre, df):
+        os.makedirs(self.carpeta_cache, exist_ok=True)
+        ruta = self._ruta_cache(nombre)
+        for anterior in glob.glob(os.path.join(glob.escape(self.carpeta_cache), glob.escape(nombre) + "-*.pkl")):
+            if anterior != ruta:
+                os.remove(anterior)
+        temporal = ruta + ".tmp"
+        df.to_pickle(temporal)
+        os.replace(temporal, ruta)
+
+    def ejecutar(self, objetivos=None, usar_cache=True, escribir_todos=False):
+        """
+        Calcula los `objetivos` (por defecto, los pasos finales) y escribe su
+        CSV de salida; con `escribir_todos`, también el de cada paso calculado.
+        Devuelve {nombre: DataFrame} de los objetivos.
+        """
+        objetivos = list(objetivos or self.finales())
+        resultados = {}
+
+        def obtener(nombre):
+            if nombre in resultados:
+                return resultados[nombre]
+            paso = self.pasos[nombre]
+            ruta_cache = self._ruta_cache(nombre)
+            if usar_cache and os.path.exists(ruta_cache):
+                df = pd.read_pickle(ruta_cache)
+                print(f"♻️  {nombre}: desde caché ({len(df)} filas)")
+            else:
+                inicio = time.perf_counter()
+                if paso.fuente is not None:
+                    ruta, leer = paso.fuente
+                    entradas = [leer(ruta)]
+                else:
+                    entradas = [obtener(d) for d in paso.dependencias]
+                    entradas = [paso.adaptar(e) if paso.adaptar else e.copy() for e in entradas]
+                df = paso.funcion(*entradas)
+                self._guardar_cache(nombre, df)
+                print(f"▶️  {nombre}: {len(df)} filas en {time.perf_counter() - inicio:.2f} s")
+            if paso.salida and (escribir_todos or nombre in objetivos):
+                (paso.escribir or (lambda d, r: d.to_csv(r, index=False)))(df, paso.salida)
+                print(f"📄 Archivo generado: {paso.salida}")
+            resultados[nombre] = df
+            return df
+
+        return {nombre: obtener(nombre) for nombre in objetivos}
@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import json
+import os
+
+from comun.solapado import EscrituraDiferida, escribir_en
+
+# Extensión que se agrega al nombre de cada parte según la compresión
+EXTENSIONES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+class _ContadorHash:
+    """Envoltura de un archivo binario que cuenta bytes y calcula sha256 de lo que pasa por ella."""
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.bytes = 0
+        self.sha256 = hashlib.sha256()
+
+    def write(self, datos):
+        self.archivo.write(datos)
+        self.bytes += len(datos)
+        self.sha256.update(datos)
+        return len(datos)
+
+    def flush(self):
+        self.archivo.flush()
+
+    def close(self):
+        self.archivo.close()
+
+def _abrir_compresor(destino, compresion):
+    if compresion is None:
+        return destino
+    if compresion == "gzip":
+        # mtime=0 para que el mismo contenido dé siempre el mismo checksum
+        return gzip.GzipFile(filename="", mode="wb", fileobj=destino, mtime=0)
+    if compresion == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("❌ Para compresión 'zstd' instala el paquete 'zstandard'")
+        return zstandard.ZstdCompressor(level=3).stream_writer(destino, closefd=False)
+    raise ValueError(f"❌ Compresión no soportada: {compresion}")
+
+class EscritorPartes:
+    """
+    Escribe bloques de texto (p. ej. sentencias SQL completas) repartiéndolos en
+    archivos numerados. Cambia de archivo antes de que el siguiente bloque haga
+    pasar la parte de `max_bytes` (medido sin comprimir) o de `max_filas`; un
+    bloque nunca se parte entre dos archivos.
+
+    Al cerrar deja un manifest JSON con filas, bytes en disco y sha256 de cada parte.
+    El manifest también se reescribe (fsync + rename) cada vez que se completa una
+    parte, con "finalizado": false, para poder reanudar una ejecución interrumpida.
+    Cada parte se escribe como `<archivo>.parcial` y solo se renombra al completarse.
+
+    `partes_previas` son partes ya completas (de un manifest anterior) que se
+    conservan; la numeración sigue a partir de la última. `al_cerrar_parte(info)`
+    se llama con cada parte completa antes de registrarla y puede devolver un dict
+    con datos extra para esa entrada del manifest. `datos_manifest` se agrega al
+    nivel superior del manifest.
+
+    Con `diferido`, la compresión, el sha256 y la escritura en disco de cada
+    bloque corren en un hilo aparte (comun.solapado.EscrituraDiferida) mientras
+    se arma el siguiente; el texto se codifica una vez y los bytes pasan al hilo
+    sin copiarse. El cambio de parte, los callbacks y el manifest siguen en el
+    hilo que llama, después de que el hilo terminó con la parte.
+    """
+
+    def __init__(self, carpeta, patron, cabecera="", max_bytes=None, max_filas=None,
+                 compresion=None, manifest="manifest.json", al_abrir=None,
+                 partes_previas=None, al_cerrar_parte=None, datos_manifest=None, diferido=False):
+        self.carpeta = carpeta
+        self.patron = patron
+        self.cabecera = cabecera
+        self.max_bytes = max_bytes
+        self.max_filas = max_filas
+        self.compresion = compresion
+        self.ruta_manifest = os.path.join(carpeta, manifest) if manifest else None
+        self.al_abrir = al_abrir
+        self.al_cerrar_parte = al_cerrar_parte
+        self.datos_manifest = datos_manifest or {}
+        self.partes = list(partes_previas or [])
+        self.parte = max((p["parte"] for p in self.partes), default=0)
+        self._actual = None
+        self._diferida = EscrituraDiferida(escribir_en, nombre="escritura sql") if diferido else None
+
+        if compresion not in EXTENSIONES:
+            raise ValueError(f"❌ Compresión no soportada: {compresion}")
+        os.makedirs(carpeta, exist_ok=True)
+
+    def ruta_parte(self, parte):
+        return os.path.join(self.carpeta, self.patron.format(parte=parte) + EXTENSIONES[self.compresion])
+
+    def _abrir(self):
+        self.parte += 1
+        ruta = self.ruta_parte(self.parte)
+        contador = _ContadorHash(open(ruta + ".parcial", "wb"))
+        self._actual = {
+            "ruta": ruta,
+            "contador": contador,
+            "salida": _abrir_compresor(contador, self.compresion),
+            "filas": 0,
+            "bytes_sin_comprimir": 0,
+        }
+        if self.al_abrir:
+            self.al_abrir(ruta)
+        cabecera = self.cabecera(self.parte) if callable(self.cabecera) else self.cabecera
+        if cabecera:
+            self._escribir_bytes(cabecera.encode("utf-8"))
+
+    def _escribir_bytes(self, datos):
+        if self._diferida:
+            self._diferida.poner(self._actual["salida"], datos)
+        else:
+            self._actual["salida"].write(datos)
+        self._actual["bytes_sin_comprimir"] += len(datos)
+
+    def _cerrar_actual(self):
+        actual = self._actual
+        if actual is None:
+            return None
+        if self._diferida:
+            self._diferida.esperar()
+        if actual["salida"] is not actual["contador"]:
+            actual["salida"].close()
+        actual["contador"].flush()
+        os.fsync(actual["contador"].archivo.fileno())
+        actual["contador"].close()
+        os.replace(actual["ruta"] + ".parcial", actual["ruta"])
+        info = {
+            "parte": self.parte,
+            "archivo": os.path.basename(actual["ruta"]),
+            "filas": actual["filas"],
+            "bytes": actual["contador"].bytes,
+            "bytes_sin_comprimir": actual["bytes_sin_comprimir"],
+            "sha256": actual["contador"].sha256.hexdigest(),
+        }
+        if self.al_cerrar_parte:
+            info.update(self.al_cerrar_parte(info) or {})
+        self.partes.append(info)
+        self._actual = None
+        self._guardar_manifest(finalizado=False)
+        return info
+
+    def _guardar_manifest(self, finalizado):
+        if not self.ruta_manifest:
+            return
+        contenido = dict(self.datos_manifest)
+        contenido.update({
+            "finalizado": finalizado,
+            "compresion": self.compresion,
+            "max_bytes": self.max_bytes,
+            "total_filas": sum(p["filas"] for p in self.partes),
+            "partes": self.partes,
+        })
+        escribir_manifest(self.ruta_manifest, contenido)
+
+    def escribir(self, texto, filas=0):
+        """Escribe un bloque completo que contiene `filas` registros."""
+        datos = texto.encode("utf-8")
+        actual = self._actual
+        if actual is not None and actual["filas"] > 0:
+            excede_bytes = self.max_bytes and actual["bytes_sin_comprimir"] + len(datos) > self.max_bytes
+            excede_filas = self.max_filas and actual["filas"] + filas > self.max_filas
+            if excede_bytes or excede_filas:
+                self._cerrar_actual()
+        if self._actual is None:
+            self._abrir()
+        self._escribir_bytes(datos)
+        self._actual["filas"] += filas
+
+    def cerrar(self):
+        self._cerrar_actual()
+        if self._diferida:
+            self._diferida.cerrar()
+        self._guardar_manifest(finalizado=True)
+        return self.partes
+
+    @property
+    def escritura(self):
+        """La EscrituraDiferida (para medir el solapamiento) o None."""
+        return self._diferida
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+            return False
+        if self._diferida:
+            self._diferida.abortar()
+        if self._actual is not None:
+            # La parte en curso queda como .parcial y no entra en el manifest
+            self._actual["salida"].close()
+            self._actual["contador"].close()
+            self._actual = None
+        return False
+
+def escribir_manifest(ruta, contenido):
+    """Escribe el JSON en un temporal, hace fsync y lo renombra encima del destino."""
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(contenido, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+def leer_manifest(ruta):
+    """Devuelve el contenido del manifest o None si no existe o está dañado."""
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def verificar_manifest(ruta_manifest):
+    """Devuelve la lista de archivos cuyo tamaño o sha256 no coincide con el manifest."""
+    with open(ruta_manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+    carpeta = os.path.dirname(ruta_manifest)
+    errores = []
+    for parte in manifest["partes"]:
+        ruta = os.path.join(carpeta, parte["archivo"])
+        if not os.path.exists(ruta) or os.path.getsize(ruta) != parte["bytes"]:
+            errores.append(parte["archivo"])
+            continue
+        sha256 = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(bloque)
+        if sha256.hexdigest() != parte["sha256"]:
+            errores.append(parte["archivo"])
+    return errores
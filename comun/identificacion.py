@@ -0,0 +1,53 @@
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+# Lo que puede ir entre el tipo y el número: 'RC 123456', 'RC-123456', 'RC123456'
+SEPARADORES_PREFIJO = r"[\s\-]*"
+# Separadores dentro del número: '1.234.567', '1 234 567', '1-234-567'
+REGEX_SEPARADORES = re.compile(r"[\s.\-]+")
+# Ceros a la izquierda; se deja al menos un carácter ('000' -> '0')
+REGEX_CEROS_INICIALES = re.compile(r"^0+(?=.)")
+
+@lru_cache(maxsize=None)
+def patron_prefijo(tipo):
+    """Regex compilada que quita `tipo` (y los separadores que lo siguen) del inicio."""
+    return re.compile("^" + re.escape(tipo) + SEPARADORES_PREFIJO)
+
+def normalizar_identificaciones(df, columna_id="identificacion", columna_tipo="tipo_documento",
+                                quitar_separadores=False, quitar_ceros=False):
+    """
+    Quita el tipo de documento repetido al inicio de la identificación
+    ('RC 123456' con tipo 'RC' -> '123456') y devuelve la columna nueva.
+
+    Las filas se agrupan por tipo (suele haber unos diez distintos) y cada
+    grupo pasa por un solo `.str.replace` con la regex del tipo ya compilada,
+    en lugar de armar y compilar la regex fila por fila. Con
+    `quitar_separadores` también se eliminan espacios, puntos y guiones
+    dentro del número, y con `quitar_ceros` los ceros a la izquierda.
+
+    Si el tipo o la identificación son nulos, la identificación queda igual;
+    si no, se compara sin espacios a los lados.
+    """
+    ids = df[columna_id]
+    if columna_tipo not in df.columns or (ids.dtype != object and not isinstance(ids.dtype, pd.StringDtype)):
+        return ids
+    tipos = df[columna_tipo].str.strip()
+    validas = (ids.notna() & tipos.notna()).to_numpy()
+    if not validas.any():
+        return ids
+
+    textos = ids[validas].str.strip()
+    resultado = textos.copy()
+    for tipo, posiciones in textos.groupby(tipos[validas].to_numpy(), sort=False).indices.items():
+        grupo = textos.iloc[posiciones].str.replace(patron_prefijo(tipo), "", regex=True)
+        resultado.iloc[posiciones] = grupo.to_numpy()
+    if quitar_separadores:
+        resultado = resultado.str.replace(REGEX_SEPARADORES, "", regex=True)
+    if quitar_ceros:
+        resultado = resultado.str.replace(REGEX_CEROS_INICIALES, "", regex=True)
+
+    ids = ids.copy()
+    ids[validas] = resultado.to_numpy()
+    return ids
@@ -0,0 +1,129 @@
+import itertools
+
+REGISTROS_POR_LOTE = 10000
+
+class Lote:
+    """
+    Registros guardados por columnas: `campos` son los nombres y `columnas`
+    una lista de valores por campo, todas del mismo largo.
+
+    Comparado con una lista de dicts de csv.DictReader, cada registro cuesta
+    solo un puntero por campo (no un dict con sus claves), y las validaciones
+    pueden recorrer una columna completa de una vez.
+    """
+    __slots__ = ("campos", "columnas")
+
+    def __init__(self, campos, columnas=None):
+        self.campos = tuple(campos)
+        self.columnas = columnas if columnas is not None else [[] for _ in self.campos]
+
+    def __len__(self):
+        return len(self.columnas[0]) if self.columnas else 0
+
+    def __getitem__(self, campo):
+        return self.columnas[self.campos.index(campo)]
+
+    def columna(self, campo, defecto=""):
+        """Como `lote[campo]`, pero si el campo no existe devuelve `defecto` en cada registro."""
+        if campo in self.campos:
+            return self[campo]
+        return [defecto] * len(self)
+
+    def filas(self):
+        """Registros como tuplas, en el orden de `campos`."""
+        return zip(*self.columnas)
+
+    def filtrar(self, mascara):
+        """Lote nuevo con los registros cuyo valor en `mascara` es verdadero."""
+        return Lote(self.campos, [list(itertools.compress(columna, mascara)) for columna in self.columnas])
+
+    def rebanar(self, inicio, fin=None):
+        return Lote(self.campos, [columna[inicio:fin] for columna in self.columnas])
+
+    def extender(self, otro):
+        for propia, ajena in zip(self.columnas, otro.columnas):
+            propia.extend(ajena)
+
+def leer_lotes(reader, encabezado, campos=None, tamano=REGISTROS_POR_LOTE, campo_fila=None):
+    """
+    Llena lotes de hasta `tamano` registros directamente desde un csv.reader
+    (`encabezado` es la primera fila, ya leída). Cada campo se toma por su
+    índice en el encabezado; los que no están, o no alcanzan en una fila
+    corta, quedan como "". Las filas vacías se saltan, como en DictReader.
+
+    Con `campo_fila`, cada lote trae además ese campo con el número de fila
+    de cada registro (1 es la primera después del encabezado; las vacías
+    también cuentan), para poder ubicar los rechazos en el archivo.
+    """
+    campos = tuple(encabezado if campos is None else campos)
+    # Si un nombre se repite en el encabezado gana la última columna, como en DictReader
+    posiciones = {nombre: i for i, nombre in enumerate(encabezado)}
+    indices = [posiciones.get(campo) for campo in campos]
+    ancho = max((i for i in indices if i is not None), default=-1) + 1
+    leidas = 0
+
+    while True:
+        bloque = list(itertools.islice(reader, tamano))
+        if not bloque:
+            return
+        inicio = leidas + 1
+        leidas += len(bloque)
+        filas = [fila for fila in bloque if fila]
+        if not filas:
+            continue
+        if any(len(fila) < ancho for fila in filas):
+            filas = [fila if len(fila) >= ancho else fila + [""] * (ancho - len(fila)) for fila in filas]
+        columnas = [[fila[i] for fila in filas] if i is not None else [""] * len(filas) for i in indices]
+        if campo_fila is None:
+            yield Lote(campos, columnas)
+        else:
+            numeros = [numero for numero, fila in enumerate(bloque, start=inicio) if fila]
+            yield Lote(campos + (campo_fila,), columnas + [numeros])
+
+def agrupar_filas(filas, campos, tamano=REGISTROS_POR_LOTE):
+    """Convierte un iterable de tuplas en lotes de hasta `tamano` registros."""
+    filas = iter(filas)
+    while True:
+        bloque = list(itertools.islice(filas, tamano))
+        if not bloque:
+            return
+        yield Lote(campos, [list(columna) for columna in zip(*bloque)])
+
+def lotes_desde_dataframes(bloques, campos):
+    """
+    Lotes con `campos` a partir de DataFrames (p. ej. los de
+    ejecutar_pipeline.bloques_procesados), sin escribir ni releer un CSV. Los
+    nulos y los campos que faltan quedan como "", igual que al leer el CSV
+    con leer_lotes. Cada columna pasa a lista una vez; los textos no se copian.
+    """
+    campos = tuple(campos)
+    for bloque in bloques:
+        if bloque.empty:
+            continue
+        yield Lote(campos, [bloque[campo].fillna("").tolist() if campo in bloque.columns else [""] * len(bloque)
+                            for campo in campos])
+
+def reagrupar(lotes, tamano, saltar=0):
+    """
+    Reparte los registros de `lotes` en lotes de exactamente `tamano` (el
+    último puede ser menor), descartando antes los `saltar` primeros.
+    """
+    pendiente = None
+    for lote in lotes:
+        if saltar:
+            if saltar >= len(lote):
+                saltar -= len(lote)
+                continue
+            lote = lote.rebanar(saltar)
+            saltar = 0
+        if pendiente is None:
+            pendiente = Lote(lote.campos)
+        pendiente.extender(lote)
+        inicio = 0
+        while len(pendiente) - inicio >= tamano:
+            yield pendiente.rebanar(inicio, inicio + tamano)
+            inicio += tamano
+        if inicio:
+            pendiente = pendiente.rebanar(inicio)
+    if pendiente:
+        yield pendiente
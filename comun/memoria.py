@@ -0,0 +1,151 @@
+import math
+import os
+import re
+from itertools import islice
+
+import pandas as pd
+
+MUESTRA_FILAS = 5000        # Filas leídas para estimar la memoria por fila
+MIN_FILAS_BLOQUE = 1000
+MAX_FILAS_BLOQUE = 2000000
+MAX_PARTICIONES = 256
+MARGEN = 0.8                # Al pasarse del presupuesto, el bloque se achica a este % de lo que cabría
+MB = 1024 * 1024
+
+UNIDADES = {"": 1, "K": 1024, "M": MB, "G": 1024 * MB, "T": 1024 * 1024 * MB}
+
+def parsear_tamano(texto):
+    """'512M', '2G', '1.5GB', '800mb' o un número de bytes -> bytes."""
+    coincidencia = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", str(texto).upper())
+    if not coincidencia:
+        raise ValueError(f"❌ Tamaño de memoria no válido: {texto!r} (ejemplos: 512M, 2G)")
+    return int(float(coincidencia[1]) * UNIDADES[coincidencia[2]])
+
+def rss_actual():
+    """Memoria residente del proceso en bytes, o None si no se puede medir en este sistema."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+def medir_muestra(ruta, filas=MUESTRA_FILAS, **opciones_lectura):
+    """
+    (bytes por fila en memoria, filas estimadas del archivo) a partir de las
+    primeras `filas` filas, leídas con las mismas opciones de pd.read_csv que
+    usará la herramienta.
+    """
+    muestra = pd.read_csv(ruta, nrows=filas, **opciones_lectura)
+    if muestra.empty:
+        return 0.0, 0
+    bytes_fila = muestra.memory_usage(deep=True).sum() / len(muestra)
+
+    with open(ruta, "rb") as f:
+        encabezado = len(f.readline())
+        en_disco = sum(len(linea) for linea in islice(f, len(muestra)))
+    tamano = os.path.getsize(ruta) - encabezado
+    filas_estimadas = math.ceil(tamano / max(en_disco / len(muestra), 1))
+    return bytes_fila, filas_estimadas
+
+class GobernadorMemoria:
+    """
+    Presupuesto de memoria para todo el proceso (`max_bytes`). Con la memoria
+    por fila medida en una muestra decide cuántas filas leer por bloque y
+    cuánto dar a los demás buffers (deduplicación, salida); entre bloques mide
+    el RSS y, si se pasó del presupuesto, achica los bloques siguientes.
+
+    `factor_trabajo` es cuántas veces ocupa un bloque mientras se procesa
+    (copias intermedias, textos serializados) respecto a lo que ocupa recién
+    leído; cada herramienta lo fija según lo que hace con sus bloques.
+    """
+
+    def __init__(self, max_bytes, bytes_fila, filas_estimadas=0, factor_trabajo=4.0, fraccion_bloque=0.5):
+        self.max_bytes = max_bytes
+        self.base = rss_actual() or 0     # Intérprete y bibliotecas, antes de leer datos
+        self.bytes_fila = max(bytes_fila, 1.0)
+        self.filas_estimadas = filas_estimadas
+        self.factor_trabajo = factor_trabajo
+        self.filas = self._limitar(self.presupuesto(fraccion_bloque) / (self.bytes_fila * factor_trabajo))
+        self.pico = self.base
+        self.ajustes = 0
+        self._rss_ajuste = 0
+
+        if not self.disponible:
+            print(f"⚠️ El proceso ya ocupa {self.base / MB:.0f} MB, más que el presupuesto de "
+                  f"{max_bytes / MB:.0f} MB: se usan bloques de {self.filas} filas")
+
+    @classmethod
+    def desde_muestra(cls, ruta, max_bytes, factor_trabajo=4.0, fraccion_bloque=0.5, **opciones_lectura):
+        bytes_fila, filas_estimadas = medir_muestra(ruta, **opciones_lectura)
+        return cls(max_bytes, bytes_fila, filas_estimadas, factor_trabajo, fraccion_bloque)
+
+    @staticmethod
+    def _limitar(filas):
+        return int(min(MAX_FILAS_BLOQUE, max(MIN_FILAS_BLOQUE, filas)))
+
+    @property
+    def disponible(self):
+        """Bytes del presupuesto que quedan sobre lo que el proceso ya ocupaba al empezar."""
+        return max(self.max_bytes - self.base, 0)
+
+    def presupuesto(self, fraccion):
+        return int(self.disponible * fraccion)
+
+    def bytes_archivo(self, factor=None):
+        """Memoria estimada para procesar el archivo completo de una vez."""
+        return self.filas_estimadas * self.bytes_fila * (factor or self.factor_trabajo)
+
+    def cabe_completo(self, factor=None):
+        return self.bytes_archivo(factor) <= self.disponible
+
+    def particiones(self, bytes_particion, factor=None):
+        """Particiones en disco para que cada una, procesada con `factor`, quepa en `bytes_particion`."""
+        necesarias = math.ceil(self.bytes_archivo(factor) / max(bytes_particion, 1))
+        return min(MAX_PARTICIONES, max(1, necesarias))
+
+    def buffer(self, fraccion, minimo=64 * 1024, maximo=16 * MB):
+        """Tamaño de un buffer de escritura: `fraccion` del presupuesto, entre `minimo` y `maximo`."""
+        return min(maximo, max(minimo, self.presupuesto(fraccion)))
+
+    def revisar(self):
+        """
+        Mide el RSS entre bloques y devuelve las filas del siguiente. Solo se
+        achica si el RSS pasa del presupuesto y sigue creciendo desde el último
+        ajuste (la memoria liberada no siempre vuelve al sistema operativo).
+        """
+        rss = rss_actual()
+        if rss is None:
+            return self.filas
+        self.pico = max(self.pico, rss)
+        if rss > self.max_bytes and rss > self._rss_ajuste and self.filas > MIN_FILAS_BLOQUE:
+            usado = max(rss - self.base, 1)
+            nuevas = self._limitar(self.filas * MARGEN * self.disponible / usado)
+            if nuevas < self.filas:
+                print(f"⚠️ Memoria en {rss / MB:.0f} MB (presupuesto {self.max_bytes / MB:.0f} MB): "
+                      f"bloques de {self.filas} a {nuevas} filas", flush=True)
+                self.filas = nuevas
+                self.ajustes += 1
+            self._rss_ajuste = rss
+        return self.filas
+
+    def bloques(self, lector):
+        """
+        Itera un lector de pd.read_csv (con iterator=True) pidiendo cada bloque
+        del tamaño vigente; el RSS se revisa cuando el consumidor pide el siguiente.
+        """
+        while True:
+            try:
+                bloque = lector.get_chunk(self.filas)
+            except StopIteration:
+                return
+            yield bloque
+            self.revisar()
+
+    def resumen(self):
+        return (f"🧮 Memoria: pico {self.pico / MB:.0f} MB de {self.max_bytes / MB:.0f} MB, "
+                f"{self.bytes_fila:.0f} bytes/fila, bloques de {self.filas} filas, {self.ajustes} ajuste(s)")
@@ -0,0 +1,111 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Caracteres que quedan cuando los bytes 0x80-0xBF de UTF-8 se leen como latin-1 o cp1252
+_CONTINUACION = "".join(sorted(
+    set(bytes(range(0x80, 0xC0)).decode("latin1"))
+    | set(bytes(range(0x80, 0xC0)).decode("cp1252", errors="ignore"))
+))
+_BYTE_CP1252 = {c: c.encode("cp1252")[0] for c in _CONTINUACION if ord(c) > 255}
+
+# Cualquier byte inicial de UTF-8 seguido de continuaciones: marca la celda como sospechosa
+REGEX_MOJIBAKE = re.compile("[\xc2-\xf4][" + re.escape(_CONTINUACION) + "]+")
+# Secuencias que se reparan aunque el resto del texto esté bien: solo Â, Ã (latin-1 y
+# acentos del español), â€ (comillas y guiones) y ï»¿ (BOM); otras iniciales como Ð o
+# É seguidas de ” son demasiado comunes en texto correcto
+REGEX_MOJIBAKE_SEGURO = re.compile(
+    "[\xc2\xc3][" + re.escape(_CONTINUACION) + "]|\xe2\u20ac[" + re.escape(_CONTINUACION) + "]|\xef\xbb\xbf"
+)
+# Basura que se elimina: NUL, BOM y el carácter de reemplazo
+REGEX_RESIDUOS = re.compile(r"[\x00\ufeff\ufffd]")
+MAX_PASADAS = 3   # Texto codificado dos o tres veces (ÃƒÂ± -> Ã± -> ñ)
+
+def _a_bytes(texto):
+    """Bytes originales del texto leído como latin-1/cp1252, o None si no es posible."""
+    try:
+        return bytes(_BYTE_CP1252.get(c) or ord(c) for c in texto)
+    except ValueError:
+        return None
+
+def _reparar_secuencia(coincidencia):
+    crudo = _a_bytes(coincidencia.group())
+    try:
+        return crudo.decode("utf-8")
+    except (AttributeError, UnicodeDecodeError):
+        return coincidencia.group()
+
+def _reparar_celda(texto):
+    # 1. Toda la celda de una vez: funciona si todo lo no ASCII es mojibake
+    crudo = _a_bytes(texto)
+    if crudo is not None:
+        try:
+            return crudo.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+    # 2. Solo las secuencias seguras (texto mezclado, p. ej. "MarÃ­a Gómez")
+    return REGEX_MOJIBAKE_SEGURO.sub(_reparar_secuencia, texto)
+
+def _patron_sospecha(reemplazos):
+    patron = REGEX_MOJIBAKE.pattern + "|" + REGEX_RESIDUOS.pattern
+    if reemplazos:
+        patron += "|" + "|".join(re.escape(k) for k in reemplazos)
+    return patron
+
+def _patron_reemplazos(reemplazos):
+    # Claves más largas primero si una contiene a otra
+    return re.compile("|".join(re.escape(k) for k in sorted(reemplazos, key=len, reverse=True)))
+
+def reparar_serie(serie, reemplazos=None):
+    """
+    Repara mojibake (UTF-8 leído como latin-1/cp1252) en una columna de texto.
+
+    Primero arma con `.str.contains` una máscara de celdas sospechosas (suelen
+    ser menos del 1%); solo esas pasan por la reparación:
+      1. Ida y vuelta a bytes de la celda completa; si no decodifica, solo las
+         secuencias Ã?, Â?, â€? y ï»¿ (ver REGEX_MOJIBAKE_SEGURO). Se repite
+         hasta MAX_PASADAS veces para texto codificado más de una vez.
+      2. Se eliminan NUL, BOM y �.
+      3. `reemplazos` propios del paso ({texto: nuevo}) sobre el texto ya
+         reparado, en una sola pasada.
+    Las demás celdas y los nulos quedan igual. Devuelve una serie nueva.
+    """
+    if serie.dtype != object and not isinstance(serie.dtype, pd.StringDtype):
+        return serie
+    sospechosas = serie.str.contains(_patron_sospecha(reemplazos), regex=True, na=False).to_numpy()
+    if not sospechosas.any():
+        return serie
+
+    textos = serie[sospechosas]
+    for _ in range(MAX_PASADAS):
+        pendientes = textos.str.contains(REGEX_MOJIBAKE, na=False).to_numpy()
+        if not pendientes.any():
+            break
+        reparados = textos[pendientes].map(_reparar_celda)
+        cambiaron = (reparados != textos[pendientes]).to_numpy()
+        if not cambiaron.any():
+            break
+        textos = textos.copy()
+        textos.iloc[np.flatnonzero(pendientes)[cambiaron]] = reparados[cambiaron].to_numpy()
+    textos = textos.str.replace(REGEX_RESIDUOS, "", regex=True)
+    if reemplazos:
+        textos = textos.str.replace(_patron_reemplazos(reemplazos), lambda m: reemplazos[m.group()], regex=True)
+
+    serie = serie.copy()
+    serie.iloc[np.flatnonzero(sospechosas)] = textos.to_numpy()
+    return serie
+
+def reparar_dataframe(df, columnas=None, reemplazos=None):
+    """`reparar_serie` sobre `columnas` (por defecto, todas). Devuelve una copia."""
+    df = df.copy()
+    for columna in columnas if columnas is not None else df.columns:
+        if columna in df.columns:
+            df[columna] = reparar_serie(df[columna], reemplazos)
+    return df
+
+def reparar_texto(texto, reemplazos=None):
+    """Versión para un solo valor; los nulos se devuelven tal cual."""
+    if not isinstance(texto, str):
+        return texto
+    return reparar_serie(pd.Series([texto], dtype=object), reemplazos).iloc[0]
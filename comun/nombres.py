@@ -0,0 +1,135 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Códigos de motivo; se devuelve el de la primera regla que falla, en este orden
+VALIDO = "valido"
+VACIO = "vacio"
+PALABRA_INVALIDA = "palabra_invalida"
+CORTO = "corto"
+PRIMER_CARACTER = "primer_caracter"
+CARACTER_NO_PERMITIDO = "caracter_no_permitido"
+SIN_LETRAS = "sin_letras"
+MUCHOS_GUIONES = "muchos_guiones"
+INVALIDO = "invalido"   # No debería verse: el patrón combinado falló pero ninguna regla suelta
+
+LETRAS_ES = "[A-Za-zÁÉÍÓÚáéíóúÑñ]"
+
+class ReglasNombre:
+    """
+    Reglas de validación de nombres declaradas como datos. Todas se aplican
+    al texto sin espacios a los lados; los nulos y el texto vacío son VACIO.
+
+      min_largo           mínimo de caracteres
+      palabras_invalidas  textos completos que se rechazan ({".", "-"})
+      rechazar_solo       {codigo: clase}: se rechaza el texto hecho solo de
+                          esa clase ({"solo_numeros": r"\\d"})
+      primer_caracter     clase del primer carácter
+      caracteres          clase de todos los caracteres
+      letra_requerida     clase de la que debe haber al menos uno
+      max_guiones         máximo de '-'
+      ignorar_mayusculas  las clases y las palabras no distinguen mayúsculas
+
+    Todo, salvo las palabras inválidas (un set), se compila en una sola
+    regex; un valor válido cuesta un `strip` y un `fullmatch`. Solo para los
+    rechazados se revisan las reglas una por una para dar el motivo.
+    """
+
+    def __init__(self, min_largo=1, palabras_invalidas=(), rechazar_solo=None, primer_caracter=None,
+                 caracteres=None, letra_requerida=None, max_guiones=None, ignorar_mayusculas=False):
+        banderas = re.DOTALL | (re.IGNORECASE if ignorar_mayusculas else 0)
+        self.min_largo = max(min_largo, 1)
+        self.ignorar_mayusculas = ignorar_mayusculas
+        self.palabras_invalidas = {self._palabra(p) for p in palabras_invalidas}
+        self.max_guiones = max_guiones
+
+        partes = [f"(?=.{{{self.min_largo}}})"]
+        partes += [f"(?!{clase}+\\Z)" for clase in (rechazar_solo or {}).values()]
+        if primer_caracter:
+            partes.append(f"(?={primer_caracter})")
+        if letra_requerida:
+            partes.append(f"(?=.*?{letra_requerida})")
+        if max_guiones is not None:
+            partes.append(f"(?!(?:[^-]*-){{{max_guiones + 1}}})")
+        partes.append(f"{caracteres}*" if caracteres else ".*")
+        self.patron = re.compile("".join(partes), banderas)
+
+        # Reglas sueltas, en el orden en que se reportan
+        self._diagnostico = [(CORTO, lambda t: len(t) < self.min_largo)]
+        for codigo, clase in (rechazar_solo or {}).items():
+            self._diagnostico.append((codigo, re.compile(f"{clase}+", banderas).fullmatch))
+        if primer_caracter:
+            empieza = re.compile(primer_caracter, banderas).match
+            self._diagnostico.append((PRIMER_CARACTER, lambda t: not empieza(t)))
+        if caracteres:
+            permitidos = re.compile(f"{caracteres}*", banderas).fullmatch
+            self._diagnostico.append((CARACTER_NO_PERMITIDO, lambda t: not permitidos(t)))
+        if letra_requerida:
+            letra = re.compile(letra_requerida, banderas).search
+            self._diagnostico.append((SIN_LETRAS, lambda t: not letra(t)))
+        if max_guiones is not None:
+            self._diagnostico.append((MUCHOS_GUIONES, lambda t: t.count("-") > max_guiones))
+
+    def _palabra(self, texto):
+        return texto.casefold() if self.ignorar_mayusculas else texto
+
+    def _motivo(self, texto):
+        """Motivo de rechazo de un texto ya sin espacios."""
+        if not texto:
+            return VACIO
+        if self._palabra(texto) in self.palabras_invalidas:
+            return PALABRA_INVALIDA
+        for codigo, falla in self._diagnostico:
+            if falla(texto):
+                return codigo
+        return INVALIDO
+
+    def codigo(self, texto):
+        """Código de motivo de un solo valor (VALIDO si pasa todas las reglas)."""
+        if not isinstance(texto, str):
+            return VACIO
+        texto = texto.strip()
+        if self.patron.fullmatch(texto) and (not self.palabras_invalidas
+                                             or self._palabra(texto) not in self.palabras_invalidas):
+            return VALIDO
+        return self._motivo(texto)
+
+    def es_valido(self, texto):
+        return self.codigo(texto) == VALIDO
+
+    def codigos(self, valores):
+        """Código de motivo por valor, para una lista o columna de un lote."""
+        return self.codigos_serie(pd.Series(valores, dtype=object)).tolist()
+
+    def codigos_serie(self, serie):
+        """
+        Como `codigos`, para una columna de pandas (mismo índice). La columna
+        completa se revisa con `mascara_serie`; solo los rechazados pasan por
+        las reglas una por una para dar el motivo.
+        """
+        validos = self.mascara_serie(serie).to_numpy()
+        codigos = pd.Series(VALIDO, index=serie.index, dtype=object)
+        if not validos.all():
+            codigos[~validos] = [self.codigo(valor) for valor in serie.to_numpy()[~validos]]
+        return codigos
+
+    def mascara_serie(self, serie):
+        """
+        Serie booleana: True donde el valor es válido. La columna se reduce a
+        sus valores distintos (los nombres se repiten mucho) y sobre ellos se
+        evalúa el patrón combinado de una vez con `str.fullmatch`; los nulos y
+        lo que no es texto quedan en False, como VACIO en `codigo`.
+        """
+        if serie.dtype != object and not isinstance(serie.dtype, pd.StringDtype):
+            return pd.Series(False, index=serie.index)
+        # Como object, para que la regex sea siempre la de `re` (lookaheads incluidos)
+        posiciones, distintos = pd.factorize(serie.astype(object))
+        texto = pd.Series(distintos, dtype=object).str.strip()
+        validos = texto.str.fullmatch(self.patron, na=False)
+        if self.palabras_invalidas:
+            palabras = texto.str.casefold() if self.ignorar_mayusculas else texto
+            validos &= ~palabras.isin(self.palabras_invalidas)
+        # Los nulos tienen posición -1: toman el False agregado al final
+        validos = np.append(validos.to_numpy(dtype=bool), False)
+        return pd.Series(validos[posiciones], index=serie.index)
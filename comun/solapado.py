@@ -0,0 +1,256 @@
+import os
+import queue
+import threading
+import time
+
+PROFUNDIDAD = 2     # Elementos que pueden esperar en la cola entre un hilo y otro
+# Con un solo núcleo los hilos solo se turnan el GIL: no hay cómputo que solapar, únicamente
+# esperas de disco, y el cambio de hilo cuesta más de lo que se gana (ver medir_solapado.py)
+SOLAPAR_POR_DEFECTO = (os.cpu_count() or 1) > 1
+
+_DATO, _ERROR, _FIN = range(3)
+
+class LecturaAdelantada:
+    """
+    Recorre `fuente` (un iterable, p. ej. los bloques de un lector de CSV) en
+    un hilo aparte, hasta `profundidad` elementos por delante de quien la
+    consume: mientras el bloque k se procesa, el k+1 ya se está leyendo. Los
+    elementos pasan por la cola tal cual, sin copiarse. Un error en la lectura
+    se lanza en el consumidor al llegar a ese punto.
+
+    `ocupado` es el tiempo que el hilo pasó leyendo (`cpu`, el de CPU) y
+    `espera` el que el consumidor estuvo detenido esperando un elemento.
+    """
+
+    def __init__(self, fuente, profundidad=PROFUNDIDAD, nombre="lectura"):
+        self.nombre = nombre
+        self.ocupado = 0.0
+        self.cpu = 0.0
+        self.espera = 0.0
+        self._cola = queue.Queue(maxsize=profundidad)
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._leer, args=(fuente,), name=nombre, daemon=True)
+        self._hilo.start()
+
+    def _poner(self, mensaje):
+        # Con timeout para no quedar bloqueado si el consumidor ya dejó de leer
+        while not self._parar.is_set():
+            try:
+                self._cola.put(mensaje, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _leer(self, fuente):
+        try:
+            iterador = iter(fuente)
+            while not self._parar.is_set():
+                inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+                try:
+                    elemento = next(iterador)
+                except StopIteration:
+                    break
+                finally:
+                    self.ocupado += time.perf_counter() - inicio
+                    self.cpu += time.thread_time() - inicio_cpu
+                if not self._poner((_DATO, elemento)):
+                    return
+        except BaseException as error:
+            self._poner((_ERROR, error))
+            return
+        self._poner((_FIN, None))
+
+    def __iter__(self):
+        try:
+            while True:
+                inicio = time.perf_counter()
+                tipo, valor = self._cola.get()
+                self.espera += time.perf_counter() - inicio
+                if tipo == _FIN:
+                    return
+                if tipo == _ERROR:
+                    raise valor
+                yield valor
+        finally:
+            self.cerrar()
+
+    def cerrar(self):
+        self._parar.set()
+        self._hilo.join()
+
+class EscrituraDiferida:
+    """
+    Hilo de escritura con una cola acotada: `poner(*argumentos)` deja el
+    trabajo en la cola y vuelve enseguida; el hilo llama `escribir(*argumentos)`
+    en el mismo orden. Con la cola llena, `poner` espera (así la memoria en
+    vuelo queda acotada a `profundidad` elementos). Los argumentos no se copian:
+    quien los pone no debe modificarlos después.
+
+    Si `escribir` falla, el error se lanza en el hilo principal en el siguiente
+    `poner`, `esperar` o `cerrar`, y lo que quedaba en la cola se descarta.
+    `ocupado` es el tiempo que el hilo pasó escribiendo (`cpu`, el de CPU) y
+    `espera` el que el hilo principal estuvo detenido por él (cola llena o al
+    esperar el final).
+
+    Con `en_hilo=False` no hay hilo: `poner` escribe ahí mismo (toda la
+    escritura cuenta como espera), para comparar con y sin solapamiento.
+    """
+
+    def __init__(self, escribir, profundidad=PROFUNDIDAD, nombre="escritura", en_hilo=True):
+        self.nombre = nombre
+        self.ocupado = 0.0
+        self.cpu = 0.0
+        self.espera = 0.0
+        self._escribir = escribir
+        self._error = None
+        self._cola = queue.Queue(maxsize=profundidad)
+        self._hilo = None
+        if en_hilo:
+            self._hilo = threading.Thread(target=self._trabajar, name=nombre, daemon=True)
+            self._hilo.start()
+
+    def _trabajar(self):
+        while True:
+            mensaje = self._cola.get()
+            try:
+                if mensaje is None:
+                    return
+                if self._error is None:
+                    self._medir(self._escribir, *mensaje)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._cola.task_done()
+
+    def _medir(self, accion, *argumentos):
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        try:
+            accion(*argumentos)
+        finally:
+            self.ocupado += time.perf_counter() - inicio
+            self.cpu += time.thread_time() - inicio_cpu
+
+    def _revisar(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _esperar(self, accion, *argumentos):
+        inicio = time.perf_counter()
+        try:
+            accion(*argumentos)
+        finally:
+            self.espera += time.perf_counter() - inicio
+
+    def poner(self, *argumentos):
+        if self._hilo is None:
+            self._esperar(self._medir, self._escribir, *argumentos)
+            return
+        self._revisar()
+        self._esperar(self._cola.put, argumentos)
+
+    def esperar(self):
+        """Espera a que se escriba todo lo que está en la cola."""
+        if self._hilo is not None:
+            self._esperar(self._cola.join)
+        self._revisar()
+
+    def cerrar(self):
+        """Termina de escribir lo pendiente y detiene el hilo."""
+        if self._hilo is not None and self._hilo.is_alive():
+            self._esperar(self._cola.put, None)
+            self._esperar(self._hilo.join)
+        self._revisar()
+
+    def abortar(self):
+        """Detiene el hilo descartando lo pendiente, sin lanzar el error que hubiera."""
+        if self._hilo is not None and self._hilo.is_alive():
+            self._error = self._error or RuntimeError("escritura abortada")
+            self._cola.put(None)
+            self._hilo.join()
+        self._error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.abortar()
+        return False
+
+def _consumir(cola):
+    while True:
+        tipo, valor = cola.get()
+        if tipo == _FIN:
+            return
+        if tipo == _ERROR:
+            raise valor
+        yield valor
+
+def repartir(fuente, consumidores, profundidad=PROFUNDIDAD):
+    """
+    Recorre `fuente` una sola vez y entrega cada elemento, sin copiarlo, a
+    todos los `consumidores`: funciones que reciben un iterador y corren cada
+    una en su hilo, con una cola acotada a `profundidad` elementos (el más
+    lento marca el ritmo y la memoria no crece). Los consumidores no deben
+    modificar los elementos. Devuelve lo que devolvió cada consumidor.
+
+    Si la fuente o un consumidor fallan, el iterador de los demás lanza el
+    error (así descartan sus salidas a medias) y el error se lanza aquí.
+    """
+    colas = [queue.Queue(maxsize=profundidad) for _ in consumidores]
+    resultados = [None] * len(consumidores)
+    errores = []
+
+    def correr(indice, consumidor):
+        try:
+            resultados[indice] = consumidor(_consumir(colas[indice]))
+        except BaseException as error:
+            errores.append(error)
+
+    hilos = [threading.Thread(target=correr, args=(i, consumidor), name=f"consumidor {i}", daemon=True)
+             for i, consumidor in enumerate(consumidores)]
+    for hilo in hilos:
+        hilo.start()
+
+    def entregar(mensaje):
+        for cola, hilo in zip(colas, hilos):
+            # Con timeout para no quedar bloqueado si ese consumidor ya terminó o falló
+            while hilo.is_alive():
+                try:
+                    cola.put(mensaje, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    try:
+        for elemento in fuente:
+            if errores:
+                break
+            entregar((_DATO, elemento))
+    except BaseException as error:
+        errores.append(error)
+    entregar((_ERROR, errores[0]) if errores else (_FIN, None))
+    for hilo in hilos:
+        hilo.join()
+    if errores:
+        raise errores[0]
+    return resultados
+
+def escribir_en(salida, datos):
+    """Función de escritura para EscrituraDiferida: `datos` (bytes) a un archivo ya abierto."""
+    salida.write(datos)
+
+def resumen_solapado(segundos, *etapas):
+    """
+    Una línea con lo que cada etapa trabajó en su hilo (reloj y CPU) y lo que
+    el hilo principal la esperó. Con varios hilos compitiendo por el GIL el
+    tiempo de reloj de cada uno se infla: la ganancia real se mide corriendo
+    con y sin solapar (medir_solapado.py).
+    """
+    partes = [f"{etapa.nombre} {etapa.ocupado:.2f} s ({etapa.cpu:.2f} s CPU, esperada {etapa.espera:.2f} s)"
+              for etapa in etapas if etapa is not None]
+    return f"🔀 E/S en {segundos:.2f} s: {', '.join(partes)}"
@@ -0,0 +1,179 @@
+import re
+from textwrap import dedent
+
+from comun.escritor_partes import EscritorPartes
+
+REGEX_IDENTIFICADOR = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_SIN_VALOR = object()   # Marca de "sin valor pendiente" (None es un valor válido: NULL)
+
+def _sql_texto(valor):
+    if valor is None:
+        return "NULL"
+    return "'" + str(valor).replace("'", "''").strip() + "'"
+
+def _validar_identificador(nombre):
+    if not REGEX_IDENTIFICADOR.match(nombre):
+        raise ValueError(f"❌ Nombre de columna o tabla no válido: {nombre!r}")
+    return nombre
+
+def sql_update_in(tabla, clave, columna, valor, ids):
+    return (
+        f"UPDATE {tabla}\n"
+        f"SET {columna} = {_sql_texto(valor)}\n"
+        f"WHERE {clave} IN (\n"
+        + ",\n".join(f"    {_sql_texto(i)}" for i in ids)
+        + "\n);\nGO\n\n"
+    )
+
+def sql_crear_staging(tabla_staging):
+    return dedent(f"""
+        IF OBJECT_ID('{tabla_staging}', 'U') IS NOT NULL DROP TABLE {tabla_staging};
+        CREATE TABLE {tabla_staging} (
+            orden INT NOT NULL,
+            identificacion VARCHAR(50) NOT NULL,
+            columna SYSNAME NOT NULL,
+            valor NVARCHAR(255) NULL
+        );
+        GO
+
+    """).lstrip()
+
+def sql_update_desde_staging(tabla, clave, columna, tabla_staging):
+    # Si un ID trae varios valores para la columna, gana el último del flujo (mayor `orden`)
+    return dedent(f"""
+        UPDATE t
+        SET t.{columna} = s.valor
+        FROM {tabla} t
+        JOIN (
+            SELECT identificacion, valor,
+                   ROW_NUMBER() OVER (PARTITION BY identificacion ORDER BY orden DESC) AS n
+            FROM {tabla_staging}
+            WHERE columna = '{columna}'
+        ) s ON s.identificacion = t.{clave} AND s.n = 1;
+        GO
+
+    """).lstrip()
+
+class UpdateMasivo:
+    """
+    Motor de UPDATE masivos a partir de tripletas (identificacion, columna, valor).
+
+    modo="in": agrupa los IDs por (columna, valor) y escribe un
+    `UPDATE ... SET columna = valor WHERE clave IN (...)` cada `ids_por_update`
+    IDs. Como mucho se tienen `max_pendientes` IDs en memoria: al pasarse se
+    vacía el grupo más grande aunque no esté lleno.
+
+    modo="staging": carga las tripletas en `tabla_staging` con INSERT por lotes
+    y al final escribe un `UPDATE ... FROM ... JOIN` por cada columna tocada.
+
+    En los dos modos, si un ID recibe varios valores para la misma columna gana
+    el último del flujo: en "in" el ID sale del grupo pendiente del valor
+    anterior (si ese grupo ya se escribió, el UPDATE nuevo va después); en
+    "staging" cada fila lleva su `orden` y el UPDATE toma la mayor. Un valor
+    None se escribe como NULL.
+
+    La salida se reparte en archivos con EscritorPartes (presupuesto en bytes,
+    compresión opcional y manifest); con `diferido`, escritos desde un hilo aparte.
+    """
+
+    def __init__(self, carpeta, patron, base_datos, tabla="t_tercero", clave="identificacion",
+                 modo="in", ids_por_update=1000, max_pendientes=100000,
+                 max_bytes=None, compresion=None, manifest="manifest.json",
+                 tabla_staging="t_update_staging", al_abrir=None, diferido=False):
+        if modo not in ("in", "staging"):
+            raise ValueError(f"❌ Modo no soportado: {modo}")
+        self.tabla = _validar_identificador(tabla)
+        self.clave = _validar_identificador(clave)
+        self.tabla_staging = _validar_identificador(tabla_staging)
+        self.modo = modo
+        self.ids_por_update = ids_por_update
+        self.max_pendientes = max_pendientes
+        self.grupos = {}            # (columna, valor) -> {identificacion: None}, en orden de llegada
+        self.valor_pendiente = {}   # (identificacion, columna) -> valor, de los IDs en self.grupos
+        self.pendientes = 0
+        self.columnas = set()
+        self.lote_staging = []
+        self.total = 0
+
+        cabecera = f"USE {base_datos};\nGO\n\n"
+        if modo == "staging":
+            def cabecera(parte, base=cabecera):
+                return base + sql_crear_staging(self.tabla_staging) if parte == 1 else base
+
+        self.escritor = EscritorPartes(
+            carpeta, patron, cabecera=cabecera, max_bytes=max_bytes,
+            compresion=compresion, manifest=manifest, al_abrir=al_abrir, diferido=diferido,
+        )
+
+    def agregar(self, identificacion, columna, valor):
+        columna = _validar_identificador(columna)
+        self.total += 1
+        if self.modo == "staging":
+            self.columnas.add(columna)
+            self.lote_staging.append((self.total, identificacion, columna, valor))
+            if len(self.lote_staging) == self.ids_por_update:
+                self._volcar_staging()
+            return
+
+        anterior = self.valor_pendiente.pop((identificacion, columna), _SIN_VALOR)
+        if anterior is not _SIN_VALOR:
+            # Gana el último valor: el ID sale del grupo del valor anterior
+            ids_anteriores = self.grupos[(columna, anterior)]
+            del ids_anteriores[identificacion]
+            self.pendientes -= 1
+            if not ids_anteriores:
+                del self.grupos[(columna, anterior)]
+        ids = self.grupos.setdefault((columna, valor), {})
+        ids[identificacion] = None
+        self.valor_pendiente[(identificacion, columna)] = valor
+        self.pendientes += 1
+        if len(ids) == self.ids_por_update:
+            self._volcar_grupo((columna, valor))
+        elif self.pendientes > self.max_pendientes:
+            self._volcar_grupo(max(self.grupos, key=lambda k: len(self.grupos[k])))
+
+    def agregar_todos(self, tripletas):
+        for identificacion, columna, valor in tripletas:
+            self.agregar(identificacion, columna, valor)
+        return self
+
+    def _volcar_grupo(self, grupo):
+        ids = list(self.grupos.pop(grupo))
+        self.pendientes -= len(ids)
+        columna, valor = grupo
+        for identificacion in ids:
+            del self.valor_pendiente[(identificacion, columna)]
+        self.escritor.escribir(sql_update_in(self.tabla, self.clave, columna, valor, ids), filas=len(ids))
+
+    def _volcar_staging(self):
+        valores = ",\n".join(
+            f"({n}, {_sql_texto(i)}, '{c}', {_sql_texto(v)})" for n, i, c, v in self.lote_staging
+        )
+        self.escritor.escribir(
+            f"INSERT INTO {self.tabla_staging} (orden, identificacion, columna, valor) VALUES\n{valores};\nGO\n\n",
+            filas=len(self.lote_staging),
+        )
+        self.lote_staging = []
+
+    def cerrar(self):
+        if self.modo == "staging":
+            if self.lote_staging:
+                self._volcar_staging()
+            for columna in sorted(self.columnas):
+                self.escritor.escribir(sql_update_desde_staging(self.tabla, self.clave, columna, self.tabla_staging))
+            if self.columnas:
+                self.escritor.escribir(f"DROP TABLE {self.tabla_staging};\nGO\n")
+        else:
+            for grupo in list(self.grupos):
+                self._volcar_grupo(grupo)
+        return self.escritor.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.escritor.__exit__(tipo, valor, traza)
+        return False
@@ -0,0 +1,86 @@
+"""
+Compara la limpieza para ISO-8859-1 anterior (NFKD + encode latin-1 'ignore'
+celda por celda) con la tabla de traducción de procesador.convertidor, y
+comprueba que los nombres con tildes y eñes sobreviven.
+
+Uso: python comparar_limpieza_iso.py [filas]
+"""
+import random
+import sys
+import time
+import unicodedata
+
+import pandas as pd
+
+from procesador.convertidor import limpiar_serie_para_iso, limpiar_texto_para_iso, tabla_latin1
+
+NOMBRES_CON_TILDES = {
+    'José Núñez': 'José Núñez',
+    'MARÍA ÁNGELES PEÑA': 'MARÍA ÁNGELES PEÑA',
+    'Begoña Ibáñez': 'Begoña Ibáñez',
+    'Güemes Muñoz': 'Güemes Muñoz',
+    'Nun\u0303ez': 'Nuñez',   # ñ escrita como n + tilde combinada
+    'Łukasz Wałęsa': 'Lukasz Walesa',
+    'Ana “la” Pérez': 'Ana "la" Pérez',
+    'Ｊｕａｎ': 'Juan',
+    'Zoë 李': 'Zoë ',
+}
+
+def limpiar_texto_para_iso_anterior(texto):
+    try:
+        texto = unicodedata.normalize('NFKD', texto).encode('latin-1', 'ignore').decode('latin-1')
+        return texto
+    except:
+        return ""
+
+def comprobar_tildes():
+    for original, esperado in NOMBRES_CON_TILDES.items():
+        obtenido = limpiar_texto_para_iso(original)
+        if obtenido != esperado:
+            raise AssertionError(f"❌ {original!r}: se esperaba {esperado!r} y se obtuvo {obtenido!r}")
+        obtenido.encode('latin-1')
+
+    # object y texto (StringDtype: lo que da dtype=str al leer con pandas 3)
+    for dtype in (object, pd.StringDtype()):
+        serie = pd.Series(list(NOMBRES_CON_TILDES) + [None], dtype=dtype)
+        limpia = limpiar_serie_para_iso(serie)
+        if limpia.tolist()[:-1] != list(NOMBRES_CON_TILDES.values()) or not pd.isna(limpia.iloc[-1]):
+            raise AssertionError(f"❌ limpiar_serie_para_iso ({serie.dtype}) no coincide: {limpia.tolist()}")
+
+    print(f"✅ {len(NOMBRES_CON_TILDES)} nombres con tildes, eñes y símbolos limpiados como se esperaba")
+    for original in ['José Núñez', 'Begoña Ibáñez']:
+        print(f"   anterior: {original!r} -> {limpiar_texto_para_iso_anterior(original)!r}")
+
+def medir(filas):
+    random.seed(0)
+    base = ['JUAN PEREZ', 'MARIA GOMEZ', 'José Núñez', 'Begoña Ibáñez', 'CARLOS RUIZ',
+            'ANA MARTINEZ', 'Łukasz Wałęsa', 'LUIS “EL” DIAZ']
+    serie = pd.Series(random.choices(base, weights=[30, 30, 10, 10, 10, 8, 1, 1], k=filas))
+
+    tabla_latin1.cache_clear()
+    inicio = time.perf_counter()
+    tabla_latin1()
+    tiempo_tabla = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    serie.apply(lambda x: limpiar_texto_para_iso_anterior(str(x)))
+    tiempo_anterior = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    serie.map(limpiar_texto_para_iso)
+    tiempo_celda = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    limpiar_serie_para_iso(serie)
+    tiempo_serie = time.perf_counter() - inicio
+
+    print(f"⏱️  {filas} celdas")
+    print(f"   tabla BMP (una vez por proceso): {tiempo_tabla:.3f} s")
+    print(f"   anterior (NFKD por celda):       {tiempo_anterior:.3f} s")
+    print(f"   tabla, celda por celda:          {tiempo_celda:.3f} s")
+    print(f"   tabla, por columna:              {tiempo_serie:.3f} s "
+          f"({tiempo_anterior / tiempo_serie:.1f}x)")
+
+if __name__ == "__main__":
+    comprobar_tildes()
+    medir(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -1,35 +1,56 @@
+import argparse
 import os
-from procesador.lector_csv import procesar_archivos_csv
-from procesador.convertidor import guardar_json
+import sys
+import time
+from procesador.conversion import (
+    CARPETAS_SALIDA, convertir_archivos, convertir_en_fragmentos, imprimir_resumen,
+)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.memoria import parsear_tamano
 
 def main():
+    parser = argparse.ArgumentParser(description="Convierte los CSV de 'entrada' a JSON en UTF-8 e ISO-8859-1")
+    parser.add_argument('--formato', choices=['json', 'ndjson'], default='json',
+                        help="json: un arreglo por archivo; ndjson: un registro por línea")
+    parser.add_argument('--gzip', action='store_true', help="Comprime cada salida con gzip (.gz)")
+    parser.add_argument('--tamano-bloque', type=int, default=100000,
+                        help="Filas leídas del CSV por bloque (por defecto 100000)")
+    parser.add_argument('--trabajadores', type=int, default=1,
+                        help="Procesos en paralelo: archivos a la vez o, con --registros-por-fragmento, "
+                             "fragmentos a la vez (por defecto 1)")
+    parser.add_argument('--registros-por-fragmento', type=int, default=None,
+                        help="Parte cada salida en <nombre>_parte_N.json de este número de registros")
+    parser.add_argument('--max-memory', type=parsear_tamano, default=None, metavar='TAMAÑO',
+                        help="Presupuesto de memoria (p. ej. 512M, 2G): fija el tamaño de los bloques y "
+                             "buffers en vez de --tamano-bloque, y los achica si el proceso se pasa")
+    args = parser.parse_args()
+
     carpeta_entrada = "entrada"
-    carpeta_salida_utf8 = os.path.join("salida", "utf8")
-    carpeta_salida_iso = os.path.join("salida", "iso8859")
 
     # Crear carpetas de salida si no existen
-    os.makedirs(carpeta_salida_utf8, exist_ok=True)
-    os.makedirs(carpeta_salida_iso, exist_ok=True)
-
-    archivos = [f for f in os.listdir(carpeta_entrada) if f.endswith('.csv')]
-
-    for archivo in archivos:
-        ruta_csv = os.path.join(carpeta_entrada, archivo)
-        print(f"[INFO] Procesando {archivo}...")
-
-        df = procesar_archivos_csv(ruta_csv)
-
-        nombre_salida = archivo.replace('.csv', '.json')
-
-        # Guardar en UTF-8
-        ruta_utf8 = os.path.join(carpeta_salida_utf8, nombre_salida)
-        guardar_json(df, ruta_utf8, encoding='utf-8')
-        print(f"  ↳ Guardado en: {ruta_utf8} (UTF-8)")
-
-        # Guardar en ISO-8859-1
-        ruta_iso = os.path.join(carpeta_salida_iso, nombre_salida)
-        guardar_json(df, ruta_iso, encoding='iso-8859-1')
-        print(f"  ↳ Guardado en: {ruta_iso} (ISO-8859-1)")
+    for carpeta in CARPETAS_SALIDA.values():
+        os.makedirs(carpeta, exist_ok=True)
+
+    archivos = sorted(f for f in os.listdir(carpeta_entrada) if f.endswith('.csv'))
+    rutas_csv = [os.path.join(carpeta_entrada, archivo) for archivo in archivos]
+
+    inicio = time.perf_counter()
+    if args.registros_por_fragmento:
+        # Un archivo a la vez; los fragmentos de cada uno se escriben en paralelo
+        resumenes = [
+            convertir_en_fragmentos(ruta_csv, args.registros_por_fragmento, args.trabajadores,
+                                    formato=args.formato, comprimir=args.gzip, max_memoria=args.max_memory)
+            for ruta_csv in rutas_csv
+        ]
+    else:
+        resumenes = convertir_archivos(rutas_csv, trabajadores=args.trabajadores, formato=args.formato,
+                                       comprimir=args.gzip, tamano_bloque=args.tamano_bloque,
+                                       max_memoria=args.max_memory)
+
+    imprimir_resumen(resumenes, time.perf_counter() - inicio)
+    if any(r["error"] for r in resumenes):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
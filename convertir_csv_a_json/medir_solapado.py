@@ -0,0 +1,75 @@
+"""
+Mide cuánto tiempo de reloj ahorra leer y escribir en hilos aparte
+(procesador.conversion.SOLAPAR_IO) al convertir un CSV a JSON: corre la misma
+conversión con y sin solapar, alternando, y compara el mejor tiempo de cada
+modo. También comprueba que las salidas de los dos modos son idénticas.
+
+Con un solo núcleo no se espera ganancia: los hilos solo se turnan el GIL.
+La ganancia viene de lo que corre sin el GIL en otro núcleo (zlib al
+comprimir, el parser de pandas, las esperas de disco).
+
+Uso: python medir_solapado.py [filas] [repeticiones] [--gzip]
+"""
+import hashlib
+import os
+import random
+import sys
+import tempfile
+
+from procesador import conversion
+
+def generar_csv(ruta, filas):
+    random.seed(0)
+    nombres = ['JUAN PEREZ', 'MARIA GOMEZ', 'José Núñez', 'Begoña Ibáñez', 'CARLOS RUIZ', '']
+    ciudades = ['BOGOTA', 'MEDELLIN', 'CALI', '']
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write('nombre;apellido;documento;tipo id;ciudad\n')
+        for i in range(filas):
+            f.write(f"{random.choice(nombres)};{random.choice(nombres)};{random.randint(10**5, 10**10)};"
+                    f"CC;{random.choice(ciudades)}\n")
+
+def huella(carpetas):
+    sha256 = hashlib.sha256()
+    for carpeta in sorted(carpetas.values()):
+        for nombre in sorted(os.listdir(carpeta)):
+            with open(os.path.join(carpeta, nombre), 'rb') as f:
+                sha256.update(f.read())
+    return sha256.hexdigest()
+
+def medir(filas, repeticiones, comprimir):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'datos.csv')
+        generar_csv(ruta, filas)
+        tiempos = {False: [], True: []}
+        huellas = {}
+        for _ in range(repeticiones):
+            for solapar in (False, True):
+                conversion.SOLAPAR_IO = solapar
+                carpetas = {encoding: os.path.join(carpeta, 'solapado' if solapar else 'secuencial', encoding)
+                            for encoding in ('utf-8', 'iso-8859-1')}
+                for destino in carpetas.values():
+                    os.makedirs(destino, exist_ok=True)
+                resumen = conversion.convertir_archivo(ruta, comprimir=comprimir, carpetas=carpetas)
+                if resumen['error']:
+                    raise RuntimeError(resumen['error'])
+                tiempos[solapar].append(resumen['segundos'])
+                huellas[solapar] = huella(carpetas)
+                if solapar:
+                    ultima_linea = next(l for l in resumen['lineas'] if '🔀' in l).strip()
+
+    if huellas[False] != huellas[True]:
+        raise AssertionError("❌ Las salidas con y sin solapar no coinciden")
+
+    secuencial, solapado = min(tiempos[False]), min(tiempos[True])
+    print(f"⏱️  {filas} filas, {'gzip' if comprimir else 'sin comprimir'}, "
+          f"mejor de {repeticiones}, {os.cpu_count()} núcleo(s)")
+    print(f"   secuencial: {secuencial:.2f} s")
+    print(f"   solapado:   {solapado:.2f} s ({(secuencial - solapado) / secuencial:+.1%})")
+    print(f"   {ultima_linea}")
+    print("✅ Salidas idénticas en los dos modos")
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    medir(int(argumentos[0]) if argumentos else 500000,
+          int(argumentos[1]) if len(argumentos) > 1 else 3,
+          '--gzip' in sys.argv)
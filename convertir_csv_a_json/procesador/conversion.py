@@ -0,0 +1,220 @@
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from .lector_csv import OPCIONES_LECTURA, leer_csv_por_bloques
+from .convertidor import BUFFER_ESCRITURA, exportar_json
+from .utilidades import estandarizar_columnas
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.memoria import MB, GobernadorMemoria, medir_muestra
+from comun.solapado import SOLAPAR_POR_DEFECTO, EscrituraDiferida, LecturaAdelantada, escribir_en, resumen_solapado
+
+EXTENSIONES = {'json': '.json', 'ndjson': '.ndjson'}
+CARPETAS_SALIDA = {'utf-8': os.path.join("salida", "utf8"), 'iso-8859-1': os.path.join("salida", "iso8859")}
+NOMBRES_ENCODING = {'utf-8': 'UTF-8', 'iso-8859-1': 'ISO-8859-1'}
+
+# Con max_memoria: mientras se serializa, un bloque ocupa unas FACTOR_TRABAJO veces lo que
+# recién leído (copia limpia para ISO y el texto JSON de cada encoding)
+FACTOR_TRABAJO = 6.0
+# Leer el bloque siguiente y escribir el anterior en hilos aparte mientras se serializa el actual.
+# Los bloques leídos por adelantado se suman al factor de trabajo. Solo con más de un núcleo.
+SOLAPAR_IO = SOLAPAR_POR_DEFECTO
+BLOQUES_ADELANTADOS = 1
+FRACCION_BLOQUE = 0.6
+FRACCION_SALIDA = 0.05          # Para los buffers de escritura, repartida entre las salidas
+
+def _extension(formato, comprimir):
+    return EXTENSIONES[formato] + ('.gz' if comprimir else '')
+
+def _rutas_salida(nombre_salida, carpetas):
+    return {encoding: os.path.join(carpeta, nombre_salida) for encoding, carpeta in carpetas.items()}
+
+def _resumen(archivo, ruta_csv):
+    return {
+        "archivo": archivo,
+        "filas": 0,
+        "bytes_entrada": os.path.getsize(ruta_csv) if os.path.exists(ruta_csv) else 0,
+        "bytes_salida": 0,
+        "salidas": [],
+        "segundos": 0.0,
+        "lineas": [f"[INFO] Procesando {archivo}..."],
+        "error": None,
+    }
+
+def convertir_archivo(ruta_csv, formato='json', comprimir=False, tamano_bloque=100000, carpetas=None,
+                      max_memoria=None):
+    """
+    Convierte un CSV a JSON en todas las `carpetas` ({encoding: carpeta}).
+    Nunca lanza excepción: el error queda en el resumen para que un archivo
+    dañado no detenga a los demás. Las líneas de progreso se devuelven en
+    "lineas" para imprimirlas en orden desde el proceso principal.
+
+    Con `max_memoria` (bytes) el tamaño de los bloques y de los buffers de
+    escritura sale de ese presupuesto y no de `tamano_bloque`.
+    """
+    carpetas = carpetas or CARPETAS_SALIDA
+    archivo = os.path.basename(ruta_csv)
+    inicio = time.perf_counter()
+    resumen = _resumen(archivo, ruta_csv)
+    try:
+        rutas = _rutas_salida(archivo[:-len('.csv')] + _extension(formato, comprimir), carpetas)
+        gobernador = None
+        buffer = BUFFER_ESCRITURA
+        if max_memoria:
+            factor = FACTOR_TRABAJO + (1 + BLOQUES_ADELANTADOS if SOLAPAR_IO else 0)
+            gobernador = GobernadorMemoria.desde_muestra(ruta_csv, max_memoria, factor, FRACCION_BLOQUE,
+                                                         **OPCIONES_LECTURA)
+            buffer = gobernador.buffer(FRACCION_SALIDA / len(rutas))
+        bloques = leer_csv_por_bloques(ruta_csv, tamano_bloque, gobernador)
+        lectura = None
+        if SOLAPAR_IO:
+            bloques = lectura = LecturaAdelantada(bloques, BLOQUES_ADELANTADOS, nombre="lectura csv")
+        with EscrituraDiferida(escribir_en, nombre="escritura json", en_hilo=SOLAPAR_IO) as escritura:
+            resumen["filas"] = exportar_json(bloques, rutas, formato=formato, comprimir=comprimir,
+                                             buffer=buffer, escritura=escritura)
+        resumen["lineas"].append(f"  {resumen_solapado(time.perf_counter() - inicio, lectura, escritura)}")
+        if gobernador:
+            gobernador.revisar()
+            resumen["lineas"].append(f"  {gobernador.resumen()}")
+        for encoding, ruta in rutas.items():
+            resumen["bytes_salida"] += os.path.getsize(ruta)
+            resumen["salidas"].append(ruta)
+            resumen["lineas"].append(f"  ↳ Guardado en: {ruta} ({NOMBRES_ENCODING.get(encoding, encoding)})")
+    except Exception:
+        resumen["error"] = traceback.format_exc()
+        resumen["lineas"].append(f"  ❌ Error en {archivo}:\n{resumen['error']}")
+    resumen["segundos"] = time.perf_counter() - inicio
+    return resumen
+
+def convertir_bloques(bloques, archivo, formato='json', comprimir=False, carpetas=None):
+    """
+    Como convertir_archivo, pero desde bloques (DataFrames) que ya están en
+    memoria, p. ej. los de ejecutar_pipeline.bloques_procesados, sin leer un
+    CSV; `archivo` da el nombre de las salidas. Los bloques no se modifican.
+    Devuelve (registros escritos, {encoding: ruta}).
+    """
+    carpetas = carpetas or CARPETAS_SALIDA
+    for carpeta in carpetas.values():
+        os.makedirs(carpeta, exist_ok=True)
+    rutas = _rutas_salida(os.path.splitext(archivo)[0] + _extension(formato, comprimir), carpetas)
+    filas = exportar_json(map(estandarizar_columnas, bloques), rutas, formato=formato, comprimir=comprimir)
+    return filas, rutas
+
+def _escribir_fragmento(bloque, rutas, formato, comprimir):
+    exportar_json([bloque], rutas, formato=formato, comprimir=comprimir)
+    return sum(os.path.getsize(ruta) for ruta in rutas.values())
+
+def convertir_en_fragmentos(ruta_csv, registros_por_fragmento, trabajadores=None, formato='json',
+                            comprimir=False, carpetas=None, max_memoria=None):
+    """
+    Parte un CSV grande en fragmentos numerados de `registros_por_fragmento`
+    registros (<nombre>_parte_N.json). El proceso principal lee el CSV por
+    bloques y cada bloque se serializa y escribe en un proceso del pool; como
+    mucho hay 2 × trabajadores fragmentos en memoria esperando, o menos si
+    con `max_memoria` (bytes) no caben tantos.
+    """
+    carpetas = carpetas or CARPETAS_SALIDA
+    archivo = os.path.basename(ruta_csv)
+    inicio = time.perf_counter()
+    resumen = _resumen(archivo, ruta_csv)
+    print(resumen["lineas"][0], flush=True)
+    extension = _extension(formato, comprimir)
+    trabajadores = trabajadores or os.cpu_count() or 1
+    max_pendientes = 2 * trabajadores
+    if max_memoria:
+        bytes_fila, _ = medir_muestra(ruta_csv, **OPCIONES_LECTURA)
+        por_fragmento = max(registros_por_fragmento * bytes_fila * FACTOR_TRABAJO, 1)
+        max_pendientes = max(1, min(max_pendientes, int(max_memoria // por_fragmento)))
+        print(f"  🧮 ~{por_fragmento / MB:.0f} MB por fragmento: como mucho {max_pendientes} en memoria",
+              flush=True)
+        if por_fragmento > max_memoria:
+            print(f"  ⚠️ Un fragmento de {registros_por_fragmento} registros no cabe en "
+                  f"{max_memoria / MB:.0f} MB; usa un --registros-por-fragmento menor", flush=True)
+
+    pendientes = []
+
+    def recoger(futuro, rutas, filas):
+        resumen["bytes_salida"] += futuro.result()
+        resumen["salidas"].extend(rutas.values())
+        resumen["filas"] += filas
+        for encoding, ruta in rutas.items():
+            print(f"  ↳ Guardado en: {ruta} ({NOMBRES_ENCODING.get(encoding, encoding)}, {filas} registros)",
+                  flush=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+            bloques = leer_csv_por_bloques(ruta_csv, registros_por_fragmento)
+            for parte, bloque in enumerate(bloques, start=1):
+                rutas = _rutas_salida(f"{archivo[:-len('.csv')]}_parte_{parte}{extension}", carpetas)
+                pendientes.append((pool.submit(_escribir_fragmento, bloque, rutas, formato, comprimir),
+                                   rutas, len(bloque)))
+                # Los fragmentos se reportan en orden; se espera al más antiguo si hay demasiados
+                while len(pendientes) >= max_pendientes or (pendientes and pendientes[0][0].done()):
+                    recoger(*pendientes.pop(0))
+            while pendientes:
+                recoger(*pendientes.pop(0))
+    except Exception:
+        resumen["error"] = traceback.format_exc()
+        print(f"  ❌ Error en {archivo}:\n{resumen['error']}", flush=True)
+    resumen["segundos"] = time.perf_counter() - inicio
+    resumen["lineas"] = []
+    return resumen
+
+def convertir_archivos(rutas_csv, trabajadores=1, formato='json', comprimir=False, tamano_bloque=100000,
+                       carpetas=None, max_memoria=None):
+    """
+    Convierte varios CSV; con más de un trabajador, varios archivos a la vez
+    en procesos separados. El progreso de cada archivo se imprime completo y
+    en el orden de `rutas_csv`, aunque otro archivo termine antes. El
+    presupuesto `max_memoria` se reparte por igual entre los procesos.
+    """
+    if trabajadores <= 1 or len(rutas_csv) <= 1:
+        resumenes = []
+        for ruta_csv in rutas_csv:
+            resumen = convertir_archivo(ruta_csv, formato, comprimir, tamano_bloque, carpetas, max_memoria)
+            print("\n".join(resumen["lineas"]), flush=True)
+            resumenes.append(resumen)
+        return resumenes
+
+    memoria_por_proceso = max_memoria // min(trabajadores, len(rutas_csv)) if max_memoria else None
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        futuros = [pool.submit(convertir_archivo, ruta_csv, formato, comprimir, tamano_bloque, carpetas,
+                               memoria_por_proceso)
+                   for ruta_csv in rutas_csv]
+        resumenes = []
+        for ruta_csv, futuro in zip(rutas_csv, futuros):
+            try:
+                resumen = futuro.result()
+            except Exception:
+                # El proceso trabajador murió (memoria, señal...): se reporta como error del archivo
+                resumen = _resumen(os.path.basename(ruta_csv), ruta_csv)
+                resumen["error"] = traceback.format_exc()
+                resumen["lineas"].append(f"  ❌ Error en {resumen['archivo']}:\n{resumen['error']}")
+            print("\n".join(resumen["lineas"]), flush=True)
+            resumenes.append(resumen)
+    return resumenes
+
+def imprimir_resumen(resumenes, segundos_totales):
+    print("\n📊 Resumen")
+    print(f"{'archivo':<40} {'filas':>12} {'MB entrada':>11} {'MB salida':>10} {'seg':>8} {'filas/s':>10} {'MB/s':>7}")
+    for r in resumenes:
+        mb_entrada = r["bytes_entrada"] / 1e6
+        segundos = max(r["segundos"], 1e-9)
+        estado = "  ❌" if r["error"] else ""
+        print(f"{r['archivo'][:40]:<40} {r['filas']:>12} {mb_entrada:>11.1f} {r['bytes_salida'] / 1e6:>10.1f} "
+              f"{r['segundos']:>8.2f} {r['filas'] / segundos:>10.0f} {mb_entrada / segundos:>7.1f}{estado}")
+
+    filas = sum(r["filas"] for r in resumenes)
+    mb_entrada = sum(r["bytes_entrada"] for r in resumenes) / 1e6
+    segundos = max(segundos_totales, 1e-9)
+    fallidos = [r["archivo"] for r in resumenes if r["error"]]
+    print(f"{'TOTAL':<40} {filas:>12} {mb_entrada:>11.1f} "
+          f"{sum(r['bytes_salida'] for r in resumenes) / 1e6:>10.1f} {segundos_totales:>8.2f} "
+          f"{filas / segundos:>10.0f} {mb_entrada / segundos:>7.1f}")
+    if fallidos:
+        print(f"❌ {len(fallidos)} archivo(s) con error: {', '.join(fallidos)}")
+    else:
+        print(f"✅ {len(resumenes)} archivo(s) convertidos")
@@ -1,23 +1,217 @@
+import functools
+import gzip
+import os
+import numpy as np
 import pandas as pd
 import unicodedata
 
+ENCODINGS_ISO = ['latin-1', 'iso-8859-1']
+BUFFER_ESCRITURA = 1024 * 1024
+REGEX_FUERA_DE_LATIN1 = r'[^\x00-\xff]'
+
+# Equivalencias que NFKC/NFKD no resuelven (no tienen descomposición)
+EQUIVALENCIAS_LATIN1 = {
+    'Ł': 'L', 'ł': 'l', 'Đ': 'D', 'đ': 'd', 'Ħ': 'H', 'ħ': 'h', 'ı': 'i',
+    'Œ': 'OE', 'œ': 'oe', 'ſ': 's',
+    '‘': "'", '’': "'", '‚': "'", '‛': "'", '“': '"', '”': '"', '„': '"',
+    '‐': '-', '‑': '-', '‒': '-', '–': '-', '—': '-', '―': '-', '−': '-',
+    '•': '-', '€': 'EUR',
+}
+
+class _TablaLatin1(dict):
+    """Tabla para str.translate; latin-1 se conserva y lo que está fuera del BMP se elimina."""
+
+    def __missing__(self, codigo):
+        return codigo if codigo < 256 else None
+
+def _equivalente_latin1(caracter):
+    if caracter in EQUIVALENCIAS_LATIN1:
+        return EQUIVALENCIAS_LATIN1[caracter]
+    compuesto = unicodedata.normalize('NFKC', caracter)
+    if all(ord(c) < 256 for c in compuesto):
+        return compuesto
+    # Sin equivalente directo: letra base sin marcas (ā -> a, ș -> s) o nada
+    base = ''.join(c for c in unicodedata.normalize('NFKD', caracter)
+                   if ord(c) < 256 and not unicodedata.combining(c))
+    return base or None
+
+@functools.lru_cache(maxsize=None)
+def tabla_latin1():
+    """
+    Tabla de traducción para todo el BMP: cada carácter fuera de latin-1 se
+    cambia por su mejor equivalente latin-1 o se elimina. Los caracteres que
+    latin-1 ya representa (á, ñ, ü...) no están en la tabla y se conservan.
+    Se construye una sola vez por proceso.
+    """
+    tabla = _TablaLatin1((codigo, codigo) for codigo in range(256))
+    for codigo in range(256, 0x10000):
+        if 0xD800 <= codigo <= 0xDFFF:
+            tabla[codigo] = None
+        else:
+            tabla[codigo] = _equivalente_latin1(chr(codigo))
+    return tabla
+
 def limpiar_texto_para_iso(texto):
     try:
-        # Normaliza a ASCII-compatible, elimina caracteres no convertibles
-        texto = unicodedata.normalize('NFKD', texto).encode('latin-1', 'ignore').decode('latin-1')
-        return texto
+        # NFC junta letra + tilde combinada (n + ̃  -> ñ) antes de traducir
+        if texto.isascii():
+            return texto
+        return unicodedata.normalize('NFC', texto).translate(tabla_latin1())
     except:
         return ""  # En caso de fallo, devolver cadena vacía
 
+def limpiar_serie_para_iso(serie):
+    """
+    Versión por columna de `limpiar_texto_para_iso`: solo las celdas con algún
+    carácter fuera de latin-1 pasan por NFC + translate; el resto y los nulos
+    quedan igual. Primero se descartan las celdas ASCII (str.isascii, en C) y
+    la expresión regular solo revisa las demás. Acepta columnas object y de
+    texto (StringDtype, lo que da dtype=str en pandas 3); las demás quedan igual.
+    """
+    if serie.dtype != object and not isinstance(serie.dtype, pd.StringDtype):
+        return serie
+    valores = serie.to_numpy()
+    no_ascii = np.fromiter((type(v) is str and not v.isascii() for v in valores),
+                           dtype=bool, count=len(valores))
+    if not no_ascii.any():
+        return serie
+    candidatos = serie[no_ascii]
+    fuera = candidatos.str.contains(REGEX_FUERA_DE_LATIN1, regex=True, na=False)
+    if not fuera.any():
+        return serie
+    fuera = fuera.to_numpy()
+    serie = serie.copy()
+    serie.iloc[np.flatnonzero(no_ascii)[fuera]] = (
+        candidatos[fuera].str.normalize('NFC').str.translate(tabla_latin1()).to_numpy()
+    )
+    return serie
+
 def limpiar_dataframe_para_iso(df):
+    df = df.copy()
     for col in df.columns:
-        df[col] = df[col].apply(lambda x: limpiar_texto_para_iso(str(x)))
+        df[col] = limpiar_serie_para_iso(df[col].astype(str))
     return df
 
 def guardar_json(df, ruta_salida, encoding='utf-8'):
     # Si se está guardando como ISO-8859-1, limpiar caracteres incompatibles
-    if encoding.lower() in ['latin-1', 'iso-8859-1']:
+    if encoding.lower() in ENCODINGS_ISO:
         df = limpiar_dataframe_para_iso(df)
 
     with open(ruta_salida, 'w', encoding=encoding) as f:
         df.to_json(f, orient='records', indent=2, force_ascii=False)
+
+def _limpiar_bloque_para_iso(bloque):
+    """
+    Copia del bloque con las columnas de texto limpiadas para ISO; los nulos
+    siguen siendo null. Lo que quede en otras columnas (p. ej. categorías) lo
+    limpia _SalidaJSON al codificar.
+    """
+    return bloque.apply(limpiar_serie_para_iso)
+
+def _registros_ndjson(bloque):
+    # to_json escapa los saltos de línea dentro de los textos: cada línea es un registro
+    texto = bloque.to_json(orient='records', lines=True, force_ascii=False)
+    return texto if texto.endswith('\n') else texto + '\n'
+
+class _SalidaJSON:
+    """
+    Archivo de salida binario con buffer grande; se escribe como .parcial y se
+    renombra al cerrar. Con `escritura` (comun.solapado.EscrituraDiferida) los
+    bytes ya codificados se comprimen y escriben en ese hilo.
+    """
+
+    def __init__(self, ruta, encoding, formato, comprimir, buffer=BUFFER_ESCRITURA, escritura=None):
+        self.ruta = ruta
+        self.encoding = encoding
+        self.formato = formato
+        self.escritura = escritura
+        self.primero = True
+        self.archivo = open(ruta + '.parcial', 'wb', buffering=buffer)
+        self.salida = (gzip.GzipFile(filename='', mode='wb', fileobj=self.archivo, mtime=0)
+                       if comprimir else self.archivo)
+        if formato == 'json':
+            self.salida.write(b'[\n')
+
+    def escribir(self, registros):
+        if self.formato == 'json':
+            registros = registros[:-1].replace('\n', ',\n')
+            if not self.primero:
+                registros = ',\n' + registros
+        try:
+            datos = registros.encode(self.encoding)
+        except UnicodeEncodeError:
+            if self.encoding.lower() not in ENCODINGS_ISO:
+                raise
+            # Texto que la limpieza por columna no alcanzó: se limpia el bloque ya serializado
+            # (la sintaxis JSON es ASCII y no cambia)
+            datos = unicodedata.normalize('NFC', registros).translate(tabla_latin1()).encode(self.encoding)
+        if self.escritura:
+            self.escritura.poner(self.salida, datos)
+        else:
+            self.salida.write(datos)
+        self.primero = False
+
+    def cerrar(self):
+        if self.escritura:
+            self.escritura.esperar()
+        if self.formato == 'json':
+            self.salida.write(b']' if self.primero else b'\n]')
+        if self.salida is not self.archivo:
+            self.salida.close()
+        self.archivo.flush()
+        os.fsync(self.archivo.fileno())
+        self.archivo.close()
+        os.replace(self.ruta + '.parcial', self.ruta)
+
+    def descartar(self):
+        if self.salida is not self.archivo:
+            self.salida.close()
+        self.archivo.close()
+        os.remove(self.ruta + '.parcial')
+
+def exportar_json(bloques, salidas, formato='json', comprimir=False, buffer=BUFFER_ESCRITURA, escritura=None):
+    """
+    Escribe los bloques (DataFrames) en todas las `salidas` ({encoding: ruta}) en
+    una sola pasada. Cada bloque se serializa una vez por encoding y se descarta,
+    así la memoria depende del tamaño del bloque y no del archivo.
+
+    formato="json": un arreglo con un registro por línea.
+    formato="ndjson": un registro JSON por línea, sin arreglo.
+    Con `comprimir` cada salida se escribe con gzip. `buffer` es el buffer de
+    escritura de cada salida, en bytes. Con `escritura`
+    (comun.solapado.EscrituraDiferida) la compresión y la escritura en disco de
+    un bloque corren en ese hilo mientras se serializa el siguiente.
+    Devuelve el total de registros escritos.
+    """
+    if formato not in ('json', 'ndjson'):
+        raise ValueError(f"❌ Formato no soportado: {formato}")
+
+    archivos = {encoding: _SalidaJSON(ruta, encoding, formato, comprimir, buffer, escritura)
+                for encoding, ruta in salidas.items()}
+    total = 0
+    try:
+        for bloque in bloques:
+            if bloque.empty:
+                continue
+            registros_utf8 = None
+            registros_iso = None
+            for encoding, archivo in archivos.items():
+                if encoding.lower() in ENCODINGS_ISO:
+                    if registros_iso is None:
+                        registros_iso = _registros_ndjson(_limpiar_bloque_para_iso(bloque))
+                    archivo.escribir(registros_iso)
+                else:
+                    if registros_utf8 is None:
+                        registros_utf8 = _registros_ndjson(bloque)
+                    archivo.escribir(registros_utf8)
+            total += len(bloque)
+    except BaseException:
+        if escritura:
+            escritura.abortar()
+        for archivo in archivos.values():
+            archivo.descartar()
+        raise
+
+    for archivo in archivos.values():
+        archivo.cerrar()
+    return total
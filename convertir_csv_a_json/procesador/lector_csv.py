@@ -1,7 +1,24 @@
 import pandas as pd
 from .utilidades import estandarizar_columnas
 
+OPCIONES_LECTURA = dict(sep=';', dtype=str)
+
 def procesar_archivos_csv(ruta_csv):
     df = pd.read_csv(ruta_csv, sep=';')
     df = estandarizar_columnas(df)
     return df
+
+def leer_csv_por_bloques(ruta_csv, tamano_bloque=100000, gobernador=None):
+    """
+    Igual que `procesar_archivos_csv` pero entrega el archivo en bloques de
+    `tamano_bloque` filas. Todo se lee como texto: con inferencia de tipos por
+    bloque una misma columna podría salir entera en un bloque y decimal en otro.
+    Con `gobernador` (comun.memoria.GobernadorMemoria) el tamaño de cada bloque
+    lo decide él según el presupuesto de memoria.
+    """
+    if gobernador is None:
+        bloques = pd.read_csv(ruta_csv, chunksize=tamano_bloque, **OPCIONES_LECTURA)
+    else:
+        bloques = gobernador.bloques(pd.read_csv(ruta_csv, iterator=True, **OPCIONES_LECTURA))
+    for bloque in bloques:
+        yield estandarizar_columnas(bloque)
@@ -0,0 +1,81 @@
+"""
+Compara los ids que borran el modo en memoria y el modo por particiones con
+los que borraba el recorrido original (groupby + apply(calidad_registro) +
+sort_values por grupo), sobre un CSV con nombres vacíos, 'nan', nombres
+iguales al apellido, empates e identificaciones de texto.
+
+Uso: python comparar_con_original.py [filas]
+"""
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+
+import pandas as pd
+
+from procesador import (
+    OPCIONES_LECTURA, calidad_registro, calidad_registros, limpiar_ids, procesar_duplicados_por_particiones,
+    procesar_duplicados_y_generar_sql,
+)
+
+# Los del ejemplo de la revisión: se borran 1 y 3, no 2 y 4
+FILAS_FIJAS = [(1, 5, '', ''), (2, 5, 'JUAN', 'PEREZ'), (3, 6, 'ANA', ''), (4, 6, 'LUIS', 'GOMEZ')]
+NOMBRES = ['', ' ', 'nan', 'None', 'JUAN', 'ANA', 'PEREZ', 'JUAN CARLOS', 'MARIA DE LOS ANGELES', 'A B C D E']
+
+def ids_original(archivo_csv):
+    df = limpiar_ids(pd.read_csv(archivo_csv, **OPCIONES_LECTURA))
+    duplicados = df[df.duplicated(subset=['identificacion'], keep=False)]
+    ids_a_eliminar = []
+    for _, grupo in duplicados.groupby('identificacion'):
+        if len(grupo) <= 1:
+            continue
+        grupo = grupo.copy()
+        grupo['score'] = grupo.apply(calidad_registro, axis=1)
+        ids_a_eliminar.extend(grupo.sort_values(by='score').iloc[1:]['id'].tolist())
+    return sorted(ids_a_eliminar)
+
+def ids_borrados(funcion, archivo_csv, **opciones):
+    with tempfile.TemporaryDirectory() as carpeta, contextlib.redirect_stdout(io.StringIO()):
+        funcion(archivo_csv, carpeta, modo_delete="in", **opciones)
+        texto = "".join(open(os.path.join(carpeta, nombre), encoding="utf-8").read()
+                        for nombre in os.listdir(carpeta))
+    return sorted(int(id_) for lista in re.findall(r"IN \(([^)]*)\)", texto) for id_ in lista.split(", "))
+
+def escribir_muestra(archivo_csv, filas):
+    random.seed(0)
+    with open(archivo_csv, "w", encoding="utf-8") as f:
+        f.write("id,identificacion,nombres,apellidos\n")
+        for id_, identificacion, nombres, apellidos in FILAS_FIJAS:
+            f.write(f"{id_},{identificacion},{nombres},{apellidos}\n")
+        for id_ in range(len(FILAS_FIJAS) + 1, filas + 1):
+            identificacion = random.randint(10, filas // 3)
+            if identificacion % 7 == 0:
+                identificacion = f"X{identificacion}"
+            f.write(f"{id_},{identificacion},{random.choice(NOMBRES)},{random.choice(NOMBRES)}\n")
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo = os.path.join(carpeta, "duplicados.csv")
+        escribir_muestra(archivo, filas)
+
+        df = pd.read_csv(archivo, **OPCIONES_LECTURA)
+        if calidad_registros(df).tolist() != df.apply(calidad_registro, axis=1).tolist():
+            raise AssertionError("❌ calidad_registros no da el mismo puntaje que calidad_registro")
+        print(f"✅ calidad_registros = calidad_registro en {len(df)} filas")
+
+        esperados = ids_original(archivo)
+        if not {1, 3} <= set(esperados) or {2, 4} & set(esperados):
+            raise AssertionError("❌ El recorrido original debería borrar 1 y 3")
+        for modo, obtenidos in [
+            ("en memoria", ids_borrados(procesar_duplicados_y_generar_sql, archivo)),
+            ("por particiones", ids_borrados(procesar_duplicados_por_particiones, archivo,
+                                             particiones=7, tamano_bloque=filas // 5)),
+        ]:
+            if obtenidos != esperados:
+                diferentes = sorted(set(obtenidos) ^ set(esperados))
+                raise AssertionError(f"❌ {modo}: {len(diferentes)} ids distintos al original, p. ej. {diferentes[:10]}")
+            print(f"✅ {modo}: los mismos {len(esperados)} ids que el recorrido original")
@@ -1,9 +1,48 @@
-from procesador import procesar_duplicados_y_generar_sql
+import argparse
+import os
+import sys
+
+from procesador import (
+    procesar_duplicados_con_presupuesto, procesar_duplicados_por_particiones, procesar_duplicados_y_generar_sql,
+)
+from similares import detectar_similares_csv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.memoria import parsear_tamano
 
 def main():
+    parser = argparse.ArgumentParser(description="Genera los DELETE de terceros duplicados")
+    parser.add_argument("--particiones", type=int, default=0,
+                        help="Procesa el archivo fuera de memoria repartido en N particiones en disco")
+    parser.add_argument("--trabajadores", type=int, default=None,
+                        help="Procesos en paralelo para las particiones (por defecto, uno por CPU)")
+    parser.add_argument("--modo-delete", choices=["rangos", "in", "tabla_temporal"], default=None,
+                        help="rangos: BETWEEN para ids consecutivos (por defecto); in: listas IN; "
+                             "tabla_temporal: DELETE con JOIN a una tabla temporal de rangos")
+    parser.add_argument("--similares", metavar="SALIDA_CSV",
+                        help="En vez de los DELETE, lista grupos de posibles duplicados aproximados")
+    parser.add_argument("--umbral", type=float, default=0.85,
+                        help="Con --similares, similitud mínima de nombres (0 a 1)")
+    parser.add_argument("--max-memory", type=parsear_tamano, default=None, metavar="TAMAÑO",
+                        help="Presupuesto de memoria (p. ej. 512M, 2G): en memoria si el archivo cabe, si no "
+                             "por particiones (tantas como hagan falta si no se indica --particiones)")
+    args = parser.parse_args()
+
     archivo_entrada = "duplicados.csv"
     carpeta_salida = "deletes"
-    procesar_duplicados_y_generar_sql(archivo_entrada, carpeta_salida)
+    if args.similares:
+        detectar_similares_csv(archivo_entrada, args.similares, umbral=args.umbral)
+    elif args.max_memory:
+        procesar_duplicados_con_presupuesto(archivo_entrada, carpeta_salida, args.max_memory,
+                                            particiones=args.particiones, trabajadores=args.trabajadores,
+                                            modo_delete=args.modo_delete)
+    elif args.particiones:
+        procesar_duplicados_por_particiones(archivo_entrada, carpeta_salida,
+                                            particiones=args.particiones,
+                                            trabajadores=args.trabajadores,
+                                            modo_delete=args.modo_delete)
+    else:
+        procesar_duplicados_y_generar_sql(archivo_entrada, carpeta_salida, modo_delete=args.modo_delete)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,15 @@
 import pandas as pd
+import numpy as np
 import os
-import math
+import csv
+import heapq
+import itertools
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.memoria import MB, GobernadorMemoria
 
 def calidad_registro(row):
     nombres = str(row['nombres']).strip()
@@ -37,19 +46,199 @@ def calidad_registro(row):
 
     return score
 
-def procesar_duplicados_y_generar_sql(archivo_csv, carpeta_salida):
-    # CSV estándar: coma y comillas dobles
-    df = pd.read_csv(archivo_csv, delimiter=",", quotechar='"', encoding="utf-8")
+def _como_texto(serie):
+    """Como str() celda a celda: los vacíos quedan 'nan'/'None' (astype(str) los deja NaN en pandas 3)."""
+    serie = serie.astype(object)
+    nulos = serie.isna()
+    serie[nulos] = serie[nulos].map(str)
+    return serie.astype(str)
 
-    # Validar existencia de columnas esperadas
-    columnas_requeridas = ['id', 'identificacion', 'nombres', 'apellidos']
-    for col in columnas_requeridas:
+def calidad_registros(df):
+    """Versión vectorizada de `calidad_registro` para todo el DataFrame (mismo puntaje)."""
+    nombres = _como_texto(df['nombres']).str.strip()
+    apellidos = _como_texto(df['apellidos']).str.strip()
+
+    nombres_vacios = (nombres == "") | nombres.str.lower().isin(["nan", "none"])
+    apellidos_vacios = (apellidos == "") | apellidos.str.lower().isin(["nan", "none"])
+    palabras_nombre = nombres.str.count(r"\S+")
+    palabras_apellido = apellidos.str.count(r"\S+")
+
+    score = (
+        nombres_vacios * 3
+        + apellidos_vacios * 2
+        + (palabras_nombre > 2) * 1
+        + (palabras_nombre >= 4) * 2
+        + (palabras_apellido == 0) * 2
+        + (palabras_apellido > 4) * 2
+        + (nombres == apellidos) * 3
+    )
+    return score.astype(int)
+
+COLUMNAS_REQUERIDAS = ['id', 'identificacion', 'nombres', 'apellidos']
+IDS_POR_DELETE = 1000
+DELETES_POR_ARCHIVO = 100
+# "rangos": ids ordenados, corridas consecutivas como BETWEEN y el resto en IN
+# "in": un IN de IDS_POR_DELETE ids en el orden de detección (formato anterior)
+# "tabla_temporal": rangos cargados en #rangos_eliminar y un DELETE con JOIN por archivo
+MODO_DELETE = "rangos"
+PREDICADOS_POR_DELETE = 1000   # Cada BETWEEN o cada id del IN cuenta como un predicado
+MIN_IDS_RANGO = 3              # Corridas más cortas van al IN
+
+# CSV estándar: coma y comillas dobles
+OPCIONES_LECTURA = dict(delimiter=",", quotechar='"', encoding="utf-8")
+# Con presupuesto de memoria: cuántas veces ocupa el archivo (o una partición) mientras se
+# deduplica respecto a lo que ocupa leído como texto, y cuánto ocupa un bloque al particionar
+FACTOR_DEDUPLICAR = 1.5
+FACTOR_PARTICIONAR = 3.0
+FRACCION_BLOQUE = 0.5
+
+def validar_columnas(df):
+    for col in COLUMNAS_REQUERIDAS:
         if col not in df.columns:
             raise ValueError(f"❌ Columna faltante en el CSV: '{col}'")
 
+def limpiar_ids(df):
     df['id'] = pd.to_numeric(df['id'], errors='coerce')
-    df = df.dropna(subset=['id'])  # Quita filas sin ID válido
+    df = df.dropna(subset=['id']).copy()  # Quita filas sin ID válido
     df['id'] = df['id'].astype(int)
+    return df
+
+def _ganadores(scores, inicios):
+    """
+    Posición de la fila que se queda en cada grupo (grupos contiguos que empiezan en
+    `inicios`): la de menor score. Si varias empatan en el mínimo se elige como lo hacía
+    el sort_values(by='score') por grupo (quicksort, no estable), para borrar los mismos ids.
+    """
+    tamanos = np.diff(np.append(inicios, len(scores)))
+    minimos = np.minimum.reduceat(scores, inicios)
+    es_minimo = scores == np.repeat(minimos, tamanos)
+    posiciones_minimo = np.flatnonzero(es_minimo)
+    ganadores = posiciones_minimo[np.searchsorted(posiciones_minimo, inicios)]
+    for k in np.flatnonzero(np.add.reduceat(es_minimo, inicios) > 1):
+        inicio = inicios[k]
+        ganadores[k] = inicio + np.argsort(scores[inicio:inicio + tamanos[k]], kind='quicksort')[0]
+    return ganadores
+
+def perdedores(duplicados):
+    """
+    Recibe las filas con identificación repetida y devuelve, ordenadas por
+    (identificacion, score), las que no son la mejor de su grupo.
+    """
+    # Las filas sin identificación no forman grupo (igual que groupby)
+    duplicados = duplicados[duplicados['identificacion'].notna()].copy()
+    duplicados['score'] = calidad_registros(duplicados)
+
+    # Grupos contiguos y, dentro de cada uno, las filas en el orden del archivo (como groupby)
+    duplicados = duplicados.sort_values(by='identificacion', kind='stable')
+    codigos = pd.factorize(duplicados['identificacion'])[0]
+    inicios = np.flatnonzero(np.diff(codigos, prepend=-1))
+    quedan = np.ones(len(duplicados), dtype=bool)
+    if len(duplicados):
+        quedan[_ganadores(duplicados['score'].to_numpy(dtype=np.int64), inicios)] = False
+
+    # Ordenar por identificación y score (menor es mejor); el orden estable deja
+    # las que empatan en el orden del archivo
+    return duplicados[quedan].sort_values(by=['identificacion', 'score'], kind='stable')
+
+def _escribir_deletes_in(ids_a_eliminar, carpeta_salida):
+    ids_a_eliminar = iter(ids_a_eliminar)
+    parte = 0
+    lote = list(itertools.islice(ids_a_eliminar, IDS_POR_DELETE))
+    while lote:
+        parte += 1
+        nombre_archivo = os.path.join(carpeta_salida, f"delete_parte_{parte}.sql")
+        with open(nombre_archivo, "w", encoding="utf-8") as f:
+            for _ in range(DELETES_POR_ARCHIVO):
+                if not lote:
+                    break
+                ids_str = ", ".join(map(str, lote))
+                f.write(f"DELETE FROM t_tercero WHERE id IN ({ids_str});\n")
+                lote = list(itertools.islice(ids_a_eliminar, IDS_POR_DELETE))
+        print(f"📄 Archivo generado: {nombre_archivo}")
+
+def rangos_consecutivos(ids):
+    """Ordena y quita repetidos; devuelve (inicios, finales) de cada corrida de ids consecutivos."""
+    ids = np.unique(np.asarray(ids, dtype=np.int64))
+    if len(ids) == 0:
+        return ids, ids
+    cortes = np.nonzero(np.diff(ids) != 1)[0]
+    inicios = ids[np.r_[0, cortes + 1]]
+    finales = ids[np.r_[cortes, len(ids) - 1]]
+    return inicios, finales
+
+def _predicados(inicios, finales):
+    """Entrega ('rango', a, b) para corridas largas y ('id', x, x) para cada id suelto, en orden."""
+    for a, b in zip(inicios.tolist(), finales.tolist()):
+        if b - a + 1 >= MIN_IDS_RANGO:
+            yield 'rango', a, b
+        else:
+            for x in range(a, b + 1):
+                yield 'id', x, x
+
+def _sql_delete_predicados(predicados):
+    condiciones = [f"id BETWEEN {a} AND {b}" for tipo, a, b in predicados if tipo == 'rango']
+    sueltos = [str(a) for tipo, a, _ in predicados if tipo == 'id']
+    if sueltos:
+        condiciones.append(f"id IN ({', '.join(sueltos)})")
+    return f"DELETE FROM t_tercero WHERE {' OR '.join(condiciones)};\n"
+
+def _sql_delete_tabla_temporal(predicados):
+    lineas = [
+        "IF OBJECT_ID('tempdb..#rangos_eliminar') IS NOT NULL DROP TABLE #rangos_eliminar;\n",
+        "CREATE TABLE #rangos_eliminar (desde BIGINT NOT NULL, hasta BIGINT NOT NULL);\n",
+    ]
+    for inicio in range(0, len(predicados), IDS_POR_DELETE):
+        valores = ", ".join(f"({a}, {b})" for _, a, b in predicados[inicio:inicio + IDS_POR_DELETE])
+        lineas.append(f"INSERT INTO #rangos_eliminar (desde, hasta) VALUES {valores};\n")
+    lineas.append("DELETE t FROM t_tercero t JOIN #rangos_eliminar r ON t.id BETWEEN r.desde AND r.hasta;\n")
+    lineas.append("DROP TABLE #rangos_eliminar;\nGO\n")
+    return "".join(lineas)
+
+def escribir_deletes(ids_a_eliminar, carpeta_salida, modo=None):
+    """
+    Escribe los DELETE en archivos delete_parte_N.sql según `modo` (ver MODO_DELETE).
+    En "rangos" cada sentencia lleva hasta PREDICADOS_POR_DELETE predicados y cada
+    archivo hasta DELETES_POR_ARCHIVO sentencias; en "tabla_temporal" cada archivo
+    es autónomo (crea, llena, borra con JOIN y elimina su tabla temporal).
+    """
+    modo = modo or MODO_DELETE
+    os.makedirs(carpeta_salida, exist_ok=True)
+
+    if modo == "in":
+        _escribir_deletes_in(ids_a_eliminar, carpeta_salida)
+        return
+    if modo not in ("rangos", "tabla_temporal"):
+        raise ValueError(f"❌ Modo de DELETE no soportado: {modo}")
+
+    inicios, finales = rangos_consecutivos(np.fromiter(ids_a_eliminar, dtype=np.int64))
+    predicados = _predicados(inicios, finales)
+    por_archivo = PREDICADOS_POR_DELETE * DELETES_POR_ARCHIVO
+    total_rangos = total_sueltos = 0
+
+    parte = 0
+    lote = list(itertools.islice(predicados, por_archivo))
+    while lote:
+        parte += 1
+        total_rangos += sum(1 for tipo, _, _ in lote if tipo == 'rango')
+        total_sueltos += sum(1 for tipo, _, _ in lote if tipo == 'id')
+        nombre_archivo = os.path.join(carpeta_salida, f"delete_parte_{parte}.sql")
+        with open(nombre_archivo, "w", encoding="utf-8") as f:
+            if modo == "tabla_temporal":
+                f.write(_sql_delete_tabla_temporal(lote))
+            else:
+                for inicio in range(0, len(lote), PREDICADOS_POR_DELETE):
+                    f.write(_sql_delete_predicados(lote[inicio:inicio + PREDICADOS_POR_DELETE]))
+        print(f"📄 Archivo generado: {nombre_archivo}")
+        lote = list(itertools.islice(predicados, por_archivo))
+
+    print(f"🧩 {total_rangos} rangos BETWEEN y {total_sueltos} ids sueltos")
+
+def procesar_duplicados_y_generar_sql(archivo_csv, carpeta_salida, modo_delete=None):
+    df = pd.read_csv(archivo_csv, **OPCIONES_LECTURA)
+
+    # Validar existencia de columnas esperadas
+    validar_columnas(df)
+    df = limpiar_ids(df)
 
     print(f"✅ Total registros cargados: {len(df)}")
 
@@ -57,38 +246,137 @@ def procesar_duplicados_y_generar_sql(archivo_csv, carpeta_salida):
     duplicados = df[df.duplicated(subset=['identificacion'], keep=False)]
     print(f"🔁 Total duplicados detectados: {len(duplicados)}")
 
-    ids_a_eliminar = []
+    ids_a_eliminar = perdedores(duplicados)['id'].tolist()
 
-    for identificacion, grupo in duplicados.groupby('identificacion'):
-        if len(grupo) <= 1:
-            continue
+    print(f"🗑️ Total IDs a eliminar: {len(ids_a_eliminar)}")
 
-        grupo = grupo.copy()
-        grupo['score'] = grupo.apply(calidad_registro, axis=1)
+    escribir_deletes(ids_a_eliminar, carpeta_salida, modo_delete)
 
-        # Ordenar por score (menor es mejor)
-        grupo_ordenado = grupo.sort_values(by='score')
-        mejor = grupo_ordenado.iloc[0]
-        ids_malos = grupo_ordenado.iloc[1:]['id'].tolist()
-        ids_a_eliminar.extend(ids_malos)
+# === MODO FUERA DE MEMORIA ===
+# Para archivos que no caben en RAM: se lee por bloques, se reparte cada fila en
+# una de N particiones según un hash de su identificación y luego cada
+# partición (que sí cabe) se procesa por separado con la misma lógica.
 
-    print(f"🗑️ Total IDs a eliminar: {len(ids_a_eliminar)}")
+def _hash_identificacion(identificacion):
+    """
+    Hash por fila estable entre bloques. Los valores numéricos se hashean por su
+    valor (así '0123' y '123' caen juntos, como cuando pandas lee la columna
+    completa como número); el resto por su texto.
+    """
+    numeros = pd.to_numeric(identificacion, errors='coerce')
+    hash_numero = pd.util.hash_array(numeros.astype('float64').to_numpy())
+    hash_texto = pd.util.hash_pandas_object(identificacion.fillna(''), index=False).to_numpy()
+    return numeros.notna().to_numpy(), np.where(numeros.notna().to_numpy(), hash_numero, hash_texto)
 
-    # Crear carpeta si no existe
-    os.makedirs(carpeta_salida, exist_ok=True)
+def _particionar(archivo_csv, carpeta_temporal, particiones, tamano_bloque, gobernador=None):
+    rutas = [os.path.join(carpeta_temporal, f"particion_{k}.csv") for k in range(particiones)]
+    columnas = ['_pos'] + COLUMNAS_REQUERIDAS
+    for ruta in rutas:
+        pd.DataFrame(columns=columnas).to_csv(ruta, index=False)
 
-    total_deletes = math.ceil(len(ids_a_eliminar) / 1000)
-    archivos = math.ceil(total_deletes / 100)
+    resumen = {'registros': 0, 'sin_identificacion': 0, 'todas_numericas': True}
+    posicion = 0
+    if gobernador is None:
+        lector = pd.read_csv(archivo_csv, dtype=str, chunksize=tamano_bloque, **OPCIONES_LECTURA)
+    else:
+        lector = gobernador.bloques(pd.read_csv(archivo_csv, dtype=str, iterator=True, **OPCIONES_LECTURA))
+    for bloque in lector:
+        validar_columnas(bloque)
+        bloque['_pos'] = np.arange(posicion, posicion + len(bloque))
+        posicion += len(bloque)
+        bloque = limpiar_ids(bloque)[columnas]
+        resumen['registros'] += len(bloque)
 
-    for i in range(archivos):
-        nombre_archivo = os.path.join(carpeta_salida, f"delete_parte_{i+1}.sql")
-        with open(nombre_archivo, "w", encoding="utf-8") as f:
-            for j in range(100):
-                start = (i * 100 + j) * 1000
-                end = start + 1000
-                ids_lote = ids_a_eliminar[start:end]
-                if not ids_lote:
-                    break
-                ids_str = ", ".join(map(str, ids_lote))
-                f.write(f"DELETE FROM t_tercero WHERE id IN ({ids_str});\n")
-        print(f"📄 Archivo generado: {nombre_archivo}")
+        con_identificacion = bloque['identificacion'].notna()
+        resumen['sin_identificacion'] += int((~con_identificacion).sum())
+        bloque = bloque[con_identificacion]
+
+        es_numero, hashes = _hash_identificacion(bloque['identificacion'])
+        resumen['todas_numericas'] &= bool(es_numero.all())
+        destino = hashes % particiones
+        for k, parte in bloque.groupby(destino):
+            parte.to_csv(rutas[k], mode='a', header=False, index=False)
+
+    return rutas, resumen
+
+def _procesar_particion(ruta, todas_numericas):
+    """Deduplica una partición y deja sus perdedores, ordenados, en `<ruta>.perdedores`."""
+    df = pd.read_csv(ruta, dtype={'identificacion': str, 'nombres': object, 'apellidos': object})
+    if todas_numericas:
+        df['identificacion'] = pd.to_numeric(df['identificacion'])
+
+    duplicados = df[df.duplicated(subset=['identificacion'], keep=False)]
+    malos = perdedores(duplicados)
+    ruta_perdedores = ruta + ".perdedores"
+    malos[['identificacion', 'score', '_pos', 'id']].to_csv(ruta_perdedores, index=False, header=False)
+    return ruta_perdedores, len(duplicados)
+
+def _leer_perdedores(ruta, todas_numericas):
+    with open(ruta, newline='', encoding='utf-8') as f:
+        for identificacion, score, pos, id_ in csv.reader(f):
+            if todas_numericas:
+                identificacion = float(identificacion) if '.' in identificacion or 'e' in identificacion.lower() else int(identificacion)
+            yield identificacion, int(score), int(pos), int(id_)
+
+def procesar_duplicados_por_particiones(archivo_csv, carpeta_salida, particiones=64,
+                                        trabajadores=None, tamano_bloque=200000,
+                                        carpeta_temporal=None, modo_delete=None, gobernador=None):
+    """
+    Igual que `procesar_duplicados_y_generar_sql` pero sin cargar el archivo
+    completo: la memoria queda acotada por la partición más grande. Genera los
+    mismos DELETE, en el mismo orden. Con `gobernador` (comun.memoria) los
+    bloques de lectura los dimensiona él en vez de `tamano_bloque`.
+    """
+    with tempfile.TemporaryDirectory(prefix="duplicados_", dir=carpeta_temporal) as temporal:
+        rutas, resumen = _particionar(archivo_csv, temporal, particiones, tamano_bloque, gobernador)
+        print(f"✅ Total registros cargados: {resumen['registros']}")
+
+        todas_numericas = resumen['todas_numericas']
+        with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+            resultados = list(pool.map(_procesar_particion, rutas, itertools.repeat(todas_numericas)))
+
+        total_duplicados = sum(n for _, n in resultados)
+        if resumen['sin_identificacion'] > 1:
+            total_duplicados += resumen['sin_identificacion']
+        print(f"🔁 Total duplicados detectados: {total_duplicados}")
+
+        # Mezcla ordenada de las particiones: mismo orden que el sort global del modo en memoria
+        ordenados = heapq.merge(*(_leer_perdedores(r, todas_numericas) for r, _ in resultados))
+        total = 0
+
+        def ids():
+            nonlocal total
+            for _, _, _, id_ in ordenados:
+                total += 1
+                yield id_
+
+        escribir_deletes(ids(), carpeta_salida, modo_delete)
+        print(f"🗑️ Total IDs a eliminar: {total}")
+
+def procesar_duplicados_con_presupuesto(archivo_csv, carpeta_salida, max_memoria, particiones=None,
+                                        trabajadores=None, carpeta_temporal=None, modo_delete=None):
+    """
+    Elige el modo según un presupuesto de memoria (`max_memoria`, bytes) y
+    los bytes por fila medidos en una muestra: en memoria si el archivo cabe;
+    si no, por particiones, con tantas como hagan falta para que cada
+    trabajador procese la suya dentro del presupuesto.
+    """
+    gobernador = GobernadorMemoria.desde_muestra(archivo_csv, max_memoria, FACTOR_PARTICIONAR, FRACCION_BLOQUE,
+                                                 dtype=str, **OPCIONES_LECTURA)
+    estimado = gobernador.bytes_archivo(FACTOR_DEDUPLICAR)
+    if not particiones and gobernador.cabe_completo(FACTOR_DEDUPLICAR):
+        print(f"🧮 ~{estimado / MB:.0f} MB estimados: cabe en {max_memoria / MB:.0f} MB, se procesa en memoria")
+        procesar_duplicados_y_generar_sql(archivo_csv, carpeta_salida, modo_delete=modo_delete)
+        return
+
+    # Mientras corre el pool, el proceso principal y cada trabajador tienen su propio intérprete (~ base)
+    trabajadores = trabajadores or os.cpu_count() or 1
+    trabajadores = max(1, min(trabajadores, int(max_memoria // max(2 * gobernador.base, 1)) - 1))
+    por_trabajador = max_memoria / (trabajadores + 1) - gobernador.base
+    particiones = particiones or gobernador.particiones(por_trabajador, FACTOR_DEDUPLICAR)
+    print(f"🧮 ~{estimado / MB:.0f} MB estimados: {particiones} particiones, {trabajadores} trabajador(es), "
+          f"bloques de {gobernador.filas} filas")
+    procesar_duplicados_por_particiones(archivo_csv, carpeta_salida, particiones=particiones,
+                                        trabajadores=trabajadores, carpeta_temporal=carpeta_temporal,
+                                        modo_delete=modo_delete, gobernador=gobernador)
+    print(gobernador.resumen())
@@ -0,0 +1,205 @@
+import os
+import sys
+import unicodedata
+import zlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.mojibake import reparar_serie
+
+# Prefijos de tipo de documento que suelen quedar pegados a la identificación
+REGEX_PREFIJO_TIPO = r"^[A-Z]{1,4}(?=[\s\.\-_]*\d)"
+REGEX_SEPARADORES = r"[\s\.\-_,/]"
+DIMENSION_TRIGRAMAS = 512
+
+# Reglas fonéticas simples para español (en orden)
+REGLAS_FONETICAS = [
+    (r"CH", "X"),
+    (r"H", ""),
+    (r"QU", "K"),
+    (r"C(?=[EI])", "S"),
+    (r"C", "K"),
+    (r"Z", "S"),
+    (r"V", "B"),
+    (r"W", "B"),
+    (r"LL", "Y"),
+    (r"G(?=[EI])", "J"),
+    (r"(\w)\1+", r"\1"),
+]
+
+def normalizar_identificacion(identificacion: pd.Series) -> pd.Series:
+    """Quita prefijos de tipo (CC123, NIT-900...), separadores y ceros a la izquierda."""
+    ident = identificacion.fillna("").astype(str).str.upper().str.strip()
+    ident = ident.str.replace(REGEX_PREFIJO_TIPO, "", regex=True)
+    ident = ident.str.replace(REGEX_SEPARADORES, "", regex=True)
+    return ident.str.replace(r"^0+(?=.)", "", regex=True)
+
+def _sin_tildes(texto: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+def normalizar_nombre(nombre: pd.Series) -> pd.Series:
+    """Mayúsculas, sin tildes ni mojibake (Ã±, Ã©...), solo letras y un espacio entre palabras."""
+    nombre = reparar_serie(nombre.fillna("").astype(str))
+    nombre = nombre.map(_sin_tildes).str.upper()
+    nombre = nombre.str.replace(r"[^A-Z ]", " ", regex=True)
+    return nombre.str.split().str.join(" ")
+
+def clave_tokens(nombre_normalizado: pd.Series) -> pd.Series:
+    """Palabras ordenadas: 'PEREZ JUAN' y 'JUAN PEREZ' dan la misma clave."""
+    return nombre_normalizado.str.split().map(lambda partes: " ".join(sorted(partes)))
+
+def clave_fonetica(nombre_normalizado: pd.Series) -> pd.Series:
+    clave = nombre_normalizado
+    for patron, reemplazo in REGLAS_FONETICAS:
+        clave = clave.str.replace(patron, reemplazo, regex=True)
+    return clave_tokens(clave)
+
+def _vectores_trigramas(nombres) -> np.ndarray:
+    """
+    Vectores (normalizados) de trigramas de caracteres con hashing, uno por
+    nombre. Se usa crc32 y no hash(): hash() de un texto cambia en cada proceso
+    (PYTHONHASHSEED) y con él los puntajes.
+    """
+    filas, columnas = [], []
+    posiciones = {}     # trigrama -> columna, para calcular cada crc32 una vez
+    for i, nombre in enumerate(nombres):
+        texto = f"  {nombre} "
+        for j in range(len(texto) - 2):
+            trigrama = texto[j:j + 3]
+            columna = posiciones.get(trigrama)
+            if columna is None:
+                columna = posiciones[trigrama] = zlib.crc32(trigrama.encode()) % DIMENSION_TRIGRAMAS
+            filas.append(i)
+            columnas.append(columna)
+    matriz = np.zeros((len(nombres), DIMENSION_TRIGRAMAS), dtype=np.float32)
+    np.add.at(matriz, (filas, columnas), 1.0)
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return matriz / normas
+
+class _UnionFind:
+    def __init__(self):
+        self.padre = {}
+
+    def raiz(self, x):
+        padre = self.padre
+        padre.setdefault(x, x)
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    def unir(self, a, b):
+        ra, rb = self.raiz(a), self.raiz(b)
+        if ra != rb:
+            self.padre[max(ra, rb)] = min(ra, rb)
+
+def detectar_similares(df: pd.DataFrame, umbral: float = 0.85, max_bloque: int = 500):
+    """
+    Busca terceros casi duplicados.
+
+    1. Normaliza identificación y nombre completo (nombres + apellidos).
+    2. Forma bloques por identificación normalizada, por palabras ordenadas del
+       nombre y por clave fonética; solo se comparan filas del mismo bloque, así
+       el costo es la suma de bloque² y no n².
+    3. Dentro de cada bloque compara los nombres con similitud coseno de
+       trigramas (una multiplicación de matrices por bloque). Misma
+       identificación normalizada ya es candidato aunque el nombre difiera.
+
+    Los bloques de más de `max_bloque` filas (nombres muy comunes) se omiten.
+    Devuelve (DataFrame de candidatos con columnas grupo/similitud/motivo, reporte).
+    """
+    nombre = df["nombres"].fillna("").astype(str)
+    if "apellidos" in df.columns:
+        nombre = nombre + " " + df["apellidos"].fillna("").astype(str)
+
+    trabajo = pd.DataFrame({
+        "identificacion_normalizada": normalizar_identificacion(df["identificacion"]),
+        "nombre_normalizado": normalizar_nombre(nombre),
+    }, index=df.index)
+    trabajo["clave_tokens"] = clave_tokens(trabajo["nombre_normalizado"])
+    trabajo["clave_fonetica"] = clave_fonetica(trabajo["nombre_normalizado"])
+
+    reporte = {"registros": len(df), "bloques": 0, "comparaciones": 0,
+               "bloques_omitidos": 0, "pares": 0, "grupos": 0}
+    grupos = _UnionFind()
+    mejor_similitud = {}
+    motivos = {}
+
+    bloqueos = [
+        ("identificacion", "identificacion_normalizada"),
+        ("nombre", "clave_tokens"),
+        ("fonetica", "clave_fonetica"),
+    ]
+    for motivo, columna in bloqueos:
+        claves = trabajo[columna]
+        candidatos = trabajo[(claves != "") & claves.duplicated(keep=False)]
+        for _, bloque in candidatos.groupby(columna, sort=False):
+            if len(bloque) > max_bloque:
+                reporte["bloques_omitidos"] += 1
+                continue
+            reporte["bloques"] += 1
+            reporte["comparaciones"] += len(bloque) * (len(bloque) - 1) // 2
+
+            vectores = _vectores_trigramas(bloque["nombre_normalizado"].tolist())
+            similitud = vectores @ vectores.T
+            if motivo == "identificacion":
+                aceptados = np.ones_like(similitud, dtype=bool)
+            else:
+                aceptados = similitud >= umbral
+            np.fill_diagonal(aceptados, False)
+            con_pareja = aceptados.any(axis=1)
+            if not con_pareja.any():
+                continue
+            reporte["pares"] += int(np.count_nonzero(aceptados)) // 2
+
+            # Componentes conexas del bloque por propagación de etiquetas (vectorizado)
+            etiquetas = np.arange(len(bloque))
+            while True:
+                vecinas = np.where(aceptados, etiquetas[np.newaxis, :], len(bloque)).min(axis=1)
+                nuevas = np.minimum(etiquetas, vecinas)
+                if np.array_equal(nuevas, etiquetas):
+                    break
+                etiquetas = nuevas
+
+            maximos = np.where(aceptados, similitud, -1.0).max(axis=1)
+            indices = bloque.index.to_numpy()
+            for i in np.nonzero(con_pareja)[0]:
+                x = indices[i]
+                grupos.unir(x, indices[etiquetas[i]])
+                if maximos[i] > mejor_similitud.get(x, -1.0):
+                    mejor_similitud[x] = float(maximos[i])
+                motivos.setdefault(x, set()).add(motivo)
+
+    if not mejor_similitud:
+        return df.iloc[0:0].assign(grupo=[], similitud=[], motivo=[]), reporte
+
+    indices = list(mejor_similitud)
+    resultado = df.loc[indices].copy()
+    resultado["identificacion_normalizada"] = trabajo.loc[indices, "identificacion_normalizada"]
+    resultado["nombre_normalizado"] = trabajo.loc[indices, "nombre_normalizado"]
+    raices = [grupos.raiz(i) for i in indices]
+    resultado["grupo"] = pd.factorize(pd.Series(raices, index=resultado.index), sort=True)[0] + 1
+    resultado["similitud"] = [round(mejor_similitud[i], 3) for i in indices]
+    resultado["motivo"] = ["+".join(sorted(motivos[i])) for i in indices]
+    reporte["grupos"] = int(resultado["grupo"].nunique())
+
+    return resultado.sort_values(["grupo", "similitud"], ascending=[True, False]), reporte
+
+def detectar_similares_csv(archivo_csv, archivo_salida, umbral=0.85, max_bloque=500):
+    df = pd.read_csv(archivo_csv, delimiter=",", quotechar='"', encoding="utf-8", dtype=str)
+    for col in ["identificacion", "nombres"]:
+        if col not in df.columns:
+            raise ValueError(f"❌ Columna faltante en el CSV: '{col}'")
+
+    print(f"✅ Total registros cargados: {len(df)}")
+    resultado, reporte = detectar_similares(df, umbral=umbral, max_bloque=max_bloque)
+    resultado.to_csv(archivo_salida, index=False, encoding="utf-8")
+
+    print(f"🧮 Comparaciones: {reporte['comparaciones']} en {reporte['bloques']} bloques "
+          f"({reporte['bloques_omitidos']} bloques demasiado grandes omitidos)")
+    print(f"👥 Grupos de posibles duplicados: {reporte['grupos']} ({len(resultado)} registros)")
+    print(f"📄 Archivo generado: {archivo_salida}")
+    return reporte
@@ -1,5 +1,9 @@
+import os
 import pandas as pd
-import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.nombres import LETRAS_ES, ReglasNombre
 
 # === Cargar archivo CSV con punto y coma ===
 df = pd.read_csv("../t_tercero_PARTE_1.csv", sep=";", dtype=str, encoding="utf-8")
@@ -20,16 +24,10 @@ df = df.dropna(subset=["identificacion", "tipo_documento"])
 # === Normalizar espacios múltiples en textos ===
 df = df.applymap(lambda x: " ".join(x.split()) if isinstance(x, str) else x)
 
-# === Eliminar filas con nombres no legibles (vacíos, punto, símbolo �) ===
-def nombre_valido(nombre):
-    if pd.isna(nombre):
-        return False
-    nombre = nombre.strip()
-    if nombre in [".", "�", ""] or not re.search(r"[A-Za-zÁÉÍÓÚáéíóúÑñ]", nombre):
-        return False
-    return True
+# === Eliminar filas con nombres no legibles (vacíos, punto, símbolo �, sin letras) ===
+REGLAS_NOMBRE = ReglasNombre(palabras_invalidas={".", "�"}, letra_requerida=LETRAS_ES)
 
-df = df[df["nombres"].apply(nombre_valido)]
+df = df[REGLAS_NOMBRE.mascara_serie(df["nombres"])]
 
 # === Guardar resultado limpio ===
 df.to_csv("../salida/1tercer_parte1_datos_limpios_final.csv", index=False)
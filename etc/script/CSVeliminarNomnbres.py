@@ -1,5 +1,9 @@
+import os
 import pandas as pd
-import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.nombres import LETRAS_ES, ReglasNombre
 
 # === Cargar archivo ya limpio o el que tengas como base ===
 df = pd.read_csv("../salida/datos_final_sin_duplicados.csv", dtype=str)
@@ -7,15 +11,11 @@ df = pd.read_csv("../salida/datos_final_sin_duplicados.csv", dtype=str)
 # === Limpiar espacios en celdas ===
 df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
 
-# === Definir función: ¿el nombre empieza con letra? ===
-def nombre_valido(texto):
-    if pd.isna(texto) or texto.strip() == "":
-        return False
-    # Solo válido si empieza con letra (letras con tildes y Ñ/ñ incluidas)
-    return bool(re.match(r"^[A-Za-zÁÉÍÓÚáéíóúÑñ]", texto.strip()))
+# === Regla: ¿el nombre empieza con letra? (letras con tildes y Ñ/ñ incluidas) ===
+REGLAS_NOMBRE = ReglasNombre(primer_caracter=LETRAS_ES)
 
 # === Filtrar filas que tienen nombre válido ===
-df = df[df["nombres"].apply(nombre_valido)]
+df = df[REGLAS_NOMBRE.mascara_serie(df["nombres"])]
 
 # === Guardar archivo resultante ===
 df.to_csv("../salida/datos_final_nombre_valido.csv", index=False)
@@ -1,5 +1,9 @@
+import os
 import pandas as pd
-import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.identificacion import normalizar_identificaciones
 
 # === Cargar archivo limpio ===
 df = pd.read_csv("../salida/datos_final_nombre_valido.csv", dtype=str)
@@ -7,20 +11,10 @@ df = pd.read_csv("../salida/datos_final_nombre_valido.csv", dtype=str)
 # === Limpiar espacios ===
 df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
 
-# === Función para quitar tipo_documento duplicado del inicio de identificacion ===
-def limpiar_identificacion(tipo, identificacion):
-    if pd.isna(tipo) or pd.isna(identificacion):
-        return identificacion
-    tipo = tipo.strip()
-    identificacion = identificacion.strip()
-
-    # Buscar patrón tipo: 'RC 123456' o 'RC123456'
-    patron = r'^' + re.escape(tipo) + r'[\s\-]*'
-    nueva_ident = re.sub(patron, '', identificacion)
-    return nueva_ident
-
-# === Aplicar limpieza fila por fila ===
-df["identificacion"] = df.apply(lambda row: limpiar_identificacion(row["tipo_documento"], row["identificacion"]), axis=1)
+# === Quitar tipo_documento duplicado del inicio de identificacion ===
+# Buscar patrón tipo: 'RC 123456' o 'RC123456'; una regex compilada por tipo y un
+# solo reemplazo vectorizado por grupo, en lugar de df.apply fila por fila
+df["identificacion"] = normalizar_identificaciones(df)
 
 # === Guardar archivo corregido ===
 df.to_csv("../salida/datos_final_documentos_limpios.csv", index=False)
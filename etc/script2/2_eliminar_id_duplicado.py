@@ -2,10 +2,9 @@ import pandas as pd
 import re
 
 # === Cargar archivo previamente limpiado ===
-df = pd.read_csv("../salida/PERSONA_CAPTUREPRO_limpios_final.csv", dtype=str)
-
-# === Limpiar espacios en todas las celdas ===
-df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+ENTRADA = "../salida/PERSONA_CAPTUREPRO_limpios_final.csv"
+SALIDA = "../salida/PERSONA_CAPTUREPRO_empresas_sin_duplicados.csv"
+LECTURA = dict(dtype=str)
 
 # === Validar campo 'identificacion' ===
 def identificacion_valida(ident):
@@ -19,27 +18,33 @@ def identificacion_valida(ident):
         return False
     return True
 
-df = df[df["identificacion"].apply(identificacion_valida)]
-
 # === Validar legibilidad del campo 'nombre' (solo letras y espacios) ===
 def es_nombre_legible(nombre):
     if pd.isna(nombre) or nombre.strip() == "":
         return False
     return bool(re.fullmatch(r"[A-Za-zÁÉÍÓÚáéíóúÑñ. ]+", nombre.strip()))
 
-# === Crear columna auxiliar de legibilidad ===
-df["legible"] = df["nombre"].apply(es_nombre_legible)
+def procesar(df):
+    # === Las celdas ya vienen sin espacios de 1CSVlimpiar ===
+    df = df[df["identificacion"].apply(identificacion_valida)]
+
+    # === Crear columna auxiliar de legibilidad ===
+    df["legible"] = df["nombre"].apply(es_nombre_legible)
+
+    # === Ordenar: primero por identificacion, luego por legibilidad (True primero) ===
+    df = df.sort_values(by=["identificacion", "legible"], ascending=[True, False])
 
-# === Ordenar: primero por identificacion, luego por legibilidad (True primero) ===
-df = df.sort_values(by=["identificacion", "legible"], ascending=[True, False])
+    # === Eliminar duplicados, conservar la fila más legible por identificacion ===
+    df = df.drop_duplicates(subset="identificacion", keep="first")
 
-# === Eliminar duplicados, conservar la fila más legible por identificacion ===
-df = df.drop_duplicates(subset="identificacion", keep="first")
+    # === Eliminar la columna auxiliar ===
+    df = df.drop(columns=["legible"])
+    return df
 
-# === Eliminar la columna auxiliar ===
-df = df.drop(columns=["legible"])
+if __name__ == "__main__":
+    df = procesar(pd.read_csv(ENTRADA, **LECTURA))
 
-# === Guardar archivo limpio final ===
-df.to_csv("../salida/PERSONA_CAPTUREPRO_empresas_sin_duplicados.csv", index=False)
+    # === Guardar archivo limpio final ===
+    df.to_csv(SALIDA, index=False)
 
-print("✅ Archivo limpio guardado como: datos_final_empresas_sin_duplicados.csv")
+    print("✅ Archivo limpio guardado como: datos_final_empresas_sin_duplicados.csv")
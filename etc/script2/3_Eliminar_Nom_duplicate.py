@@ -1,23 +1,30 @@
+import os
 import pandas as pd
-import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.nombres import LETRAS_ES, ReglasNombre
 
 # === Cargar archivo ya limpio o el que tengas como base ===
-df = pd.read_csv("../salida/datos_final_sin_duplicados.csv", dtype=str)
+ENTRADA = "../salida/datos_final_sin_duplicados.csv"
+SALIDA = "../salida/datos_final_nombre_valido.csv"
+LECTURA = dict(dtype=str)
+
+# === Regla: ¿el nombre empieza con letra? (letras con tildes y Ñ/ñ incluidas) ===
+REGLAS_NOMBRE = ReglasNombre(primer_caracter=LETRAS_ES)
 
-# === Limpiar espacios en celdas ===
-df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+def procesar(df):
+    # === Limpiar espacios en celdas (única vez en la cadena 3 -> 4) ===
+    df = df.apply(lambda columna: columna.str.strip())
 
-# === Definir función: ¿el nombre empieza con letra? ===
-def nombre_valido(texto):
-    if pd.isna(texto) or texto.strip() == "":
-        return False
-    # Solo válido si empieza con letra (letras con tildes y Ñ/ñ incluidas)
-    return bool(re.match(r"^[A-Za-zÁÉÍÓÚáéíóúÑñ]", texto.strip()))
+    # === Filtrar filas que tienen nombre válido ===
+    df = df[REGLAS_NOMBRE.mascara_serie(df["nombres"])]
+    return df
 
-# === Filtrar filas que tienen nombre válido ===
-df = df[df["nombres"].apply(nombre_valido)]
+if __name__ == "__main__":
+    df = procesar(pd.read_csv(ENTRADA, **LECTURA))
 
-# === Guardar archivo resultante ===
-df.to_csv("../salida/datos_final_nombre_valido.csv", index=False)
+    # === Guardar archivo resultante ===
+    df.to_csv(SALIDA, index=False)
 
-print("✅ Archivo guardado como: datos_final_nombre_valido.csv (nombres válidos únicamente)")
+    print("✅ Archivo guardado como: datos_final_nombre_valido.csv (nombres válidos únicamente)")
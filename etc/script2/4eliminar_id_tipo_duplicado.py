@@ -1,28 +1,25 @@
+import os
 import pandas as pd
-import re
+import sys
 
-# === Cargar archivo limpio ===
-df = pd.read_csv("../salida/datos_final_nombre_valido.csv", dtype=str)
-
-# === Limpiar espacios ===
-df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.identificacion import normalizar_identificaciones
 
-# === Función para quitar tipo_documento duplicado del inicio de identificacion ===
-def limpiar_identificacion(tipo, identificacion):
-    if pd.isna(tipo) or pd.isna(identificacion):
-        return identificacion
-    tipo = tipo.strip()
-    identificacion = identificacion.strip()
+# === Cargar archivo limpio ===
+ENTRADA = "../salida/datos_final_nombre_valido.csv"
+SALIDA = "../salida/datos_final_documentos_limpios.csv"
+LECTURA = dict(dtype=str)
 
-    # Buscar patrón tipo: 'RC 123456' o 'RC123456'
-    patron = r'^' + re.escape(tipo) + r'[\s\-]*'
-    nueva_ident = re.sub(patron, '', identificacion)
-    return nueva_ident
+def procesar(df):
+    # === Las celdas ya vienen sin espacios de 3_Eliminar_Nom_duplicate ===
+    # === Aplicar limpieza por grupos de tipo_documento ===
+    df["identificacion"] = normalizar_identificaciones(df)
+    return df
 
-# === Aplicar limpieza fila por fila ===
-df["identificacion"] = df.apply(lambda row: limpiar_identificacion(row["tipo_documento"], row["identificacion"]), axis=1)
+if __name__ == "__main__":
+    df = procesar(pd.read_csv(ENTRADA, **LECTURA))
 
-# === Guardar archivo corregido ===
-df.to_csv("../salida/datos_final_documentos_limpios.csv", index=False)
+    # === Guardar archivo corregido ===
+    df.to_csv(SALIDA, index=False)
 
-print("✅ Identificaciones corregidas y archivo guardado como: datos_final_documentos_limpios.csv")
+    print("✅ Identificaciones corregidas y archivo guardado como: datos_final_documentos_limpios.csv")
@@ -1,40 +1,28 @@
+import os
 import pandas as pd
-import re
+import sys
 
-# === Cargar archivo con codificación Latin-1 por si ayuda a detectar mejor ===
-df = pd.read_csv("../salida/3PERSONA_CAPTUREPRO_nombres_limpios.csv", dtype=str, encoding="latin1")
-
-# === Reparación automática ===
-def reparar_texto(texto):
-    if pd.isna(texto):
-        return texto
-    try:
-        # Intento automático
-        reparado = texto.encode("latin1").decode("utf-8")
-    except (UnicodeEncodeError, UnicodeDecodeError):
-        reparado = texto
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.mojibake import reparar_dataframe
 
-    # Reemplazos manuales adicionales si quedaron residuos
-    reemplazos = {
-        "Ã‘": "Ñ", "Ã‘": "Ñ", "Ã‘": "Ñ",
-        "Ã±": "ñ", "Ã¡": "á", "ÃÁ": "Á",
-        "Ã©": "é", "Ã‰": "É",
-        "Ã­": "í", "ÃÍ": "Í",
-        "Ã³": "ó", "Ã“": "Ó",
-        "Ãº": "ú", "Ãš": "Ú",
-        "Ã¼": "ü", "Ãœ": "Ü",
-        "â€“": "-", "â€œ": '"', "â€": '"', "â€˜": "'", "â€™": "'",
-    }
+# === Cargar archivo con codificación Latin-1 por si ayuda a detectar mejor ===
+ENTRADA = "../salida/3PERSONA_CAPTUREPRO_nombres_limpios.csv"
+SALIDA = "../salida/6PERSONA_CAPTUREPRO_codificacion_reparada.csv"
+LECTURA = dict(dtype=str, encoding="latin1")
 
-    for erroneo, correcto in reemplazos.items():
-        reparado = reparado.replace(erroneo, correcto)
+# === Comillas y guiones reparados (antes "â€œ", "â€“"...) que se prefieren en ASCII ===
+REEMPLAZOS = {
+    "–": "-", "“": '"', "”": '"', "‘": "'", "’": "'",
+}
 
-    return reparado
+def procesar(df):
+    # === Aplicar reparación a todo el DataFrame ===
+    return reparar_dataframe(df, reemplazos=REEMPLAZOS)
 
-# === Aplicar reparación a todo el DataFrame ===
-df = df.applymap(reparar_texto)
+if __name__ == "__main__":
+    df = procesar(pd.read_csv(ENTRADA, **LECTURA))
 
-# === Guardar archivo corregido ===
-df.to_csv("../salida/6PERSONA_CAPTUREPRO_codificacion_reparada.csv", index=False)
+    # === Guardar archivo corregido ===
+    df.to_csv(SALIDA, index=False)
 
-print("✅ Codificación reparada y archivo guardado como: 5PERSONA_CAPTUREPRO_codificacion_reparada.csv")
+    print("✅ Codificación reparada y archivo guardado como: 5PERSONA_CAPTUREPRO_codificacion_reparada.csv")
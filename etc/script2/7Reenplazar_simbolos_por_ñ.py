@@ -1,26 +1,27 @@
+import os
 import pandas as pd
-import re
+import sys
 
-# === Cargar archivo CSV (ajusta el encoding si UTF-8 no funciona) ===
-df = pd.read_csv("../salida/6PERSONA_CAPTUREPRO_codificacion_reparada.csv", dtype=str, encoding="utf-8")
-
-# === Función para reemplazar secuencias mal codificadas por Ñ o ñ ===
-def reemplazar_malas_ñ(texto):
-    if pd.isna(texto):
-        return texto
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.mojibake import reparar_serie
 
-    texto = str(texto)
+# === Cargar archivo CSV (ajusta el encoding si UTF-8 no funciona) ===
+ENTRADA = "../salida/6PERSONA_CAPTUREPRO_codificacion_reparada.csv"
+SALIDA = "../salida/7PERSONA_nombre_reparado.csv"
+LECTURA = dict(dtype=str, encoding="utf-8")
 
-    # Reemplazos comunes de codificación mal interpretada
-    texto = re.sub(r"(Ã‘|Ãƒâ€˜|Ãƒ')", "Ñ", texto)  # Ñ mayúscula
-    texto = re.sub(r"(Ã±|ÃƒÂ±|ÃƒÂ‘)", "ñ", texto)  # ñ minúscula
+# === Ñ mal codificada cuya comilla (Ã‘) quedó como apóstrofo; Ã‘, ÃƒÂ±... los repara comun.mojibake ===
+REEMPLAZOS = {"Ã'": "Ñ"}
 
-    return texto
+def procesar(df):
+    # === Aplicar reparación sobre la columna 'nombre' ===
+    df["nombre"] = reparar_serie(df["nombre"], REEMPLAZOS)
+    return df
 
-# === Aplicar reparación sobre la columna 'nombre' ===
-df["nombre"] = df["nombre"].apply(reemplazar_malas_ñ)
+if __name__ == "__main__":
+    df = procesar(pd.read_csv(ENTRADA, **LECTURA))
 
-# === Guardar archivo corregido ===
-df.to_csv("../salida/7PERSONA_nombre_reparado.csv", index=False)
+    # === Guardar archivo corregido ===
+    df.to_csv(SALIDA, index=False)
 
-print("✅ Reemplazo completado y archivo guardado como: 7PERSONA_nombre_reparado.csv")
+    print("✅ Reemplazo completado y archivo guardado como: 7PERSONA_nombre_reparado.csv")
@@ -0,0 +1,80 @@
+import argparse
+import importlib.util
+import os
+import re
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.dag import DAG, como_releido
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+CARPETA_COMUN = os.path.join(CARPETA, '..', '..', 'comun')
+CARPETA_CACHE = "../salida/.cache_dag"
+
+# Pasos numerados; las dependencias salen de ENTRADA/SALIDA de cada script
+PASOS = [
+    "1CSVlimpiar",
+    "2_eliminar_id_duplicado",
+    "3_Eliminar_Nom_duplicate",
+    "4eliminar_id_tipo_duplicado",
+    "5CSV_limpiar_nombres_malos",
+    "6reparar_errores",
+    "7Reenplazar_simbolos_por_ñ",
+]
+
+def cargar_paso(nombre):
+    ruta = os.path.join(CARPETA, nombre + ".py")
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    with open(ruta, "rb") as f:
+        modulo.codigo = f.read()
+    # El código de los módulos de comun que usa el paso también entra en la clave de caché
+    for usado in sorted(set(re.findall(rb"from comun\.(\w+) import", modulo.codigo))):
+        with open(os.path.join(CARPETA_COMUN, usado.decode() + ".py"), "rb") as f:
+            modulo.codigo += f.read()
+    return modulo
+
+def construir_dag():
+    dag = DAG(CARPETA_CACHE)
+    modulos = [cargar_paso(nombre) for nombre in PASOS]
+    productor = {}
+    omitidos = set()
+
+    for nombre, modulo in zip(PASOS, modulos):
+        lectura = dict(modulo.LECTURA)
+        if modulo.ENTRADA in productor:
+            dependencia = productor[modulo.ENTRADA]
+            if dependencia in omitidos:
+                omitidos.add(nombre)
+                continue
+            encoding = lectura.get("encoding", "utf-8")
+            dag.agregar(nombre, modulo.procesar, dependencias=[dependencia], codigo=modulo.codigo,
+                        salida=modulo.SALIDA, adaptar=lambda df, e=encoding: como_releido(df, e))
+        elif os.path.exists(modulo.ENTRADA):
+            dag.agregar(nombre, modulo.procesar, codigo=modulo.codigo, salida=modulo.SALIDA,
+                        fuente=(modulo.ENTRADA, lambda ruta, l=lectura: pd.read_csv(ruta, **l)))
+        else:
+            print(f"⚠️  {nombre}: no existe {modulo.ENTRADA}, se omite junto con los pasos que dependen de él")
+            omitidos.add(nombre)
+            continue
+        productor[modulo.SALIDA] = nombre
+    return dag
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta los pasos numerados en un solo proceso, con caché por paso")
+    parser.add_argument("--sin-cache", action="store_true", help="Ignora la caché y ejecuta todos los pasos")
+    parser.add_argument("--todas-las-salidas", action="store_true",
+                        help="Escribe también el CSV intermedio de cada paso, como los scripts sueltos")
+    parser.add_argument("--pasos", nargs="+", metavar="PASO",
+                        help="Pasos a calcular (por defecto, los finales de cada cadena)")
+    args = parser.parse_args()
+
+    dag = construir_dag()
+    dag.ejecutar(objetivos=args.pasos, usar_cache=not args.sin_cache, escribir_todos=args.todas_las_salidas)
+    print("✅ DAG completado")
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,42 @@
 import csv
 import os
-import re
+import sys
 from textwrap import dedent
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from comun.escritor_partes import EscritorPartes, leer_manifest
+from comun.lotes import Lote, leer_lotes, reagrupar
+from comun.nombres import VALIDO, ReglasNombre
+from comun.solapado import SOLAPAR_POR_DEFECTO
+
 # === CONFIGURACIÓN GENERAL ===
 REGISTROS_POR_INSERT = 1000
-INSERTS_POR_ARCHIVO = 100
-REGISTROS_POR_ARCHIVO = REGISTROS_POR_INSERT * INSERTS_POR_ARCHIVO
+BYTES_POR_ARCHIVO = 32 * 1024 * 1024  # Tamaño máximo (sin comprimir) de cada archivo SQL
+COMPRESION = None                     # None, "gzip" o "zstd"
+ESCRITURA_DIFERIDA = SOLAPAR_POR_DEFECTO  # Comprimir y escribir en un hilo mientras se arman los INSERT
 NOMBRE_TABLA = "t_tercero"
 CARPETA_ENTRADA = "entrada"
 CARPETA_SALIDA = "salida"
 CARPETA_IDS = "id"
 BASE_DATOS = "gdocxhl"
+MANIFEST_INSERTS = "insert_terceros_manifest.json"
+ARCHIVO_IDS_ACEPTADOS = "insert_terceros_ids.txt"  # IDs ya emitidos, uno por línea
+COLUMNAS = ("identificacion", "nombres", "tipo_documento", "apellidos")
+
+def limpiar_crudo(valor):
+    return str(valor).strip() if valor else ""
 
 def limpiar(valor):
-    return str(valor).replace("'", "''").strip() if valor else ""
-
-def nombre_valido(nombre):
-    if not nombre or len(nombre) < 2:
-        return False
-    nombre = nombre.strip()
-    if re.fullmatch(r"[\W\d_]+", nombre):  # Solo símbolos o números
-        return False
-    if re.fullmatch(r"[A-Za-z]$", nombre):  # Solo una letra
-        return False
-    if nombre.count("-") > 3:
-        return False
-    if nombre in {".", "-", "--", "..."}:
-        return False
-    return True
+    """Como `limpiar_crudo`, con las comillas simples duplicadas para ir dentro de un literal SQL."""
+    return limpiar_crudo(valor).replace("'", "''")
+
+# Al menos dos caracteres y una letra (no solo símbolos o números), máximo 3 guiones
+REGLAS_NOMBRE = ReglasNombre(
+    min_largo=2,
+    palabras_invalidas={".", "-", "--", "..."},
+    letra_requerida=r"[^\W\d_]",
+    max_guiones=3,
+)
 
 def cargar_ids_existentes():
     existentes = set()
@@ -41,58 +49,361 @@ def cargar_ids_existentes():
                         existentes.add(row[0].strip())
     return existentes
 
-def generar_sql():
-    os.makedirs(CARPETA_SALIDA, exist_ok=True)
-    ids_existentes = cargar_ids_existentes()
+def validar_lote(lote, ids_existentes=None, escapar=True):
+    """
+    Pasa un lote de (identificacion, nombredocumento, nombre) del CSV a un
+    lote de COLUMNAS con los registros aceptados. Con `escapar` los textos
+    salen listos para un literal SQL (ver `limpiar`); si no, tal cual.
+    """
+    limpiar_valor = limpiar if escapar else limpiar_crudo
+    aceptados = Lote(COLUMNAS)
+    ids, nombres, tipos, apellidos = aceptados.columnas
+    nombres_lote = list(map(limpiar_valor, lote["nombre"]))
+    for identificacion, tipo_documento, nombre, motivo in zip(
+        map(limpiar_valor, lote["identificacion"]), lote["nombredocumento"], nombres_lote,
+        REGLAS_NOMBRE.codigos(nombres_lote)
+    ):
+        if not identificacion:
+            continue
+        if ids_existentes is not None and identificacion in ids_existentes:
+            continue
+        if motivo != VALIDO:
+            continue
 
-    datos = []
-    for archivo_csv in os.listdir(CARPETA_ENTRADA):
+        ids.append(identificacion)
+        nombres.append(nombre)
+        tipos.append(limpiar_valor(tipo_documento))
+        apellidos.append("")  # Apellidos en blanco
+        if ids_existentes is not None:
+            ids_existentes.add(identificacion)  # Evita duplicados dentro del lote
+    return aceptados
+
+def leer_lotes_validos(ids_existentes=None, escapar=True):
+    """
+    Recorre los CSV de entrada y entrega lotes de COLUMNAS
+    (identificacion, nombres, tipo_documento, apellidos).
+    Si se pasa `ids_existentes` se descartan los que ya están y los repetidos del lote;
+    con None no se hace ningún filtro por identificación (lo hace la base de datos).
+    Con `escapar=False` los textos no se preparan para SQL (p. ej. para un CSV).
+    """
+    for archivo_csv in sorted(os.listdir(CARPETA_ENTRADA)):  # orden fijo: reanudar depende de él
         if archivo_csv.lower().endswith(".csv"):
             ruta_csv = os.path.join(CARPETA_ENTRADA, archivo_csv)
             with open(ruta_csv, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    identificacion = limpiar(row.get("identificacion", ""))
-                    tipo_documento = limpiar(row.get("nombredocumento", ""))
-                    nombre = limpiar(row.get("nombre", ""))
+                reader = csv.reader(f)
+                encabezado = next(reader, [])
+                for lote in leer_lotes(reader, encabezado, ("identificacion", "nombredocumento", "nombre")):
+                    aceptados = validar_lote(lote, ids_existentes, escapar)
+                    if aceptados:
+                        yield aceptados
 
-                    if not identificacion or identificacion in ids_existentes:
-                        continue
-                    if not nombre_valido(nombre):
-                        continue
+def leer_filas(ids_existentes=None, escapar=True):
+    """Como `leer_lotes_validos`, pero registro por registro (tuplas)."""
+    for lote in leer_lotes_validos(ids_existentes, escapar):
+        yield from lote.filas()
 
-                    datos.append((identificacion, nombre, tipo_documento, ""))  # Apellidos en blanco
-                    ids_existentes.add(identificacion)  # Evita duplicados dentro del lote
+def _escritor(patron, manifest, cabecera):
+    return EscritorPartes(
+        CARPETA_SALIDA,
+        patron,
+        cabecera=cabecera,
+        max_bytes=BYTES_POR_ARCHIVO,
+        compresion=COMPRESION,
+        manifest=manifest,
+        diferido=ESCRITURA_DIFERIDA,
+    )
 
-    total_registros = len(datos)
-    total_archivos = (total_registros + REGISTROS_POR_ARCHIVO - 1) // REGISTROS_POR_ARCHIVO
+def firma_entrada():
+    """Identifica la entrada y la configuración de una ejecución para saber si se puede reanudar."""
+    archivos = [
+        [nombre, os.path.getsize(os.path.join(CARPETA_ENTRADA, nombre)),
+         int(os.path.getmtime(os.path.join(CARPETA_ENTRADA, nombre)))]
+        for nombre in sorted(os.listdir(CARPETA_ENTRADA))
+        if nombre.lower().endswith(".csv")
+    ]
+    return {"archivos": archivos, "bytes_por_archivo": BYTES_POR_ARCHIVO,
+            "registros_por_insert": REGISTROS_POR_INSERT, "compresion": COMPRESION}
 
-    for i in range(total_archivos):
-        parte = i + 1
-        nombre_archivo = os.path.join(CARPETA_SALIDA, f"insert_terceros_parte{parte}.sql")
+def cargar_ids_aceptados(ruta, hasta_byte=None):
+    aceptados = set()
+    if not os.path.exists(ruta):
+        return aceptados
+    with open(ruta, "rb") as f:
+        datos = f.read() if hasta_byte is None else f.read(hasta_byte)
+    for linea in datos.decode("utf-8").splitlines():
+        if linea:
+            aceptados.add(linea)
+    return aceptados
 
-        with open(nombre_archivo, "w", encoding="utf-8") as archivo_sql:
-            archivo_sql.write(f"-- Inserciones para {NOMBRE_TABLA}\n")
-            archivo_sql.write(f"USE {BASE_DATOS};\nGO\n\n")
+def _borrar_partes(manifest):
+    for parte in manifest.get("partes", []):
+        ruta = os.path.join(CARPETA_SALIDA, parte["archivo"])
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+def generar_sql(reanudar=False, delta=False):
+    """
+    Genera los INSERT de NOMBRE_TABLA.
+
+    reanudar=True: si la ejecución anterior quedó a medias (manifest con
+    "finalizado": false) con la misma entrada y configuración, conserva las
+    partes completas y sigue desde la primera incompleta. Una ejecución delta
+    interrumpida también se reanuda así.
+
+    delta=True: toma como existentes también los IDs emitidos en ejecuciones
+    anteriores (ARCHIVO_IDS_ACEPTADOS) y agrega solo las filas nuevas como
+    partes adicionales del mismo manifest.
+    """
+    os.makedirs(CARPETA_SALIDA, exist_ok=True)
+    ids_existentes = cargar_ids_existentes()
+
+    ruta_manifest = os.path.join(CARPETA_SALIDA, MANIFEST_INSERTS)
+    ruta_ids = os.path.join(CARPETA_SALIDA, ARCHIVO_IDS_ACEPTADOS)
+    previo = leer_manifest(ruta_manifest)
+    firma = firma_entrada()
+
+    partes_previas = []
+    filas_a_saltar = 0
+    ejecucion = 1
+    ids_inicio = 0  # Byte de ARCHIVO_IDS_ACEPTADOS donde empiezan los IDs de esta ejecución
+
+    if previo and reanudar and previo.get("finalizado") and not delta:
+        print("✅ La ejecución anterior ya terminó; no hay nada que reanudar")
+        return
+
+    if previo and (reanudar or delta) and not previo.get("finalizado") and previo.get("firma") == firma:
+        ejecucion = previo["ejecucion"]
+        ids_inicio = previo["ids_inicio"]
+        for parte in previo["partes"]:
+            ruta = os.path.join(CARPETA_SALIDA, parte["archivo"])
+            if not os.path.exists(ruta) or os.path.getsize(ruta) != parte["bytes"]:
+                break
+            partes_previas.append(parte)
+            if parte["ejecucion"] == ejecucion:
+                filas_a_saltar += parte["filas"]
+        ids_existentes |= cargar_ids_aceptados(ruta_ids, ids_inicio)
+        print(f"⏩ Reanudando: {len(partes_previas)} parte(s) completas, {filas_a_saltar} registros ya escritos")
+    elif previo and delta and previo.get("finalizado"):
+        ejecucion = previo.get("ejecucion", 1) + 1
+        partes_previas = previo["partes"]
+        ids_existentes |= cargar_ids_aceptados(ruta_ids)
+        ids_inicio = os.path.getsize(ruta_ids) if os.path.exists(ruta_ids) else 0
+        print(f"🔺 Modo delta: se omiten los IDs ya emitidos en {previo['ejecucion']} ejecución(es) anterior(es)")
+    else:
+        if previo and reanudar:
+            print("⚠️ No hay una ejecución incompleta compatible; se genera desde cero")
+        if previo:
+            _borrar_partes(previo)
+
+    # Deja el archivo de IDs exactamente como estaba al completar la última parte conservada
+    ids_fin = partes_previas[-1].get("ids_bytes", ids_inicio) if partes_previas else ids_inicio
+    with open(ruta_ids, "ab") as f:
+        f.truncate(ids_fin)
+
+    archivo_ids = open(ruta_ids, "ab")
+    ids_pendientes = []
 
-            for j in range(INSERTS_POR_ARCHIVO):
-                inicio = i * REGISTROS_POR_ARCHIVO + j * REGISTROS_POR_INSERT
-                fin = min(inicio + REGISTROS_POR_INSERT, total_registros)
-                if inicio >= total_registros:
-                    break
-
-                valores = []
-                for r in datos[inicio:fin]:
-                    valores.append(f"('{r[0]}', '{r[1]}', '{r[2]}', '{r[3]}')")
-
-                if valores:
-                    insert_sql = dedent(f"""
-                        INSERT INTO {NOMBRE_TABLA} (
-                            identificacion, nombres, tipo_documento, apellidos
-                        ) VALUES
-                        {",\n                        ".join(valores)};
-                        GO
-                    """).strip()
-                    archivo_sql.write(insert_sql + "\n\n")
+    def al_cerrar_parte(info):
+        # Los IDs se guardan antes de que la parte quede registrada en el manifest
+        if ids_pendientes:
+            archivo_ids.write(("\n".join(ids_pendientes) + "\n").encode("utf-8"))
+            ids_pendientes.clear()
+        archivo_ids.flush()
+        os.fsync(archivo_ids.fileno())
+        return {"ejecucion": ejecucion, "ids_bytes": archivo_ids.tell()}
+
+    total_registros = 0
+    escritor = EscritorPartes(
+        CARPETA_SALIDA,
+        "insert_terceros_parte{parte}.sql",
+        cabecera=f"-- Inserciones para {NOMBRE_TABLA}\nUSE {BASE_DATOS};\nGO\n\n",
+        max_bytes=BYTES_POR_ARCHIVO,
+        compresion=COMPRESION,
+        manifest=MANIFEST_INSERTS,
+        partes_previas=partes_previas,
+        al_cerrar_parte=al_cerrar_parte,
+        datos_manifest={"ejecucion": ejecucion, "ids_inicio": ids_inicio, "firma": firma},
+        diferido=ESCRITURA_DIFERIDA,
+    )
+
+    # Lo que ya está en partes completas se valida (así ids_existentes queda igual) pero no se escribe
+    lotes = reagrupar(leer_lotes_validos(ids_existentes), REGISTROS_POR_INSERT, saltar=filas_a_saltar)
+
+    try:
+        with escritor:
+            for lote in lotes:
+                valores = [f"('{r[0]}', '{r[1]}', '{r[2]}', '{r[3]}')" for r in lote.filas()]
+                insert_sql = dedent(f"""
+                    INSERT INTO {NOMBRE_TABLA} (
+                        identificacion, nombres, tipo_documento, apellidos
+                    ) VALUES
+                    {",\n                    ".join(valores)};
+                    GO
+                """).strip()
+                escritor.escribir(insert_sql + "\n\n", filas=len(lote))
+                ids_pendientes.extend(lote["identificacion"])
+                total_registros += len(lote)
+    finally:
+        archivo_ids.close()
 
     print(f"✅ Archivos generados en '{CARPETA_SALIDA}'. Total registros: {total_registros}")
+
+# === MODO STAGING: carga masiva + un solo INSERT ... WHERE NOT EXISTS ===
+TABLA_STAGING = "t_tercero_staging"
+
+def sql_crear_staging(dialecto="sqlserver"):
+    if dialecto == "sqlite":
+        return dedent(f"""
+            CREATE TABLE {TABLA_STAGING} (
+                fila INTEGER NOT NULL,
+                identificacion TEXT NOT NULL,
+                nombres TEXT,
+                tipo_documento TEXT,
+                apellidos TEXT
+            );
+        """).strip()
+    return dedent(f"""
+        IF OBJECT_ID('{TABLA_STAGING}', 'U') IS NOT NULL DROP TABLE {TABLA_STAGING};
+        CREATE TABLE {TABLA_STAGING} (
+            fila BIGINT NOT NULL PRIMARY KEY,
+            identificacion VARCHAR(50) NOT NULL,
+            nombres NVARCHAR(255),
+            tipo_documento NVARCHAR(100),
+            apellidos NVARCHAR(255)
+        );
+        CREATE INDEX ix_{TABLA_STAGING}_identificacion ON {TABLA_STAGING} (identificacion, fila);
+        GO
+    """).strip()
+
+def sql_insert_desde_staging(dialecto="sqlserver"):
+    """
+    Anti-join en la base: inserta la primera aparición (menor `fila`) de cada
+    identificación que todavía no esté en la tabla destino.
+    """
+    sql = dedent(f"""
+        INSERT INTO {NOMBRE_TABLA} (
+            identificacion, nombres, tipo_documento, apellidos
+        )
+        SELECT s.identificacion, s.nombres, s.tipo_documento, s.apellidos
+        FROM (
+            SELECT stg.*, ROW_NUMBER() OVER (PARTITION BY stg.identificacion ORDER BY stg.fila) AS rn
+            FROM {TABLA_STAGING} stg
+        ) s
+        WHERE s.rn = 1
+          AND NOT EXISTS (
+              SELECT 1 FROM {NOMBRE_TABLA} t WHERE t.identificacion = s.identificacion
+          );
+    """).strip()
+    if dialecto == "sqlite":
+        return sql
+    return sql + f"\nGO\n\nDROP TABLE {TABLA_STAGING};\nGO"
+
+def sql_insert_on_conflict_sqlite():
+    """Equivalente SQLite usando la restricción UNIQUE de la tabla destino."""
+    return dedent(f"""
+        INSERT INTO {NOMBRE_TABLA} (
+            identificacion, nombres, tipo_documento, apellidos
+        )
+        SELECT identificacion, nombres, tipo_documento, apellidos
+        FROM {TABLA_STAGING}
+        WHERE true
+        ORDER BY fila
+        ON CONFLICT (identificacion) DO NOTHING;
+    """).strip()
+
+def _valores_staging(filas, inicio):
+    return [
+        f"({inicio + k}, '{r[0]}', '{r[1]}', '{r[2]}', '{r[3]}')"
+        for k, r in enumerate(filas)
+    ]
+
+def generar_sql_staging(carga="values"):
+    """
+    Genera los scripts para cargar las filas nuevas en TABLA_STAGING sin
+    consultar los IDs existentes y un script final que hace el INSERT
+    set-based contra NOMBRE_TABLA.
+
+    carga="values": INSERT de a REGISTROS_POR_INSERT filas en staging_parteN.sql.
+    carga="bulk": escribe staging.csv y un BULK INSERT que lo carga.
+    """
+    os.makedirs(CARPETA_SALIDA, exist_ok=True)
+    total_registros = 0
+
+    if carga == "bulk":
+        ruta_csv = os.path.abspath(os.path.join(CARPETA_SALIDA, "staging.csv"))
+        with open(ruta_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            # En el CSV los textos van tal cual, sin las comillas duplicadas para SQL
+            for fila in leer_filas(escapar=False):
+                total_registros += 1
+                writer.writerow([total_registros, *fila])
+
+        with open(os.path.join(CARPETA_SALIDA, "staging_parte1.sql"), "w", encoding="utf-8") as archivo_sql:
+            archivo_sql.write(f"USE {BASE_DATOS};\nGO\n\n")
+            archivo_sql.write(sql_crear_staging() + "\n\n")
+            archivo_sql.write(dedent(f"""
+                BULK INSERT {TABLA_STAGING}
+                FROM '{ruta_csv}'
+                WITH (FORMAT = 'CSV', FIELDQUOTE = '"', FIELDTERMINATOR = ',', ROWTERMINATOR = '0x0a', CODEPAGE = '65001', TABLOCK);
+                GO
+            """).strip() + "\n")
+        total_archivos = 1
+    else:
+        def cabecera(parte):
+            texto = f"-- Carga de {TABLA_STAGING}\nUSE {BASE_DATOS};\nGO\n\n"
+            return texto + sql_crear_staging() + "\n\n" if parte == 1 else texto
+
+        escritor = _escritor("staging_parte{parte}.sql", "staging_manifest.json", cabecera)
+        with escritor:
+            for lote in reagrupar(leer_lotes_validos(), REGISTROS_POR_INSERT):
+                valores = _valores_staging(lote.filas(), total_registros + 1)
+                escritor.escribir(
+                    f"INSERT INTO {TABLA_STAGING} (fila, identificacion, nombres, tipo_documento, apellidos) VALUES\n"
+                    + ",\n".join(valores) + ";\nGO\n\n",
+                    filas=len(lote),
+                )
+                total_registros += len(lote)
+        total_archivos = len(escritor.partes)
+
+    ruta_merge = os.path.join(CARPETA_SALIDA, f"merge_{NOMBRE_TABLA}.sql")
+    with open(ruta_merge, "w", encoding="utf-8") as archivo_sql:
+        archivo_sql.write(f"-- Ejecutar después de todos los staging_parteN.sql\nUSE {BASE_DATOS};\nGO\n\n")
+        archivo_sql.write(sql_insert_desde_staging() + "\n")
+
+    print(f"✅ Archivos de staging generados en '{CARPETA_SALIDA}'. Total registros: {total_registros}, archivos de carga: {total_archivos}")
+    print(f"➡️  Ejecutar al final: {ruta_merge}")
+
+def verificar_con_sqlite(filas, ids_existentes=()):
+    """
+    Ejecuta en SQLite el INSERT set-based de este módulo y el equivalente
+    INSERT ... ON CONFLICT DO NOTHING sobre las mismas filas y compara el
+    resultado. Devuelve True si ambas tablas quedan iguales.
+    """
+    import sqlite3
+
+    conexion = sqlite3.connect(":memory:")
+    resultados = []
+    try:
+        for sql_insert in (sql_insert_desde_staging("sqlite"), sql_insert_on_conflict_sqlite()):
+            cursor = conexion.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS {NOMBRE_TABLA}")
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLA_STAGING}")
+            cursor.execute(
+                f"CREATE TABLE {NOMBRE_TABLA} (identificacion TEXT NOT NULL UNIQUE, "
+                "nombres TEXT, tipo_documento TEXT, apellidos TEXT)"
+            )
+            cursor.executemany(
+                f"INSERT INTO {NOMBRE_TABLA} (identificacion, nombres, tipo_documento, apellidos) VALUES (?, '', '', '')",
+                ((i,) for i in ids_existentes),
+            )
+            cursor.execute(sql_crear_staging("sqlite"))
+            cursor.executemany(
+                f"INSERT INTO {TABLA_STAGING} (fila, identificacion, nombres, tipo_documento, apellidos) VALUES (?, ?, ?, ?, ?)",
+                ((k, *fila) for k, fila in enumerate(filas, 1)),
+            )
+            cursor.execute(sql_insert)
+            resultados.append(cursor.execute(f"SELECT * FROM {NOMBRE_TABLA} ORDER BY identificacion").fetchall())
+    finally:
+        conexion.close()
+
+    return resultados[0] == resultados[1]
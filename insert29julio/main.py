@@ -1,4 +1,25 @@
-from generador import generar_sql
+import argparse
+
+from generador import cargar_ids_existentes, generar_sql, generar_sql_staging, leer_filas, verificar_con_sqlite
 
 if __name__ == "__main__":
-    generar_sql()
+    parser = argparse.ArgumentParser(description="Genera los INSERT de t_tercero")
+    parser.add_argument("--modo", choices=["values", "staging"], default="values",
+                        help="values: lotes de INSERT ... VALUES; staging: tabla de paso + INSERT set-based")
+    parser.add_argument("--carga", choices=["values", "bulk"], default="values",
+                        help="Con --modo staging, cómo se llena la tabla de paso")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="Sigue una ejecución interrumpida desde la primera parte incompleta")
+    parser.add_argument("--delta", action="store_true",
+                        help="Emite solo las filas cuyos IDs no salieron en ejecuciones anteriores")
+    parser.add_argument("--verificar-sqlite", action="store_true",
+                        help="Compara el INSERT set-based con INSERT ... ON CONFLICT en SQLite")
+    args = parser.parse_args()
+
+    if args.verificar_sqlite:
+        iguales = verificar_con_sqlite(list(leer_filas()), cargar_ids_existentes())
+        print("✅ SQLite: mismo resultado que ON CONFLICT" if iguales else "❌ SQLite: los resultados difieren")
+    elif args.modo == "staging":
+        generar_sql_staging(carga=args.carga)
+    else:
+        generar_sql(reanudar=args.reanudar, delta=args.delta)
@@ -1,33 +1,23 @@
 import csv
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.solapado import SOLAPAR_POR_DEFECTO
+from comun.update_masivo import UpdateMasivo
 
 CARPETA_ENTRADA = 'entrada'
 CARPETA_SALIDA = 'salida'
 BASE_DATOS = 'gdocxhl'
 
 IDS_POR_UPDATE = 1000          # Cantidad de IDs por cada UPDATE
-UPDATES_POR_ARCHIVO = 10       # Cantidad de bloques UPDATE por archivo
-IDS_POR_ARCHIVO = IDS_POR_UPDATE * UPDATES_POR_ARCHIVO
-
-def limpiar(texto):
-    return texto.replace("'", "''").strip()
-
-def escribir_bloques(archivo, bloques):
-    for bloque in bloques:
-        archivo.write("UPDATE t_tercero\n")
-        archivo.write("SET tipo_documento = 'NIT'\n")
-        archivo.write("WHERE identificacion IN (\n")
-        archivo.write(",\n".join(f"    '{id}'" for id in bloque))
-        archivo.write("\n);\nGO\n\n")
-
-def generar_update_sql():
-    if not os.path.exists(CARPETA_ENTRADA):
-        print(f"❌ Carpeta de entrada no encontrada: {CARPETA_ENTRADA}")
-        return
-
-    os.makedirs(CARPETA_SALIDA, exist_ok=True)
+BYTES_POR_ARCHIVO = 8 * 1024 * 1024   # Tamaño máximo (sin comprimir) de cada archivo SQL
+COMPRESION = None              # None, 'gzip' o 'zstd'
+MODO = 'in'                    # 'in': bloques WHERE IN; 'staging': tabla de paso + UPDATE ... FROM
+ESCRITURA_DIFERIDA = SOLAPAR_POR_DEFECTO  # Comprimir y escribir en un hilo mientras se arman los UPDATE
 
-    all_ids = []
+def leer_nits():
+    """Entrega (identificacion, 'tipo_documento', 'NIT') por cada fila NIT de los CSV de entrada."""
     for archivo_csv in os.listdir(CARPETA_ENTRADA):
         if not archivo_csv.lower().endswith('.csv'):
             continue
@@ -38,35 +28,38 @@ def generar_update_sql():
             for row in reader:
                 if len(row) < 2:
                     continue
-                identificacion = limpiar(row[0])
-                tipo_doc = limpiar(row[1]).upper()
+                identificacion = row[0].strip()
+                tipo_doc = row[1].strip().upper()
                 if tipo_doc == 'NIT' and identificacion:
-                    all_ids.append(identificacion)
+                    yield identificacion, 'tipo_documento', 'NIT'
 
-    if not all_ids:
-        print("⚠️ No se encontraron identificaciones válidas con tipo NIT.")
+def generar_update_sql():
+    if not os.path.exists(CARPETA_ENTRADA):
+        print(f"❌ Carpeta de entrada no encontrada: {CARPETA_ENTRADA}")
         return
 
-    parte = 1
-    total = len(all_ids)
-    idx = 0
+    motor = UpdateMasivo(
+        CARPETA_SALIDA,
+        "update_tipo_documento_parte{parte}.sql",
+        BASE_DATOS,
+        modo=MODO,
+        ids_por_update=IDS_POR_UPDATE,
+        max_bytes=BYTES_POR_ARCHIVO,
+        compresion=COMPRESION,
+        manifest="update_tipo_documento_manifest.json",
+        al_abrir=lambda path: print(f"📝 Escribiendo archivo: {path}"),
+        diferido=ESCRITURA_DIFERIDA,
+    )
+    with motor:
+        motor.agregar_todos(leer_nits())
 
-    while idx < total:
-        path = os.path.join(CARPETA_SALIDA, f"update_tipo_documento_parte{parte}.sql")
-        with open(path, 'w', encoding='utf-8') as archivo:
-            archivo.write(f"USE {BASE_DATOS};\nGO\n\n")
-            print(f"📝 Escribiendo archivo: {path}")
-
-            bloques_ids = all_ids[idx:idx + IDS_POR_ARCHIVO]
-            bloques = [bloques_ids[i:i + IDS_POR_UPDATE] for i in range(0, len(bloques_ids), IDS_POR_UPDATE)]
-            escribir_bloques(archivo, bloques)
-
-        idx += IDS_POR_ARCHIVO
-        parte += 1
+    if not motor.total:
+        print("⚠️ No se encontraron identificaciones válidas con tipo NIT.")
+        return
 
     print(f"\n✅ Archivos generados en '{CARPETA_SALIDA}'")
-    print(f"🔁 Total identificaciones procesadas: {len(all_ids)}")
-    print(f"📁 Total archivos SQL: {parte - 1}")
+    print(f"🔁 Total identificaciones procesadas: {motor.total}")
+    print(f"📁 Total archivos SQL: {len(motor.escritor.partes)}")
 
 if __name__ == '__main__':
     generar_update_sql()
@@ -1,69 +1,101 @@
 import csv
 import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.escritor_partes import EscritorPartes
+from comun.lotes import agrupar_filas, leer_lotes
+from comun.solapado import SOLAPAR_POR_DEFECTO, resumen_solapado
 
 CARPETA_SALIDA = 'salida'
 ARCHIVO_ENTRADA = 'validos.csv'
 BASE_DATOS = 'gdocxhl'
 
 TAMANO_INSERT_SQLSERVER = 1000
-TAMANO_POR_ARCHIVO = 100000
+BYTES_POR_ARCHIVO = 32 * 1024 * 1024   # Tamaño máximo (sin comprimir) de cada archivo SQL
+COMPRESION = None                      # None, 'gzip' o 'zstd'
+ESCRITURA_DIFERIDA = SOLAPAR_POR_DEFECTO  # Comprimir y escribir en un hilo mientras se arman los INSERT
 
 def limpiar(texto):
     return texto.replace("'", "''").strip()
 
-def escribir_bloques(sqlfile, valores):
+def escribir_bloques(escritor, valores):
     for i in range(0, len(valores), TAMANO_INSERT_SQLSERVER):
         bloque = valores[i:i+TAMANO_INSERT_SQLSERVER]
-        sqlfile.write("INSERT INTO t_tercero (\n    identificacion,\n    nombres,\n    tipo_documento,\n    apellidos\n) VALUES\n")
-        sqlfile.write(",\n".join(bloque))
-        sqlfile.write(";\nGO\n\n")
-
-def generar_insert_sql():
-    if not os.path.exists(ARCHIVO_ENTRADA):
-        print(f"Archivo no encontrado: {ARCHIVO_ENTRADA}")
-        return
+        escritor.escribir(
+            "INSERT INTO t_tercero (\n    identificacion,\n    nombres,\n    tipo_documento,\n    apellidos\n) VALUES\n"
+            + ",\n".join(bloque)
+            + ";\nGO\n\n",
+            filas=len(bloque),
+        )
 
-    os.makedirs(CARPETA_SALIDA, exist_ok=True)
+def leer_validos(ruta=ARCHIVO_ENTRADA):
+    """Entrega lotes de (identificacion, nombres, tipo_documento) desde el CSV de válidos."""
+    with open(ruta, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        encabezado = next(reader, [])
+        yield from leer_lotes(reader, encabezado, ('identificacion', 'nombres', 'tipo_documento'))
 
-    valores_por_archivo = []
-    total_insertados = 0
-    parte_actual = 1
+def generar_insert_sql(filas=None, lotes=None, carpeta_salida=CARPETA_SALIDA):
+    """
+    Genera los INSERT a partir de `lotes` (comun.lotes.Lote con
+    identificacion, nombres, tipo_documento) o de `filas` (iterable de
+    tuplas en ese orden). Si no se indica ninguno, se lee ARCHIVO_ENTRADA
+    como antes. Devuelve las partes escritas (ver EscritorPartes).
+    """
+    if lotes is None and filas is not None:
+        lotes = agrupar_filas(filas, ('identificacion', 'nombres', 'tipo_documento'))
+    if lotes is None:
+        if not os.path.exists(ARCHIVO_ENTRADA):
+            print(f"Archivo no encontrado: {ARCHIVO_ENTRADA}")
+            return
+        lotes = leer_validos()
 
-    def abrir_nuevo_archivo(parte):
-        path = os.path.join(CARPETA_SALIDA, f"insert_terceros_parte{parte}.sql")
-        archivo = open(path, 'w', encoding='utf-8')
-        archivo.write(f"USE {BASE_DATOS};\nGO\n\n")
-        print(f"Escribiendo archivo: {path}")
-        return archivo
+    os.makedirs(carpeta_salida, exist_ok=True)
+    inicio = time.perf_counter()
 
-    archivo_actual = abrir_nuevo_archivo(parte_actual)
+    valores = []
+    total_insertados = 0
 
-    with open(ARCHIVO_ENTRADA, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            identificacion = limpiar(row['identificacion'])
-            nombres = limpiar(row['nombres'])
-            tipo_documento = limpiar(row['tipo_documento'])
-            apellidos = ''
+    escritor = EscritorPartes(
+        carpeta_salida,
+        "insert_terceros_parte{parte}.sql",
+        cabecera=f"USE {BASE_DATOS};\nGO\n\n",
+        max_bytes=BYTES_POR_ARCHIVO,
+        compresion=COMPRESION,
+        manifest="insert_terceros_manifest.json",
+        al_abrir=lambda path: print(f"Escribiendo archivo: {path}"),
+        diferido=ESCRITURA_DIFERIDA,
+    )
 
-            valor = f"('{identificacion}', '{nombres}', '{tipo_documento}', '{apellidos}')"
-            valores_por_archivo.append(valor)
-            total_insertados += 1
+    with escritor:
+        for lote in lotes:
+            # Limpieza por columnas; apellidos siempre vacío
+            valores.extend(
+                f"('{identificacion}', '{nombres}', '{tipo_documento}', '')"
+                for identificacion, nombres, tipo_documento in zip(
+                    map(limpiar, lote['identificacion']), map(limpiar, lote['nombres']),
+                    map(limpiar, lote['tipo_documento'])
+                )
+            )
+            total_insertados += len(lote)
 
-            if len(valores_por_archivo) >= TAMANO_POR_ARCHIVO:
-                escribir_bloques(archivo_actual, valores_por_archivo)
-                archivo_actual.close()
-                valores_por_archivo = []
-                parte_actual += 1
-                archivo_actual = abrir_nuevo_archivo(parte_actual)
+            if len(valores) >= TAMANO_INSERT_SQLSERVER:
+                # Se escriben los INSERT completos; el resto espera al siguiente lote
+                completos = len(valores) - len(valores) % TAMANO_INSERT_SQLSERVER
+                escribir_bloques(escritor, valores[:completos])
+                valores = valores[completos:]
 
-    if valores_por_archivo:
-        escribir_bloques(archivo_actual, valores_por_archivo)
-        archivo_actual.close()
+        if valores:
+            escribir_bloques(escritor, valores)
 
-    print(f"\nArchivos generados correctamente en '{CARPETA_SALIDA}'")
+    print(f"\nArchivos generados correctamente en '{carpeta_salida}'")
     print(f"Total de registros insertados: {total_insertados}")
-    print(f"Total de archivos SQL: {parte_actual}")
+    print(f"Total de archivos SQL: {len(escritor.partes)}")
+    if escritor.escritura:
+        print(resumen_solapado(time.perf_counter() - inicio, escritor.escritura))
+    return escritor.partes
 
 if __name__ == '__main__':
     generar_insert_sql()
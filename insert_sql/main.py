@@ -1,5 +1,10 @@
+import argparse
+import contextlib
+import csv
+import io
 import subprocess
 import os
+import traceback
 
 def ejecutar(script):
     print(f"\n--- Ejecutando: {script} ---")
@@ -8,7 +13,55 @@ def ejecutar(script):
     if resultado.stderr:
         print(f"Errores:\n{resultado.stderr}")
 
+def ejecutar_en_proceso(nombre, funcion, *args):
+    """Igual que `ejecutar`, pero llamando a `funcion` dentro de este intérprete."""
+    print(f"\n--- Ejecutando: {nombre} ---")
+    salida = io.StringIO()
+    errores = io.StringIO()
+    with contextlib.redirect_stdout(salida), contextlib.redirect_stderr(errores):
+        try:
+            funcion(*args)
+        except Exception:
+            traceback.print_exc()
+    print(salida.getvalue())
+    if errores.getvalue():
+        print(f"Errores:\n{errores.getvalue()}")
+
+def con_checkpoint(lotes, ruta):
+    """Deja pasar los lotes y, de paso, los guarda en `ruta` para depuración."""
+    with open(ruta, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow(['identificacion', 'nombres', 'tipo_documento'])
+        for lote in lotes:
+            writer.writerows(lote.filas())
+            yield lote
+
+def verificar_y_generar(checkpoint=None):
+    from verificarNombres import iterar_lotes_validos
+    from generador import generar_insert_sql
+
+    total = 0
+
+    def contados(lotes):
+        nonlocal total
+        for lote in lotes:
+            total += len(lote)
+            yield lote
+
+    lotes = contados(iterar_lotes_validos())
+    if checkpoint:
+        lotes = con_checkpoint(lotes, checkpoint)
+    generar_insert_sql(lotes=lotes)
+    print("Verificación completada. Registros válidos:", total)
+
 def main():
+    parser = argparse.ArgumentParser(description="Verifica nombres y genera los INSERT de t_tercero")
+    parser.add_argument('--en-proceso', action='store_true',
+                        help="Verifica y genera en el mismo proceso, sin escribir 'validos.csv'")
+    parser.add_argument('--checkpoint', metavar='RUTA',
+                        help="Con --en-proceso, guarda también las filas válidas en RUTA")
+    args = parser.parse_args()
+
     print("Iniciando proceso completo...")
 
     if not os.path.exists('entrada'):
@@ -19,6 +72,11 @@ def main():
         print("No se encontró la carpeta 'id'. Allí deben estar los identificadores existentes.")
         return
 
+    if args.en_proceso:
+        ejecutar_en_proceso('verificarNombres.py -> generador.py', verificar_y_generar, args.checkpoint)
+        print("\n✅ Proceso finalizado correctamente.")
+        return
+
     ejecutar('verificarNombres.py')
 
     if not os.path.exists('validos.csv'):
@@ -1,6 +1,10 @@
 import csv
 import os
-import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.lotes import Lote, leer_lotes
+from comun.nombres import VALIDO, ReglasNombre
 
 CARPETA_ENTRADA = 'entrada'
 CARPETA_IDS = 'id'
@@ -18,44 +22,63 @@ def cargar_identificaciones_existentes():
                     ids_existentes.add(row[0].strip().strip('"'))
     return ids_existentes
 
-def nombre_valido(nombre):
-    nombre = nombre.strip()
-    if len(nombre) <= 1:
-        return False
-    if re.fullmatch(r'\W+', nombre):  # solo símbolos
-        return False
-    if re.fullmatch(r'\d+', nombre):  # solo números
-        return False
-    if nombre.count('-') > 3:
-        return False
-    return True
+# Al menos dos caracteres, no solo símbolos ni solo números, máximo 3 guiones
+REGLAS_NOMBRE = ReglasNombre(
+    min_largo=2,
+    rechazar_solo={'solo_simbolos': r'\W', 'solo_numeros': r'\d'},
+    max_guiones=3,
+)
 
-def verificar_nombres():
-    ids_existentes = cargar_identificaciones_existentes()
-    validos = []
+def validar_lote(lote, ids_existentes):
+    """Deja del lote (identificacion, nombredocumento, nombre) solo los registros válidos."""
+    validos = Lote(('identificacion', 'nombres', 'tipo_documento'))
+    ids, nombres, tipos = validos.columnas
+    nombres_lote = [nombre.strip().upper() for nombre in lote['nombre']]
+    for identificacion, tipo_documento, nombre, motivo in zip(
+        lote['identificacion'], lote['nombredocumento'], nombres_lote, REGLAS_NOMBRE.codigos(nombres_lote)
+    ):
+        identificacion = identificacion.strip().strip('"')
+        if not identificacion or motivo != VALIDO:
+            continue
+        if identificacion in ids_existentes:
+            continue
+        ids.append(identificacion)
+        nombres.append(nombre)
+        tipos.append(tipo_documento.strip())
+    return validos
+
+def iterar_lotes_validos(ids_existentes=None):
+    """Recorre los CSV de entrada y va entregando lotes válidos de (identificacion, nombres, tipo_documento)."""
+    if ids_existentes is None:
+        ids_existentes = cargar_identificaciones_existentes()
 
     for archivo in os.listdir(CARPETA_ENTRADA):
         if not archivo.lower().endswith('.csv'):
             continue
         ruta = os.path.join(CARPETA_ENTRADA, archivo)
         with open(ruta, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                identificacion = row.get('identificacion', '').strip().strip('"')
-                tipo_documento = row.get('nombredocumento', '').strip()
-                nombre = row.get('nombre', '').strip().upper()
-                if not identificacion or not nombre_valido(nombre):
-                    continue
-                if identificacion in ids_existentes:
-                    continue
-                validos.append((identificacion, nombre, tipo_documento))
+            reader = csv.reader(csvfile)
+            encabezado = next(reader, [])
+            for lote in leer_lotes(reader, encabezado, ('identificacion', 'nombredocumento', 'nombre')):
+                validos = validar_lote(lote, ids_existentes)
+                if validos:
+                    yield validos
 
+def iterar_validos(ids_existentes=None):
+    """Recorre los CSV de entrada y va entregando (identificacion, nombre, tipo_documento) válidos."""
+    for lote in iterar_lotes_validos(ids_existentes):
+        yield from lote.filas()
+
+def verificar_nombres():
+    total = 0
     with open(ARCHIVO_VALIDOS, 'w', newline='', encoding='utf-8') as out:
         writer = csv.writer(out)
         writer.writerow(['identificacion', 'nombres', 'tipo_documento'])
-        writer.writerows(validos)
+        for lote in iterar_lotes_validos():
+            writer.writerows(lote.filas())
+            total += len(lote)
 
-    print("Verificación completada. Registros válidos:", len(validos))
+    print("Verificación completada. Registros válidos:", total)
 
 if __name__ == '__main__':
     verificar_nombres()
@@ -1,19 +1,29 @@
 import csv
+import functools
 import os
-import re
+import sys
 from textwrap import dedent
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.cuarentena import Cuarentena, lineas_metricas
+from comun.lotes import Lote, leer_lotes
+from comun.nombres import VALIDO, ReglasNombre
+
 # === CONFIGURACIÓN GENERAL ===
 REGISTROS_POR_INSERT = 1000
 INSERTS_POR_ARCHIVO = 100
 REGISTROS_POR_ARCHIVO = REGISTROS_POR_INSERT * INSERTS_POR_ARCHIVO
 NOMBRE_TABLA = "gdocxhl.dbo.t_tercero"
+PASO = "insertar"
 
-# === Validaciones de nombre ===
-REGEX_VALIDO = re.compile(r"^[A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑ \-]{1,}$", re.IGNORECASE)
-REGEX_SOLO_NUMEROS = re.compile(r"^\d+$")
-REGEX_SOLO_UNA_LETRA = re.compile(r"^[A-ZÁÉÍÓÚÑ]$", re.IGNORECASE)
-REGEX_COMIENZA_SIMBOLO = re.compile(r"^[^A-ZÁÉÍÓÚÑ]", re.IGNORECASE)
+# === Validaciones de nombre: solo letras, espacios y guiones, empezando por letra ===
+REGLAS_NOMBRE = ReglasNombre(
+    min_largo=2,
+    rechazar_solo={"solo_numeros": r"\d"},
+    primer_caracter="[A-ZÁÉÍÓÚÑ]",
+    caracteres=r"[A-ZÁÉÍÓÚÑ \-]",
+    ignorar_mayusculas=True,
+)
 
 def limpiar(valor):
     return str(valor).replace("'", "''").strip() if valor else ""
@@ -31,18 +41,7 @@ def separar_nombre_apellido(nombre_completo):
     return '', ''
 
 def es_valido(texto):
-    if not texto:
-        return False
-    texto = texto.strip()
-    if REGEX_SOLO_NUMEROS.match(texto):
-        return False
-    if REGEX_SOLO_UNA_LETRA.match(texto):
-        return False
-    if REGEX_COMIENZA_SIMBOLO.match(texto):
-        return False
-    if not REGEX_VALIDO.match(texto):
-        return False
-    return True
+    return REGLAS_NOMBRE.es_valido(texto)
 
 def cargar_ids_existentes(archivo_ids):
     existentes = set()
@@ -54,44 +53,73 @@ def cargar_ids_existentes(archivo_ids):
                 existentes.add(row[0].strip())
     return existentes
 
-def generar_sql_desde_csv_condicional(archivo_datos, archivo_ids_existentes, carpeta_salida):
-    ids_existentes = cargar_ids_existentes(archivo_ids_existentes)
-
-    with open(archivo_datos, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        datos = list(reader)
-
-    os.makedirs(carpeta_salida, exist_ok=True)
-    errores = []
-
-    datos_filtrados = []
-    for registro in datos:
-        identificacion = limpiar(registro.get("numDocumento", ""))
-        if not identificacion or identificacion in ids_existentes:
+def validar_lote(lote, ids_existentes, aceptados, rechazar=None):
+    """
+    Valida un lote de (numDocumento, nomApellido, fila): agrega a `aceptados`
+    los registros nuevos con nombre y apellido válidos y pasa los demás a
+    `rechazar(paso, filas, motivos, datos, evaluadas)` (ver Cuarentena.rechazar),
+    con el motivo del rechazo.
+    """
+    separados = [separar_nombre_apellido(limpiar(nombre_completo)) for nombre_completo in lote["nomApellido"]]
+    nombres = [limpiar(nombre) for nombre, _ in separados]
+    apellidos = [limpiar(apellido) for _, apellido in separados]
+    # Una pasada del validador por columna
+    motivos_nombres = REGLAS_NOMBRE.codigos(nombres)
+    motivos_apellidos = REGLAS_NOMBRE.codigos(apellidos)
+
+    filas, motivos, datos = [], [], []
+    for fila, identificacion, nombre, apellido, motivo_nombre, motivo_apellido in zip(
+        lote.columna("fila", None), map(limpiar, lote["numDocumento"]), nombres, apellidos,
+        motivos_nombres, motivos_apellidos
+    ):
+        if not identificacion:
+            motivo = "identificacion:vacio"
+        elif identificacion in ids_existentes:
+            motivo = "identificacion:existente"
+        elif motivo_nombre == VALIDO and motivo_apellido == VALIDO:
+            for columna, valor in zip(aceptados.columnas, (identificacion, nombre, apellido)):
+                columna.append(valor)
+            ids_existentes.add(identificacion)
             continue
-
-        nombre_completo = limpiar(registro.get("nomApellido", ""))
-        nombres, apellidos = separar_nombre_apellido(nombre_completo)
-        nombres = limpiar(nombres)
-        apellidos = limpiar(apellidos)
-
-        if not (es_valido(nombres) and es_valido(apellidos)):
-            errores.append({
-                "numDocumento": identificacion,
-                "nombres": nombres,
-                "apellidos": apellidos
-            })
-            continue
-
-        datos_filtrados.append((identificacion, nombres, apellidos, ""))  # tipo_documento vacío
-        ids_existentes.add(identificacion)
+        else:
+            motivo = f"nombres:{motivo_nombre}" if motivo_nombre != VALIDO else f"apellidos:{motivo_apellido}"
+        filas.append(fila)
+        motivos.append(motivo)
+        datos.append({"numDocumento": identificacion, "nombres": nombre, "apellidos": apellido})
+
+    if rechazar:
+        rechazar(PASO, filas, motivos, datos, len(lote))
+
+def generar_sql_desde_csv_condicional(archivo_datos, archivo_ids_existentes, carpeta_salida, ids_existentes=None):
+    """
+    Con `ids_existentes` (un set ya cargado con cargar_ids_existentes, p. ej. el
+    que mantiene el servicio) no se relee `archivo_ids_existentes`; se trabaja
+    sobre una copia y el set recibido no cambia. Devuelve las rutas de los SQL.
+    """
+    if ids_existentes is None:
+        ids_existentes = cargar_ids_existentes(archivo_ids_existentes)
+    else:
+        ids_existentes = set(ids_existentes)
+
+    # Se guardan solo las columnas aceptadas, no un dict por cada fila del CSV
+    datos_filtrados = Lote(("identificacion", "nombres", "apellidos"))  # tipo_documento vacío
+    # Los rechazos van a disco a medida que aparecen; en memoria solo quedan los conteos
+    cuarentena = Cuarentena(os.path.join(carpeta_salida, "cuarentena.csv"), reiniciar=True)
+    rechazar = functools.partial(cuarentena.rechazar, os.path.basename(archivo_datos))
+    with cuarentena, open(archivo_datos, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        encabezado = next(reader, [])
+        for lote in leer_lotes(reader, encabezado, ("numDocumento", "nomApellido"), campo_fila="fila"):
+            validar_lote(lote, ids_existentes, datos_filtrados, rechazar)
 
     total_registros = len(datos_filtrados)
     total_archivos = (total_registros + REGISTROS_POR_ARCHIVO - 1) // REGISTROS_POR_ARCHIVO
+    archivos = []
 
     for i in range(total_archivos):
         parte = i + 1
         nombre_archivo = os.path.join(carpeta_salida, f"parte{parte}.sql")
+        archivos.append(nombre_archivo)
 
         with open(nombre_archivo, "w", encoding="utf-8") as archivo_sql:
             archivo_sql.write(f"-- Inserciones para {NOMBRE_TABLA} (sin validación EXISTS)\n")
@@ -104,8 +132,8 @@ def generar_sql_desde_csv_condicional(archivo_datos, archivo_ids_existentes, car
                     break
 
                 values = [
-                    f"('{id_}', '{n}', '{a}', '{td}')"
-                    for id_, n, a, td in datos_filtrados[inicio:fin]
+                    f"('{id_}', '{n}', '{a}', '')"
+                    for id_, n, a in datos_filtrados.rebanar(inicio, fin).filas()
                 ]
 
                 if values:
@@ -120,12 +148,9 @@ def generar_sql_desde_csv_condicional(archivo_datos, archivo_ids_existentes, car
 
                     archivo_sql.write(insert_sql + "\n\n")
 
-    if errores:
-        archivo_errores = os.path.join(carpeta_salida, "errores.csv")
-        with open(archivo_errores, "w", newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=["numDocumento", "nombres", "apellidos"])
-            writer.writeheader()
-            writer.writerows(errores)
-        print(f"⚠️  {len(errores)} registros inválidos guardados en '{archivo_errores}'.")
+    for linea in lineas_metricas(cuarentena.metricas(), motivos_por_paso=5):
+        print(f"⚠️  {linea}")
+    print(f"🚧 Registros rechazados en '{cuarentena.ruta}'.")
 
     print(f"✅ SQL generado en '{carpeta_salida}' con {total_archivos} archivo(s).")
+    return archivos
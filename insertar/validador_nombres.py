@@ -1,53 +1,63 @@
 import csv
-import re
+import os
+import sys
 
-# Solo se permiten letras, espacios y guiones medios
-REGEX_VALIDO = re.compile(r"^[A-ZÁÉÍÓÚÑ][A-ZÁÉÍÓÚÑ \-]{1,}$", re.IGNORECASE)
-REGEX_SOLO_NUMEROS = re.compile(r"^\d+$")
-REGEX_SOLO_UNA_LETRA = re.compile(r"^[A-ZÁÉÍÓÚÑ]$", re.IGNORECASE)
-REGEX_COMIENZA_SIMBOLO = re.compile(r"^[^A-ZÁÉÍÓÚÑ]", re.IGNORECASE)
-
-def es_nombre_valido(texto):
-    if not texto:
-        return False
-    texto = texto.strip()
-    if REGEX_SOLO_NUMEROS.match(texto):
-        return False
-    if REGEX_SOLO_UNA_LETRA.match(texto):
-        return False
-    if REGEX_COMIENZA_SIMBOLO.match(texto):
-        return False
-    if not REGEX_VALIDO.match(texto):
-        return False
-    return True
-
-def validar_csv_entrada(archivo_entrada, archivo_salida_valido, archivo_salida_invalido):
-    with open(archivo_entrada, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        registros_validos = []
-        registros_invalidos = []
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.cuarentena import Cuarentena, lineas_metricas
+from comun.lotes import Lote, leer_lotes
+from comun.nombres import VALIDO, ReglasNombre
 
-        for fila in reader:
-            nombre = fila.get("nombres", "").strip()
-            apellido = fila.get("apellidos", "").strip()
-
-            if es_nombre_valido(nombre) and es_nombre_valido(apellido):
-                registros_validos.append(fila)
-            else:
-                registros_invalidos.append(fila)
+# Solo se permiten letras, espacios y guiones medios
+REGLAS_NOMBRE = ReglasNombre(
+    min_largo=2,
+    rechazar_solo={"solo_numeros": r"\d"},
+    primer_caracter="[A-ZÁÉÍÓÚÑ]",
+    caracteres=r"[A-ZÁÉÍÓÚÑ \-]",
+    ignorar_mayusculas=True,
+)
+
+def validar_csv_entrada(archivo_entrada, archivo_salida_valido, archivo_salida_invalido, archivo_cuarentena=None):
+    """
+    Los inválidos van a `archivo_salida_invalido` con las mismas columnas de la
+    entrada (se pueden corregir y volver a pasar) y, con su fila y motivo, a la
+    cuarentena `archivo_cuarentena` (por defecto <inválidos>_cuarentena.csv),
+    a medida que aparecen.
+    """
+    if archivo_cuarentena is None:
+        archivo_cuarentena = os.path.splitext(archivo_salida_invalido)[0] + "_cuarentena.csv"
+    cuarentena = Cuarentena(archivo_cuarentena, reiniciar=True)
+    with cuarentena, open(archivo_entrada, "r", encoding="utf-8") as f, \
+            open(archivo_salida_invalido, "w", newline="", encoding="utf-8") as f_inv:
+        reader = csv.reader(f)
+        encabezado = next(reader, [])
+        registros_validos = Lote(encabezado)
+        escritor_invalidos = csv.writer(f_inv)
+        escritor_invalidos.writerow(encabezado)
+
+        for lote in leer_lotes(reader, encabezado, campo_fila="_fila"):
+            motivos_nombres = REGLAS_NOMBRE.codigos(lote.columna("nombres"))
+            motivos_apellidos = REGLAS_NOMBRE.codigos(lote.columna("apellidos"))
+            validos = [n == VALIDO and a == VALIDO for n, a in zip(motivos_nombres, motivos_apellidos)]
+            invalidos = lote.filtrar([not valido for valido in validos])
+            cuarentena.rechazar(
+                os.path.basename(archivo_entrada), "nombres", invalidos["_fila"],
+                [f"nombres:{n}" if n != VALIDO else f"apellidos:{a}"
+                 for n, a, valido in zip(motivos_nombres, motivos_apellidos, validos) if not valido],
+                (dict(zip(encabezado, fila)) for fila in invalidos.filas()),
+                len(lote),
+            )
+            escritor_invalidos.writerows(Lote(encabezado, invalidos.columnas[:-1]).filas())
+            registros_validos.extender(Lote(encabezado, lote.filtrar(validos).columnas[:-1]))
 
     # Guardar válidos
     with open(archivo_salida_valido, "w", newline="", encoding="utf-8") as f_val:
-        writer = csv.DictWriter(f_val, fieldnames=reader.fieldnames)
-        writer.writeheader()
-        writer.writerows(registros_validos)
-
-    # Guardar inválidos
-    with open(archivo_salida_invalido, "w", newline="", encoding="utf-8") as f_inv:
-        writer = csv.DictWriter(f_inv, fieldnames=reader.fieldnames)
-        writer.writeheader()
-        writer.writerows(registros_invalidos)
+        writer = csv.writer(f_val)
+        writer.writerow(encabezado)
+        writer.writerows(registros_validos.filas())
 
     print(f"✅ Validación completada.")
     print(f"✔ Registros válidos: {len(registros_validos)} guardados en: {archivo_salida_valido}")
-    print(f"❌ Registros inválidos: {len(registros_invalidos)} guardados en: {archivo_salida_invalido}")
+    print(f"❌ Registros inválidos: {sum(cuarentena.rechazadas.values())} guardados en: {archivo_salida_invalido}")
+    print(f"🚧 Fila y motivo de cada inválido en: {archivo_cuarentena}")
+    for linea in lineas_metricas(cuarentena.metricas(), motivos_por_paso=len(cuarentena.rechazadas)):
+        print(f"   {linea}")
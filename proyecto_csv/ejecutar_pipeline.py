@@ -1,5 +1,17 @@
+import argparse
+import csv
+import functools
+import heapq
+import itertools
 import os
+import pickle
+import sys
+import tempfile
+import time
+from typing import Iterable, Iterator, Optional, Tuple
+import numpy as np
 import pandas as pd
+from contextlib import ExitStack
 from datetime import datetime
 import logging
 import shutil
@@ -9,6 +21,14 @@ from procesamiento.estandarizar_columnas import estandarizar_columnas
 from procesamiento.limpiar_csv import limpiar_csv
 from procesamiento.validar_identificacion import validar_identificaciones_dataframe
 from procesamiento.validar_nombres_y_apellidos import validar_nombres_y_apellidos_dataframe
+from procesamiento.utils import detectar_delimitador, mapear_columnas
+from procesamiento.muestra import MODOS_MUESTRA, DESCARTADO, MODIFICADO, leer_muestra, diferencias_muestra
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.cuarentena import Cuarentena, lineas_metricas
+from comun.identificacion import normalizar_identificaciones
+from comun.memoria import MB, GobernadorMemoria, parsear_tamano
+from comun.solapado import SOLAPAR_POR_DEFECTO, EscrituraDiferida, LecturaAdelantada, resumen_solapado
 
 # Configuración de logging
 logging.basicConfig(level=logging.INFO,
@@ -20,27 +40,320 @@ ENTRADA_DIR = "entrada"
 SALIDA_DIR = "salida"
 MEMORIA_DIR = "memoria"
 ERRORES_DIR = "errores"
+MUESTRAS_DIR = "muestras"       # Reportes antes/después del modo --muestra
+CUARENTENA_DIR = "cuarentena"   # Filas rechazadas de cada corrida, con paso y motivo
+
+# Mismas opciones para leer el archivo completo y las muestras
+OPCIONES_LECTURA = dict(dtype=str, engine='python', on_bad_lines='warn', encoding='utf-8')
+EJEMPLOS_POR_CAMPO = 5          # Cambios más repetidos que se muestran por campo en el resumen de la muestra
+# Con --max-memory: un bloque ocupa unas FACTOR_TRABAJO veces lo que recién leído mientras pasa
+# por los pasos; si el archivo completo no cabe se procesa por bloques y particiones en disco
+FACTOR_TRABAJO = 4.0
+FRACCION_BLOQUE = 0.5
+FRACCION_DEDUPLICAR = 0.8       # Para cada partición al deduplicar (ya no hay bloques en memoria)
+# Leer el bloque siguiente y guardar el anterior (copia original y particiones) en hilos
+# aparte mientras se procesa el actual; los bloques adelantados se suman al factor de trabajo.
+# Solo con más de un núcleo
+SOLAPAR_IO = SOLAPAR_POR_DEFECTO
+BLOQUES_ADELANTADOS = 1
+
+# Campo cuyos valores descartados se resumen para cada paso que descarta filas
+CAMPO_DEL_PASO = {'identificaciones': 'identificacion', 'nombres': 'nombres'}
+
+# Normalización de identificaciones antes de validarlas (el tipo repetido al inicio siempre se quita)
+QUITAR_SEPARADORES_ID = False   # '1.234.567' -> '1234567'
+QUITAR_CEROS_ID = False         # '000123456' -> '123456'
 
 # Crear directorios si no existen
 os.makedirs(SALIDA_DIR, exist_ok=True)
 os.makedirs(MEMORIA_DIR, exist_ok=True)
 os.makedirs(ERRORES_DIR, exist_ok=True)
+os.makedirs(MUESTRAS_DIR, exist_ok=True)
+os.makedirs(CUARENTENA_DIR, exist_ok=True)
 
 def leer_csv(ruta: str) -> pd.DataFrame:
     """Lee un archivo CSV con delimitador ; o , y manejo robusto de errores"""
     try:
-        with open(ruta, 'r', encoding='utf-8') as f:
-            first_line = f.readline()
-            delimiter = ';' if ';' in first_line else ','
+        delimiter = detectar_delimitador(ruta)
 
-        return pd.read_csv(ruta, sep=delimiter, dtype=str, engine='python',
-                           on_bad_lines='warn', encoding='utf-8')
+        return pd.read_csv(ruta, sep=delimiter, **OPCIONES_LECTURA)
     except Exception as e:
         logger.error(f"No se pudo leer el archivo {ruta}: {str(e)}")
         return pd.DataFrame()
 
-def procesar_archivo(ruta_entrada: str) -> bool:
-    """Procesa un archivo CSV paso a paso"""
+def quitar_espacios(df: pd.DataFrame) -> pd.DataFrame:
+    return df.apply(lambda x: x.str.strip() if x.dtype == 'object' else x)
+
+def pasos_hasta_identificaciones(df: pd.DataFrame, al_terminar_paso=lambda paso, df: None, rechazar=None):
+    """Pasos 2 a 4; devuelve (registros con identificación válida, sin duplicados, reporte) o (None, {}) si falta la columna."""
+    # Paso 2: Estandarizar nombres de columnas
+    df.columns = [col.strip().lower() for col in df.columns]
+    mapeo = mapear_columnas(list(df.columns))
+    df.rename(columns=mapeo, inplace=True)  #validar tipo documento texto
+    from procesamiento.validar_tipo_documento import validar_tipo_documento_dataframe
+
+    df = validar_tipo_documento_dataframe(df)
+    al_terminar_paso("tipo_documento", df)
+
+    # Paso 3: Limpieza básica
+    if rechazar:
+        rechazar("limpieza", df[df.isna().all(axis=1)], "fila_vacia", len(df))
+    df = df.dropna(how='all')
+    df = quitar_espacios(df)
+    df.replace(r'^\s*$', pd.NA, regex=True, inplace=True)
+    al_terminar_paso("limpieza", df)
+
+    # Paso 4: Validar identificaciones
+    if 'identificacion' not in df.columns:
+        logger.error("❌ No existe columna 'identificacion'")
+        return None, {}
+
+    df['identificacion'] = normalizar_identificaciones(df, quitar_separadores=QUITAR_SEPARADORES_ID,
+                                                       quitar_ceros=QUITAR_CEROS_ID)
+    df, reporte_ident = validar_identificaciones_dataframe(df, rechazar)
+    al_terminar_paso("identificaciones", df)
+    return df, reporte_ident
+
+def paso_nombres(df: pd.DataFrame, al_terminar_paso=lambda paso, df: None, rechazar=None):
+    """Paso 5; devuelve (registros con nombre válido, reporte) o (None, {}) si falta la columna."""
+    # Paso 5: Validar nombres (apellidos pueden ser opcionales)
+    if 'nombres' not in df.columns:
+        logger.error("❌ No existe columna 'nombres'")
+        return None, {}
+
+    df, reporte_nombres_apellidos = validar_nombres_y_apellidos_dataframe(df, rechazar)
+    al_terminar_paso("nombres", df)
+    return df, reporte_nombres_apellidos
+
+def aplicar_pasos(df: pd.DataFrame, al_terminar_paso=lambda paso, df: None, rechazar=None):
+    """
+    Pasos 2 a 5 sobre el archivo ya leído y sin espacios. Devuelve los
+    registros válidos o None si el archivo no sirve. `al_terminar_paso(paso, df)`
+    se llama tras cada paso (el modo muestra lo usa para saber qué paso descarta cada fila).
+    `rechazar(paso, filas, motivo, evaluadas)` recibe las filas que descarta cada
+    paso, con el número de fila como índice (ver Cuarentena.rechazar_df).
+    """
+    df, reporte_ident = pasos_hasta_identificaciones(df, al_terminar_paso, rechazar)
+    if df is None:
+        return None
+    logger.info(f"🆔 Validación de identificaciones: {reporte_ident}")
+
+    if df.empty:
+        logger.warning("⚠️ No quedaron registros válidos tras validar identificaciones")
+        return None
+
+    df, reporte_nombres_apellidos = paso_nombres(df, al_terminar_paso, rechazar)
+    if df is None:
+        return None
+    logger.info(f"🔤 Validación de nombres y apellidos: {reporte_nombres_apellidos}")
+
+    if df.empty:
+        logger.warning("⚠️ No quedaron registros válidos tras validar nombres")
+        return None
+    return df
+
+def _clave_registro(df: pd.DataFrame) -> pd.Series:
+    """La misma clave con la que validar_identificaciones_dataframe deduplica y ordena"""
+    return df['tipo_documento'].str.upper() + "_" + df['identificacion']
+
+def _guardar_csv(df: pd.DataFrame, ruta: str):
+    df.to_csv(ruta, index=False, sep=';')
+
+def _leer_partes(ruta: str):
+    with open(ruta, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def _bloques_por_particiones(ruta_entrada: str, gobernador: GobernadorMemoria, rechazar=None,
+                             ruta_original: str = None, filas_por_bloque: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Como bloques_procesados para archivos que no caben en el presupuesto de
+    memoria. Los pasos 2 a 4 corren por bloque y los registros válidos se
+    reparten en particiones en disco según su clave (tipo + identificación):
+    los duplicados caen en la misma partición, y la deduplicación y el paso 5
+    corren partición por partición. Cada partición queda ordenada por clave y
+    la salida se arma mezclándolas, así es la misma que con el archivo completo.
+    """
+    particiones = gobernador.particiones(gobernador.presupuesto(FRACCION_DEDUPLICAR))
+    logger.info(f"🧮 ~{gobernador.bytes_archivo() / MB:.0f} MB estimados, más que el presupuesto: "
+                f"bloques de {gobernador.filas} filas y {particiones} particiones")
+    filas_por_bloque = filas_por_bloque or gobernador.filas
+    reporte = {'total_registros': 0, 'identificaciones_invalidas': 0, 'duplicados_eliminados': 0,
+               'nombres_invalidos': 0, 'registros_validos': 0}
+    inicio = time.perf_counter()
+
+    nombre_base = os.path.splitext(os.path.basename(ruta_entrada))[0]
+    with tempfile.TemporaryDirectory(prefix=f"{nombre_base}_", dir=MEMORIA_DIR) as temporal:
+        rutas = [os.path.join(temporal, f"particion_{k}.pkl") for k in range(particiones)]
+
+        def guardar_bloque(numero, original, df):
+            """Copia original del bloque y sus registros válidos repartidos en las particiones"""
+            if ruta_original:
+                original.to_csv(ruta_original, mode='a', header=numero == 0, index=False, sep=';')
+            if df is None or df.empty:
+                return
+            destinos = pd.util.hash_pandas_object(_clave_registro(df), index=False).to_numpy() % particiones
+            for k, parte in df.groupby(destinos):
+                pickle.dump(parte, archivos[k], protocol=pickle.HIGHEST_PROTOCOL)
+
+        with ExitStack() as pila:
+            archivos = [pila.enter_context(open(ruta, 'wb')) for ruta in rutas]
+            lector = pd.read_csv(ruta_entrada, sep=detectar_delimitador(ruta_entrada), iterator=True,
+                                 **OPCIONES_LECTURA)
+            bloques = gobernador.bloques(lector)
+            lectura = None
+            if SOLAPAR_IO:
+                bloques = lectura = LecturaAdelantada(bloques, BLOQUES_ADELANTADOS, nombre="lectura csv")
+            # Se cierra antes que los archivos de las particiones (ExitStack los cierra en orden inverso)
+            escritura = pila.enter_context(EscrituraDiferida(guardar_bloque, nombre="escritura bloques",
+                                                             en_hilo=SOLAPAR_IO))
+            for numero, bloque in enumerate(bloques):
+                bloque.index += 1   # Número de fila en el archivo, para la cuarentena
+                df = quitar_espacios(bloque)
+                # Copia superficial: los pasos renombran las columnas de df, no tocan sus datos
+                original = df.copy(deep=False)
+
+                df, reporte_ident = pasos_hasta_identificaciones(df, rechazar=rechazar)
+                if df is None:
+                    escritura.poner(numero, original, None)
+                    return
+                reporte['total_registros'] += reporte_ident['total_registros']
+                reporte['identificaciones_invalidas'] += reporte_ident['identificaciones_invalidas']
+                reporte['duplicados_eliminados'] += (reporte_ident['total_registros']
+                                                     - reporte_ident['identificaciones_invalidas'] - len(df))
+                if not df.empty and 'nombres' not in df.columns:
+                    logger.error("❌ No existe columna 'nombres'")
+                    escritura.poner(numero, original, None)
+                    return
+                escritura.poner(numero, original, df)
+
+        # Deduplicación entre bloques y paso 5, partición por partición. Las filas ya se
+        # contaron como evaluadas en el paso de identificaciones: aquí solo salen duplicados
+        solo_duplicados = rechazar and (lambda paso, filas, motivo, evaluadas: rechazar(paso, filas, motivo, 0))
+        ordenadas = []
+        columnas = None
+        for ruta in rutas:
+            partes = list(_leer_partes(ruta))
+            if not partes:
+                continue
+            df = pd.concat(partes)
+            del partes
+            validos = len(df)
+            df, _ = validar_identificaciones_dataframe(df, solo_duplicados)
+            reporte['duplicados_eliminados'] += validos - len(df)
+            df, reporte_nombres = paso_nombres(df, rechazar=rechazar)
+            reporte['nombres_invalidos'] += reporte_nombres['nombres_invalidos']
+            gobernador.revisar()
+            if df.empty:
+                continue
+            columnas = list(df.columns)
+            df.insert(0, '_clave', _clave_registro(df))
+            ordenadas.append(ruta[:-len('.pkl')] + '.csv')
+            df.to_csv(ordenadas[-1], index=False, header=False, sep=';')
+
+        if not ordenadas:
+            logger.warning("⚠️ No quedaron registros válidos")
+            return
+
+        # Mezcla ordenada por clave: mismo orden que el archivo completo. Las celdas vacías
+        # vuelven a ser nulos, como en el DataFrame del archivo completo
+        with ExitStack() as pila:
+            lectores = [csv.reader(pila.enter_context(open(ruta, newline='', encoding='utf-8')), delimiter=';')
+                        for ruta in ordenadas]
+            mezcla = (fila[1:] for fila in heapq.merge(*lectores, key=lambda fila: fila[0]))
+            while True:
+                filas = list(itertools.islice(mezcla, filas_por_bloque))
+                if not filas:
+                    break
+                reporte['registros_validos'] += len(filas)
+                valores = np.array(filas, dtype=object)
+                valores[valores == ''] = np.nan
+                yield pd.DataFrame(valores, columns=columnas)
+
+    logger.info(f"🆔🔤 Validación por bloques: {reporte}")
+    logger.info(gobernador.resumen())
+    logger.info(resumen_solapado(time.perf_counter() - inicio, lectura, escritura))
+
+def bloques_procesados(ruta_entrada: str, max_memoria: int = None, cuarentena: Cuarentena = None,
+                       ruta_original: str = None, filas_por_bloque: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Los registros válidos de un CSV como un iterador de DataFrames de hasta
+    `filas_por_bloque` filas (None: uno solo, o los del presupuesto de memoria),
+    con las mismas columnas y en el mismo orden que el CSV de salida; los
+    faltantes son nulos. Sirve para pasar los registros a otro paso (SQL, JSON)
+    sin escribir ni releer el CSV. Los bloques son vistas del resultado, sin
+    copiar: quien los recibe no debe modificarlos.
+
+    Con `max_memoria` (bytes), por bloques y particiones si no cabe completo.
+    Las filas que descarta cada paso van a `cuarentena`, si se pasa; con
+    `ruta_original` se guarda ahí una copia del archivo leído. Si el archivo
+    no sirve (falta una columna, no quedan registros) no entrega ningún bloque.
+    """
+    nombre_archivo = os.path.basename(ruta_entrada)
+    rechazar = functools.partial(cuarentena.rechazar_df, nombre_archivo) if cuarentena else None
+
+    if max_memoria:
+        factor = FACTOR_TRABAJO + (1 + BLOQUES_ADELANTADOS if SOLAPAR_IO else 0)
+        gobernador = GobernadorMemoria.desde_muestra(ruta_entrada, max_memoria, factor, FRACCION_BLOQUE,
+                                                     sep=detectar_delimitador(ruta_entrada), **OPCIONES_LECTURA)
+        if not gobernador.cabe_completo():
+            yield from _bloques_por_particiones(ruta_entrada, gobernador, rechazar, ruta_original, filas_por_bloque)
+            return
+        logger.info(f"🧮 ~{gobernador.bytes_archivo() / MB:.0f} MB estimados: cabe en el presupuesto")
+
+    # Paso 0: Leer archivo
+    df = leer_csv(ruta_entrada)
+    if df.empty:
+        logger.error("❌ No se pudieron leer datos del archivo")
+        return
+
+    # Paso 1: Reparar codificación y espacios
+    df.index += 1   # Número de fila en el archivo, para la cuarentena
+    df = quitar_espacios(df)
+
+    # Guardar copia del original, en segundo plano mientras corren los pasos (copia superficial:
+    # los pasos renombran las columnas de df, no tocan sus datos)
+    inicio = time.perf_counter()
+    with EscrituraDiferida(_guardar_csv, nombre="copia original", en_hilo=SOLAPAR_IO) as escritura:
+        if ruta_original:
+            escritura.poner(df.copy(deep=False), ruta_original)
+        df = aplicar_pasos(df, rechazar=rechazar)
+    logger.info(resumen_solapado(time.perf_counter() - inicio, escritura))
+    if df is None:
+        return
+
+    filas_por_bloque = filas_por_bloque or len(df)
+    for desde in range(0, len(df), filas_por_bloque):
+        yield df.iloc[desde:desde + filas_por_bloque]
+
+def guardar_bloques_csv(bloques: Iterable[pd.DataFrame], ruta: str) -> int:
+    """Escribe los bloques en un CSV (se crea con el primero) y devuelve cuántos registros escribió."""
+    registros = 0
+    with ExitStack() as pila:
+        for bloque in bloques:
+            if not registros:
+                salida = pila.enter_context(open(ruta, 'w', newline='', encoding='utf-8'))
+            bloque.to_csv(salida, index=False, header=not registros, sep=';')
+            registros += len(bloque)
+    return registros
+
+def rutas_archivo(ruta_entrada: str, etiqueta: str) -> Tuple[str, str]:
+    """Rutas de la copia del original (en MEMORIA_DIR) y del CSV de salida de `ruta_entrada` con `etiqueta`."""
+    nombre_base = os.path.splitext(os.path.basename(ruta_entrada))[0]
+    return (os.path.join(MEMORIA_DIR, f"{nombre_base}_original_{etiqueta}.csv"),
+            os.path.join(SALIDA_DIR, f"{nombre_base}_procesado_{etiqueta}.csv"))
+
+def procesar_archivo(ruta_entrada: str, max_memoria: int = None, cuarentena: Cuarentena = None,
+                     etiqueta: str = None) -> Optional[str]:
+    """
+    Procesa un archivo CSV paso a paso; con `max_memoria` (bytes), por bloques si no cabe completo.
+    Las filas que descarta cada paso van a `cuarentena`, si se pasa. `etiqueta` (por defecto la
+    fecha y hora) distingue la salida y la copia del original (ver rutas_archivo).
+    Devuelve la ruta del CSV de salida, o None si el archivo no se pudo procesar.
+    """
     try:
         nombre_archivo = os.path.basename(ruta_entrada)
         nombre_base = os.path.splitext(nombre_archivo)[0]
@@ -49,79 +362,81 @@ def procesar_archivo(ruta_entrada: str) -> bool:
         logger.info(f"\n{'='*50}")
         logger.info(f"🔹 Procesando archivo: {nombre_archivo}")
 
-        # Paso 0: Leer archivo
-        df = leer_csv(ruta_entrada)
-        if df.empty:
-            logger.error("❌ No se pudieron leer datos del archivo")
-            return False
+        ruta_original, ruta_salida = rutas_archivo(ruta_entrada, etiqueta or timestamp)
+        registros = guardar_bloques_csv(bloques_procesados(ruta_entrada, max_memoria, cuarentena, ruta_original),
+                                        ruta_salida)
+        if not registros:
+            return None
 
-        # Paso 1: Reparar codificación y espacios
-        df = df.apply(lambda x: x.str.strip() if x.dtype == 'object' else x)
-
-        # Guardar copia del original
-        ruta_original = os.path.join(MEMORIA_DIR, f"{nombre_base}_original_{timestamp}.csv")
-        df.to_csv(ruta_original, index=False, sep=';')
-
-        # Paso 2: Estandarizar nombres de columnas
-        df.columns = [col.strip().lower() for col in df.columns]
-        posibles_nombres = {
-            'nombres': ['nombres', 'nombre'],
-            'apellidos': ['apellidos', 'apellido'],
-            'identificacion': ['identificacion', 'id', 'documento'],
-            'tipo_documento': ['tipo_documento', 'tipo id']
-        }
-
-        mapeo = {}
-        for clave, posibles in posibles_nombres.items():
-            for posible in posibles:
-                if posible in df.columns:
-                    mapeo[posible] = clave
-                    break
-        df.rename(columns=mapeo, inplace=True)  #validar tipo documento texto
-        from procesamiento.validar_tipo_documento import validar_tipo_documento_dataframe
+        logger.info(f"✅ Procesado correctamente. Registros válidos: {registros}")
+        return ruta_salida
 
-        df = validar_tipo_documento_dataframe(df)
+    except Exception as e:
+        logger.error(f"❌ Error al procesar {nombre_archivo}: {str(e)}")
+        with open(os.path.join(ERRORES_DIR, f"error_{nombre_base}_{timestamp}.txt"), 'w') as f:
+            f.write(f"Error procesando {nombre_archivo}:\n{str(e)}")
+        return None
 
-        # Paso 3: Limpieza básica
-        df = df.dropna(how='all')
-        df = df.apply(lambda x: x.str.strip() if x.dtype == 'object' else x)
-        df.replace(r'^\s*$', pd.NA, regex=True, inplace=True)
+def resumir_muestra(reporte: pd.DataFrame, total: int, campos: list):
+    """Resume en el log el reporte antes/después: descartes por paso y cambios más repetidos por campo"""
+    def mas_repetidos(valores: pd.Series) -> str:
+        conteos = valores.fillna('∅').astype(str).value_counts().head(EJEMPLOS_POR_CAMPO)
+        return ", ".join(f"{valor} ({n})" for valor, n in conteos.items())
 
-        # Paso 4: Validar identificaciones
-        if 'identificacion' not in df.columns:
-            logger.error("❌ No existe columna 'identificacion'")
-            return False
+    descartadas = reporte[reporte['estado'] == DESCARTADO]
+    modificadas = reporte[reporte['estado'] == MODIFICADO]
+    logger.info(f"📋 {total} filas: {total - len(reporte)} sin cambios, {len(modificadas)} modificadas, "
+                f"{len(descartadas)} descartadas, {len(reporte) - len(modificadas) - len(descartadas)} sin procesar")
 
-        df, reporte_ident = validar_identificaciones_dataframe(df)
-        logger.info(f"🆔 Validación de identificaciones: {reporte_ident}")
+    for paso in descartadas['paso'].value_counts().index:
+        filas = descartadas[descartadas['paso'] == paso]
+        campo = CAMPO_DEL_PASO.get(paso)
+        detalle = f": {mas_repetidos(filas[f'{campo}_antes'])}" if campo in campos else ""
+        logger.info(f"   🗑️ {paso}: {len(filas)} descartadas{detalle}")
 
-        if df.empty:
-            logger.warning("⚠️ No quedaron registros válidos tras validar identificaciones")
-            return False
+    for campo in campos:
+        antes, despues = modificadas[f"{campo}_antes"], modificadas[f"{campo}_despues"]
+        cambiados = ~((antes == despues) | (antes.isna() & despues.isna()))
+        if cambiados.any():
+            cambios = antes[cambiados].fillna('∅').astype(str) + " → " + despues[cambiados].fillna('∅').astype(str)
+            logger.info(f"   ✏️ {campo}: {int(cambiados.sum())} cambios: {mas_repetidos(cambios)}")
 
-        # Paso 5: Validar nombres (apellidos pueden ser opcionales)
-        if 'nombres' not in df.columns:
-            logger.error("❌ No existe columna 'nombres'")
-            return False
+def procesar_muestra(ruta_entrada: str, tamano: int, modo: str, semilla: int) -> bool:
+    """Corre todos los pasos sobre una muestra del archivo y deja un reporte antes/después en MUESTRAS_DIR"""
+    try:
+        inicio = time.perf_counter()
+        nombre_archivo = os.path.basename(ruta_entrada)
+        nombre_base = os.path.splitext(nombre_archivo)[0]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        df, reporte_nombres_apellidos = validar_nombres_y_apellidos_dataframe(df)
-        logger.info(f"🔤 Validación de nombres y apellidos: {reporte_nombres_apellidos}")
+        logger.info(f"\n{'='*50}")
+        logger.info(f"🎯 Muestra de {nombre_archivo}: hasta {tamano} filas, modo {modo}")
 
-        if df.empty:
-            logger.warning("⚠️ No quedaron registros válidos tras validar nombres")
+        antes = leer_muestra(ruta_entrada, tamano, modo, semilla, sep=detectar_delimitador(ruta_entrada),
+                             **OPCIONES_LECTURA)
+        if antes.empty:
+            logger.error("❌ No se pudieron leer datos del archivo")
             return False
 
-        # Paso final: Guardar archivo procesado
-        ruta_salida = os.path.join(SALIDA_DIR, f"{nombre_base}_procesado_{timestamp}.csv")
-        df.to_csv(ruta_salida, index=False, sep=';')
+        pasos = []
+        df = aplicar_pasos(quitar_espacios(antes), lambda paso, df: pasos.append((paso, df.index)))
 
-        logger.info(f"✅ Procesado correctamente. Registros válidos: {len(df)}")
-        return True
+        # La muestra con los mismos nombres de campo que la salida, para compararlas columna a columna
+        columnas = [col.strip().lower() for col in antes.columns]
+        mapeo = mapear_columnas(columnas)
+        antes = antes.set_axis([mapeo.get(col, col) for col in columnas], axis=1)
+        despues = df if df is not None else pd.DataFrame(columns=antes.columns)
+
+        reporte = diferencias_muestra(antes, despues, pasos)
+        ruta_reporte = os.path.join(MUESTRAS_DIR, f"{nombre_base}_muestra_{timestamp}.csv")
+        reporte.to_csv(ruta_reporte, sep=';')
+
+        resumir_muestra(reporte, len(antes), list(dict.fromkeys([*antes.columns, *despues.columns])))
+        logger.info(f"📄 Reporte antes/después: {ruta_reporte} ({time.perf_counter() - inicio:.1f} s)")
+        return df is not None
 
     except Exception as e:
-        logger.error(f"❌ Error al procesar {nombre_archivo}: {str(e)}")
-        with open(os.path.join(ERRORES_DIR, f"error_{nombre_base}_{timestamp}.txt"), 'w') as f:
-            f.write(f"Error procesando {nombre_archivo}:\n{str(e)}")
+        logger.error(f"❌ Error al procesar la muestra de {ruta_entrada}: {str(e)}")
         return False
 
 def limpiar_memoria():
@@ -142,29 +457,54 @@ def limpiar_memoria():
 
 def main():
     """Función principal que ejecuta el pipeline"""
+    parser = argparse.ArgumentParser(description=f"Limpia y valida los CSV de '{ENTRADA_DIR}'")
+    parser.add_argument("--muestra", "--sample", type=int, metavar="N",
+                        help=f"Corre todos los pasos sobre N filas de cada archivo y deja un reporte "
+                             f"antes/después en '{MUESTRAS_DIR}' (no escribe en '{SALIDA_DIR}')")
+    parser.add_argument("--modo-muestra", choices=MODOS_MUESTRA, default="cabeza",
+                        help="cabeza: primeras N filas; reservorio: N al azar en una pasada; "
+                             "bytes: N al azar saltando a posiciones del archivo, sin recorrerlo")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de los modos reservorio y bytes")
+    parser.add_argument("--max-memory", type=parsear_tamano, default=None, metavar="TAMAÑO",
+                        help="Presupuesto de memoria (p. ej. 512M, 2G): los archivos que no caben se procesan "
+                             "por bloques y particiones en disco, con la misma salida")
+    args = parser.parse_args()
+
     logger.info("="*50)
     logger.info("🚀 INICIANDO PROCESAMIENTO DE ARCHIVOS CSV")
     logger.info("="*50)
 
     archivos_procesados = 0
     archivos_fallidos = 0
+    cuarentena = None
+    if not args.muestra:
+        cuarentena = Cuarentena(os.path.join(CUARENTENA_DIR, f"cuarentena_{datetime.now():%Y%m%d_%H%M%S}.csv"))
 
     for archivo in sorted(os.listdir(ENTRADA_DIR)):
         if archivo.lower().endswith(".csv"):
             ruta_entrada = os.path.join(ENTRADA_DIR, archivo)
-            if procesar_archivo(ruta_entrada):
+            if args.muestra:
+                correcto = procesar_muestra(ruta_entrada, args.muestra, args.modo_muestra, args.semilla)
+            else:
+                correcto = procesar_archivo(ruta_entrada, args.max_memory, cuarentena)
+            if correcto:
                 archivos_procesados += 1
             else:
                 archivos_fallidos += 1
 
     limpiar_memoria()
+    metricas = cuarentena.cerrar() if cuarentena else []
 
     logger.info("\n" + "="*50)
     logger.info("📊 RESUMEN FINAL DEL PROCESAMIENTO")
     logger.info(f"✅ Archivos procesados correctamente: {archivos_procesados}")
     logger.info(f"❌ Archivos con errores: {archivos_fallidos}")
-    logger.info(f"📂 Resultados en: {os.path.abspath(SALIDA_DIR)}")
+    logger.info(f"📂 Resultados en: {os.path.abspath(MUESTRAS_DIR if args.muestra else SALIDA_DIR)}")
     logger.info(f"📝 Errores detallados en: {os.path.abspath(ERRORES_DIR)}")
+    if cuarentena:
+        logger.info(f"🚧 Filas rechazadas en: {os.path.abspath(cuarentena.ruta)}")
+        for linea in lineas_metricas(metricas):
+            logger.info(f"   {linea}")
     logger.info("🧹 Memoria limpiada")
     logger.info("🎉 PROCESAMIENTO COMPLETADO")
     logger.info("="*50)
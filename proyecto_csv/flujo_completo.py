@@ -0,0 +1,94 @@
+"""
+Limpieza -> INSERT SQL -> JSON en un solo proceso y sin archivos intermedios:
+los registros válidos de cada CSV de entrada/ (ejecutar_pipeline.bloques_procesados)
+pasan en bloques a la vez al generador de INSERT (insert_sql/generador.py) y al
+exportador JSON (convertir_csv_a_json), sin escribir ni releer el CSV limpio.
+Cada bloque se reparte sin copiarlo; el consumidor más lento marca el ritmo.
+
+Uso: python flujo_completo.py [--max-memory 512M] [--formato json|ndjson] [--gzip]
+"""
+import argparse
+import functools
+import os
+import sys
+import time
+from datetime import datetime
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(RAIZ)
+sys.path.append(os.path.join(RAIZ, 'insert_sql'))
+sys.path.append(os.path.join(RAIZ, 'convertir_csv_a_json'))
+
+from ejecutar_pipeline import CUARENTENA_DIR, ENTRADA_DIR, bloques_procesados, logger
+from generador import generar_insert_sql
+from procesador.conversion import EXTENSIONES, convertir_bloques
+
+from comun.cuarentena import Cuarentena, lineas_metricas
+from comun.lotes import lotes_desde_dataframes
+from comun.memoria import parsear_tamano
+from comun.solapado import repartir
+
+FLUJO_DIR = "flujo"             # Una subcarpeta por archivo y corrida, con sql/ y json/
+FILAS_POR_BLOQUE = 100000       # Sin --max-memory; con presupuesto, las del gobernador
+CAMPOS_SQL = ('identificacion', 'nombres', 'tipo_documento')
+
+def consumidor_sql(carpeta, bloques):
+    return generar_insert_sql(lotes=lotes_desde_dataframes(bloques, CAMPOS_SQL), carpeta_salida=carpeta)
+
+def consumidor_json(archivo, carpetas, formato, comprimir, bloques):
+    return convertir_bloques(bloques, archivo, formato, comprimir, carpetas)
+
+def procesar(ruta_entrada, max_memoria, cuarentena, formato, comprimir):
+    archivo = os.path.basename(ruta_entrada)
+    carpeta = os.path.join(FLUJO_DIR, f"{os.path.splitext(archivo)[0]}_{datetime.now():%Y%m%d_%H%M%S}")
+    carpetas_json = {'utf-8': os.path.join(carpeta, "json", "utf8"),
+                     'iso-8859-1': os.path.join(carpeta, "json", "iso8859")}
+    logger.info(f"\n{'='*50}")
+    logger.info(f"🔹 Procesando archivo: {archivo}")
+
+    inicio = time.perf_counter()
+    bloques = bloques_procesados(ruta_entrada, max_memoria, cuarentena,
+                                 filas_por_bloque=None if max_memoria else FILAS_POR_BLOQUE)
+    partes, (registros, rutas) = repartir(bloques, [
+        functools.partial(consumidor_sql, os.path.join(carpeta, "sql")),
+        functools.partial(consumidor_json, archivo, carpetas_json, formato, comprimir),
+    ])
+    if not registros:
+        logger.error(f"❌ {archivo}: no quedaron registros válidos")
+        return False
+    logger.info(f"✅ {registros} registros en {time.perf_counter() - inicio:.2f} s: "
+                f"{len(partes or [])} archivo(s) SQL y JSON en {', '.join(rutas.values())}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Limpia los CSV de '{ENTRADA_DIR}' y genera sus INSERT y "
+                                                 f"JSON en '{FLUJO_DIR}' sin archivos intermedios")
+    parser.add_argument("--max-memory", type=parsear_tamano, default=None, metavar="TAMAÑO",
+                        help="Presupuesto de memoria (p. ej. 512M, 2G) para la limpieza")
+    parser.add_argument("--formato", choices=sorted(EXTENSIONES), default="json")
+    parser.add_argument("--gzip", action="store_true", help="Comprime los JSON con gzip")
+    args = parser.parse_args()
+
+    cuarentena = Cuarentena(os.path.join(CUARENTENA_DIR, f"cuarentena_{datetime.now():%Y%m%d_%H%M%S}.csv"))
+    correctos = fallidos = 0
+    for archivo in sorted(os.listdir(ENTRADA_DIR)):
+        if archivo.lower().endswith(".csv"):
+            try:
+                correcto = procesar(os.path.join(ENTRADA_DIR, archivo), args.max_memory, cuarentena,
+                                    args.formato, args.gzip)
+            except Exception as e:
+                logger.error(f"❌ Error al procesar {archivo}: {e}")
+                correcto = False
+            correctos += correcto
+            fallidos += not correcto
+
+    logger.info("\n" + "="*50)
+    logger.info(f"✅ Archivos procesados correctamente: {correctos}")
+    logger.info(f"❌ Archivos con errores: {fallidos}")
+    logger.info(f"📂 Resultados en: {os.path.abspath(FLUJO_DIR)}")
+    logger.info(f"🚧 Filas rechazadas en: {os.path.abspath(cuarentena.ruta)}")
+    for linea in lineas_metricas(cuarentena.cerrar()):
+        logger.info(f"   {linea}")
+
+if __name__ == "__main__":
+    main()
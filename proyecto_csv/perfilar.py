@@ -0,0 +1,196 @@
+"""
+Perfil de calidad de uno o varios CSV en una sola lectura secuencial y con
+memoria acotada (sirve para exportaciones de varios GB):
+
+    python perfilar.py entrada/archivo.csv [--top 10] [--json perfil.json]
+
+Por columna: nulos y vacíos, histograma de largos, distintos aproximados
+(HyperLogLog), valores más frecuentes aproximados (Misra-Gries), celdas
+sospechosas de mojibake y, para las columnas que el pipeline reconoce,
+identificaciones con formato válido y nombres que el pipeline descartaría.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from procesamiento.correccion_codificacion import detectar_codificacion
+from procesamiento.utils import detectar_delimitador, mapear_columnas
+from procesamiento.validar_identificacion import REGEX_IDENTIFICACION, REGEX_SOLO_CEROS
+from procesamiento.validar_nombres_y_apellidos import normalizar_nombre_o_apellido
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comun.bosquejos import Frecuentes, HyperLogLog
+from comun.dag import VALORES_NULOS_CSV
+from comun.mojibake import REGEX_MOJIBAKE, REGEX_RESIDUOS
+
+ENTRADA_DIR = "entrada"
+TAMANO_BLOQUE = 100000
+CAPACIDAD_FRECUENTES = 1000      # Contadores por columna para los más frecuentes
+BLOQUES_POR_AVANCE = 50          # Cada cuántos bloques se informa el avance
+
+# Textos que cuentan como nulos aunque estén escritos ("NULL", "N/A", "nan"...)
+TEXTOS_NULOS = VALORES_NULOS_CSV - {""}
+REGEX_SOSPECHA = re.compile(REGEX_MOJIBAKE.pattern + "|" + REGEX_RESIDUOS.pattern)
+BORDES_LARGO = [1, 2, 3, 6, 11, 21, 51, 101]
+ETIQUETAS_LARGO = ["1", "2", "3-5", "6-10", "11-20", "21-50", "51-100", "101+"]
+
+class PerfilColumna:
+    def __init__(self, nombre, campo=None):
+        self.nombre = nombre
+        self.campo = campo            # Campo del pipeline (identificacion, nombres...) o None
+        self.filas = 0
+        self.nulos = 0
+        self.vacios = 0
+        self.con_dato = 0
+        self.mojibake = 0
+        self.largos = np.zeros(len(BORDES_LARGO), dtype=np.int64)
+        self.distintos = HyperLogLog()
+        self.frecuentes = Frecuentes(CAPACIDAD_FRECUENTES)
+        self.formato_valido = 0       # Solo identificacion
+        self.nombres_descartados = 0  # Solo nombres y apellidos
+
+    def agregar(self, serie):
+        # Los valores se repiten mucho (nombres, tipos): se cuentan una vez con value_counts y cada
+        # limpieza o validación corre una vez por valor distinto del bloque, ponderada por su conteo
+        ausentes = int(serie.isna().sum())
+        conteos = serie.value_counts(sort=False, dropna=True)
+        crudos = conteos.index.to_series(index=np.arange(len(conteos)))
+        veces = conteos.to_numpy()
+
+        nulos = crudos.isin(TEXTOS_NULOS).to_numpy()
+        textos = crudos.str.strip()
+        vacios = (textos == "").to_numpy() & ~nulos
+        con_dato = ~nulos & ~vacios
+
+        self.filas += len(serie)
+        self.nulos += ausentes + int(veces[nulos].sum())
+        self.vacios += int(veces[vacios].sum())
+        if not con_dato.any():
+            return
+        # Textos distintos tras quitar espacios (" JUAN" y "JUAN" se juntan)
+        conteos = pd.Series(veces[con_dato], index=textos[con_dato].to_numpy()).groupby(level=0, sort=False).sum()
+        distintos = conteos.index.to_series(index=np.arange(len(conteos)))
+        veces = conteos.to_numpy()
+        self.con_dato += int(veces.sum())
+
+        def cuantos(mascara):
+            return int(veces[np.asarray(mascara, dtype=bool)].sum())
+
+        posiciones = np.searchsorted(BORDES_LARGO, distintos.str.len().to_numpy(), side="right") - 1
+        self.largos += np.bincount(posiciones, weights=veces, minlength=len(BORDES_LARGO)).astype(np.int64)
+        self.distintos.agregar(distintos.to_numpy())
+        self.frecuentes.agregar(distintos.to_numpy(), veces)
+        self.mojibake += cuantos(distintos.str.contains(REGEX_SOSPECHA, na=False))
+
+        if self.campo == "identificacion":
+            self.formato_valido += cuantos(
+                distintos.str.fullmatch(REGEX_IDENTIFICACION) & ~distintos.str.fullmatch(REGEX_SOLO_CEROS)
+            )
+        elif self.campo in ("nombres", "apellidos"):
+            self.nombres_descartados += cuantos(distintos.map(normalizar_nombre_o_apellido).isna())
+
+    def resumen(self, top):
+        def tasa(parte, total):
+            return round(parte / total, 6) if total else 0.0
+
+        resumen = {
+            "columna": self.nombre,
+            "campo": self.campo,
+            "filas": self.filas,
+            "tasa_nulos": tasa(self.nulos, self.filas),
+            "tasa_vacios": tasa(self.vacios, self.filas),
+            "distintos_aprox": self.distintos.estimar() if self.con_dato else 0,
+            "largos": dict(zip(ETIQUETAS_LARGO, self.largos.tolist())),
+            # Con conteo que no supera el error, un valor puede no ser de los más frecuentes
+            "frecuentes": [[valor, conteo] for valor, conteo in self.frecuentes.top(top)
+                           if conteo > self.frecuentes.error],
+            "error_frecuentes": self.frecuentes.error,
+            "tasa_mojibake": tasa(self.mojibake, self.con_dato),
+        }
+        if self.campo == "identificacion":
+            resumen["tasa_formato_valido"] = tasa(self.formato_valido, self.con_dato)
+        elif self.campo in ("nombres", "apellidos"):
+            resumen["tasa_nombres_descartados"] = tasa(self.nombres_descartados, self.con_dato)
+        return resumen
+
+def perfilar(ruta, tamano_bloque=TAMANO_BLOQUE, top=10):
+    """Recorre `ruta` una vez, por bloques, y devuelve el perfil como dict."""
+    inicio = time.perf_counter()
+    encoding = detectar_codificacion(ruta)
+    if encoding.lower() == "ascii":
+        encoding = "utf-8"    # La muestra era ASCII; el resto del archivo puede no serlo
+    delimitador = detectar_delimitador(ruta, encoding)
+
+    lector = pd.read_csv(ruta, sep=delimitador, dtype=str, keep_default_na=False, encoding=encoding,
+                         encoding_errors="replace", on_bad_lines="skip", chunksize=tamano_bloque)
+    columnas = None
+    filas = 0
+    for numero, bloque in enumerate(lector, start=1):
+        if columnas is None:
+            campos = mapear_columnas([str(c).strip().lower() for c in bloque.columns])
+            columnas = [PerfilColumna(c, campos.get(str(c).strip().lower())) for c in bloque.columns]
+        for perfil, columna in zip(columnas, bloque.columns):
+            perfil.agregar(bloque[columna])
+        filas += len(bloque)
+        if numero % BLOQUES_POR_AVANCE == 0:
+            print(f"  ⏳ {filas:,} filas en {time.perf_counter() - inicio:.0f} s", flush=True)
+
+    return {
+        "archivo": ruta,
+        "bytes": os.path.getsize(ruta),
+        "encoding": encoding,
+        "delimitador": delimitador,
+        "filas": filas,
+        "segundos": round(time.perf_counter() - inicio, 2),
+        "columnas": [perfil.resumen(top) for perfil in columnas or []],
+    }
+
+def imprimir_perfil(perfil):
+    mb = perfil["bytes"] / 1e6
+    print(f"\n📊 {perfil['archivo']}: {perfil['filas']:,} filas, {mb:.1f} MB, {perfil['encoding']}, "
+          f"delimitador '{perfil['delimitador']}' ({perfil['segundos']:.1f} s, "
+          f"{mb / max(perfil['segundos'], 1e-9):.1f} MB/s)")
+    for c in perfil["columnas"]:
+        campo = f" → {c['campo']}" if c["campo"] else ""
+        print(f"\n🔹 {c['columna']}{campo}")
+        print(f"   nulos {c['tasa_nulos']:.2%}  vacíos {c['tasa_vacios']:.2%}  "
+              f"distintos ≈ {c['distintos_aprox']:,}  mojibake {c['tasa_mojibake']:.2%}")
+        if "tasa_formato_valido" in c:
+            print(f"   🆔 identificaciones con formato válido: {c['tasa_formato_valido']:.2%}")
+        if "tasa_nombres_descartados" in c:
+            print(f"   🔤 descartados por validar_nombres_y_apellidos: {c['tasa_nombres_descartados']:.2%}")
+        print("   largos: " + "  ".join(f"{k}:{v:,}" for k, v in c["largos"].items() if v))
+        if c["frecuentes"]:
+            error = f" (conteos ±{c['error_frecuentes']:,})" if c["error_frecuentes"] else ""
+            print(f"   más frecuentes{error}: " + ", ".join(f"{v!r} {n:,}" for v, n in c["frecuentes"]))
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de calidad de CSV en una sola lectura")
+    parser.add_argument("archivos", nargs="*", help=f"CSV a perfilar (por defecto, los de '{ENTRADA_DIR}')")
+    parser.add_argument("--top", type=int, default=10, help="Valores más frecuentes por columna")
+    parser.add_argument("--tamano-bloque", type=int, default=TAMANO_BLOQUE, help="Filas leídas por bloque")
+    parser.add_argument("--json", metavar="RUTA", help="Guarda también los perfiles en RUTA")
+    args = parser.parse_args()
+
+    archivos = args.archivos or sorted(
+        os.path.join(ENTRADA_DIR, f) for f in os.listdir(ENTRADA_DIR) if f.lower().endswith(".csv")
+    )
+    perfiles = []
+    for ruta in archivos:
+        perfil = perfilar(ruta, args.tamano_bloque, args.top)
+        imprimir_perfil(perfil)
+        perfiles.append(perfil)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(perfiles, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 Perfil guardado en: {args.json}")
+
+if __name__ == "__main__":
+    main()
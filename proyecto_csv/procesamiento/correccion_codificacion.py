@@ -1,7 +1,12 @@
+import os
+import sys
 import pandas as pd
 import chardet
-from typing import Optional, Dict
+from typing import Optional
 import warnings
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.mojibake import reparar_dataframe
 warnings.filterwarnings('ignore', category=pd.errors.DtypeWarning)
 
 def detectar_codificacion(ruta_archivo: str, muestra_bytes: int = 10000) -> str:
@@ -52,40 +57,10 @@ def reparar_codificacion(archivo_entrada: str, archivo_salida: str) -> Optional[
             else:
                 raise ValueError("No se pudo determinar la codificación del archivo")
 
-        # 3. Tabla de reemplazos para caracteres mal codificados
-        reemplazos: Dict[str, str] = {
-            # Caracteres mal codificados comúnmente
-            "Ã¡": "á", "Ã©": "é", "Ã­": "í", "Ã³": "ó", "Ãº": "ú",
-            "Ã±": "ñ", "Ã¼": "ü", "Ã§": "ç", "Ã£": "ã", "Ãµ": "õ",
-            "Ã€": "À", "Ã": "Á", "Ã‰": "É", "Ã": "Í", "Ã“": "Ó",
-            "Ãš": "Ú", "Ã‘": "Ñ", "Ãœ": "Ü", "Ã‡": "Ç", "Ãƒ": "Ã",
-            "Ã–": "Ö", "Ã„": "Ä", "Ã…": "Å", "Ãˆ": "È", "Ã‰": "É",
-            "ÃŠ": "Ê", "Ã‹": "Ë", "ÃŒ": "Ì", "Ã": "Í", "ÃŽ": "Î",
-            "Ã‰": "Ï", "Ã‘": "Ñ", "Ã’": "Ò", "Ã“": "Ó", "Ã”": "Ô",
-            "Ã•": "Õ", "Ã˜": "Ø", "Ã™": "Ù", "Ãš": "Ú", "Ã›": "Û",
-            "Ãœ": "Ü", "Ã": "Ý", "Ãž": "Þ", "ÃŸ": "ß", "Ã¡": "á",
-            "Ã¢": "â", "Ã£": "ã", "Ã¤": "ä", "Ã¥": "å", "Ã¦": "æ",
-            "Ã§": "ç", "Ã¨": "è", "Ã©": "é", "Ãª": "ê", "Ã«": "ë",
-            "Ã¬": "ì", "Ã­": "í", "Ã®": "î", "Ã¯": "ï", "Ã°": "ð",
-            "Ã±": "ñ", "Ã²": "ò", "Ã³": "ó", "Ã´": "ô", "Ãµ": "õ",
-            "Ã¶": "ö", "Ã·": "÷", "Ã¸": "ø", "Ã¹": "ù", "Ãº": "ú",
-            "Ã»": "û", "Ã½": "ý", "Ã¾": "þ", "Ã¿": "ÿ",
-            # Caracteres inválidos/sucio
-            "�": "", "\x00": "", "\ufeff": "", "ï»¿": ""
-        }
-
-        # 4. Función para aplicar los reemplazos
-        def corregir_caracteres(texto: str) -> str:
-            if pd.isna(texto):
-                return texto
-            for malo, bueno in reemplazos.items():
-                texto = texto.replace(malo, bueno)
-            return texto
-
-        # 5. Aplicar corrección a todo el DataFrame
-        df = df.applymap(corregir_caracteres)
+        # 3. Reparar mojibake solo en las celdas sospechosas (ver comun.mojibake)
+        df = reparar_dataframe(df)
 
-        # 6. Guardar archivo corregido en UTF-8
+        # 4. Guardar archivo corregido en UTF-8
         df.to_csv(archivo_salida, index=False, encoding='utf-8')
         
         return archivo_salida
@@ -106,23 +81,8 @@ def reparar_codificacion_dataframe(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: DataFrame con caracteres corregidos
     """
     try:
-        # Hacer copia para no modificar el original
-        df_clean = df.copy()
-        
-        # Tabla de reemplazos (misma que la versión de archivo)
-        reemplazos = {
-            "Ã¡": "á", "Ã©": "é", "Ã­": "í", "Ã³": "ó", "Ãº": "ú",
-            "Ã±": "ñ", "Ã¼": "ü", "Ã§": "ç", "Ã£": "ã", "Ãµ": "õ",
-            "Ã€": "À", "Ã": "Á", "Ã‰": "É", "Ã": "Í", "Ã“": "Ó",
-            "Ãš": "Ú", "Ã‘": "Ñ", "Ãœ": "Ü", "Ã‡": "Ç", "Ãƒ": "Ã",
-            "�": "", "\x00": "", "\ufeff": "", "ï»¿": ""
-        }
-        
-        # Aplicar corrección
-        df_clean = df_clean.applymap(lambda x: x if pd.isna(x) else 
-                                    ''.join([reemplazos.get(c, c) for c in str(x)]))
-        
-        return df_clean
+        # reparar_dataframe trabaja sobre una copia
+        return reparar_dataframe(df)
     
     except Exception as e:
         print(f"❌ Error al reparar codificación en DataFrame: {str(e)}")
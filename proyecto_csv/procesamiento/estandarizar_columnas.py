@@ -3,6 +3,10 @@ import chardet
 from typing import Optional, Tuple, List
 import os
 
+from procesamiento.estructura import IndiceEstructura, escanear_estructura, leer_csv_por_rangos
+
+MIN_CAMPOS = 3      # Registros con menos campos se reportan como errores
+
 def detectar_delimitador_y_codificacion(ruta_archivo: str) -> Tuple[str, str]:
     """
     Detecta automáticamente el delimitador y codificación de un archivo CSV.
@@ -29,40 +33,67 @@ def detectar_delimitador_y_codificacion(ruta_archivo: str) -> Tuple[str, str]:
         
         return (delimitador, encoding) if conteo[delimitador] > 0 else (';', encoding)
 
-def estandarizar_columnas(archivo_entrada: str, archivo_salida: str) -> Optional[str]:
+def registros_irregulares(ruta_archivo: str, delimitador: str,
+                          encoding: str) -> Tuple[Optional[IndiceEstructura], List[Tuple[int, int, str, str]]]:
+    """
+    Registros con menos campos que el encabezado o que MIN_CAMPOS ('corta') o con
+    más que el encabezado ('larga'), como (línea, campos, motivo, contenido).
+    Usa el índice estructural del archivo (procesamiento.estructura), que
+    también se devuelve para poder partir el archivo; si el delimitador no es
+    de un byte en `encoding` (UTF-16...), revisa línea por línea sin índice.
+    """
+    try:
+        indice = escanear_estructura(ruta_archivo, delimitador.encode(encoding or 'utf-8'))
+    except ValueError:
+        with open(ruta_archivo, 'r', encoding=encoding) as f:
+            return None, [(i, line.count(delimitador) + 1, 'corta', line.strip())
+                          for i, line in enumerate(f, 1) if line.count(delimitador) < MIN_CAMPOS - 1]
+
+    if not len(indice):
+        return indice, []
+    esperados = int(indice.campos[0])
+    registros = indice.irregulares(max(MIN_CAMPOS, esperados), esperados)
+    contenidos = indice.leer(registros)
+    errores = []
+    for registro, contenido in zip(registros.tolist(), contenidos):
+        campos = int(indice.campos[registro])
+        motivo = 'larga' if campos > esperados else 'corta'
+        errores.append((int(indice.lineas[registro]), campos, motivo,
+                        contenido.decode(encoding, errors='replace').strip()))
+    return indice, errores
+
+def estandarizar_columnas(archivo_entrada: str, archivo_salida: str, trabajadores: int = 1) -> Optional[str]:
     """
     Estandariza los nombres de columnas de un archivo CSV manteniendo el delimitador original.
     
     Args:
         archivo_entrada: Ruta al archivo CSV de entrada
         archivo_salida: Ruta donde se guardará el archivo estandarizado
+        trabajadores: Con más de uno, el archivo se parsea en paralelo por rangos del índice estructural
         
     Returns:
         str: Ruta del archivo generado o None si hubo error
     """
-    errores: List[Tuple[int, str]] = []
-    
     try:
         # 1. Detectar configuración del archivo
         delimitador, encoding = detectar_delimitador_y_codificacion(archivo_entrada)
         
-        # 2. Validar estructura básica del archivo
-        with open(archivo_entrada, 'r', encoding=encoding) as f:
-            for i, line in enumerate(f, 1):
-                if line.count(delimitador) < 2:  # mínimo 3 campos (2 delimitadores)
-                    errores.append((i, line.strip()))
+        # 2. Validar estructura del archivo (una pasada, sin parsear)
+        indice, errores = registros_irregulares(archivo_entrada, delimitador, encoding)
         
         # 3. Leer archivo CSV
-        df = pd.read_csv(
-            archivo_entrada,
+        opciones = dict(
             sep=delimitador,
             dtype=str,
             encoding=encoding,
             on_bad_lines='skip',
-            engine='python',
             keep_default_na=False,
             na_values=['', ' ', 'NA', 'N/A', 'NaN', 'NULL']
         )
+        if trabajadores > 1 and indice is not None:
+            df = leer_csv_por_rangos(indice, trabajadores, **opciones)
+        else:
+            df = pd.read_csv(archivo_entrada, engine='python', **opciones)
         
         print(f"🧪 Columnas originales: {list(df.columns)}")
         
@@ -114,7 +145,7 @@ def estandarizar_columnas(archivo_entrada: str, archivo_salida: str) -> Optional
             nombre_base = os.path.splitext(os.path.basename(archivo_salida))[0]
             errores_path = os.path.join(os.path.dirname(archivo_salida), f"{nombre_base}_errores.csv")
             
-            pd.DataFrame(errores, columns=['linea', 'contenido'])\
+            pd.DataFrame(errores, columns=['linea', 'campos', 'motivo', 'contenido'])\
               .to_csv(errores_path, index=False, sep=',', encoding='utf-8')
             
             print(f"⚠️  Se guardaron {len(errores)} líneas problemáticas en: {errores_path}")
@@ -0,0 +1,144 @@
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BLOQUE_ESCANEO = 16 * 1024 * 1024   # Bytes del archivo mapeado que se revisan de una vez
+SALTO = ord('\n')
+COMILLA = ord('"')
+
+class IndiceEstructura:
+    """
+    Estructura de un CSV sin parsearlo: por cada registro, el byte donde
+    empieza (`inicios`), la línea física donde empieza (`lineas`, desde 1) y
+    cuántos campos tiene (`campos`). Un campo entre comillas puede ocupar
+    varias líneas físicas; sus saltos y delimitadores no cuentan. El registro
+    0 es el encabezado.
+    """
+
+    def __init__(self, ruta: str, tamano: int, inicios: np.ndarray, lineas: np.ndarray, campos: np.ndarray):
+        self.ruta = ruta
+        self.tamano = tamano
+        self.inicios = inicios
+        self.lineas = lineas
+        self.campos = campos
+
+    def __len__(self) -> int:
+        return len(self.inicios)
+
+    def fin(self, registro: int) -> int:
+        return int(self.inicios[registro + 1]) if registro + 1 < len(self) else self.tamano
+
+    def irregulares(self, minimo: int, maximo: Optional[int] = None) -> np.ndarray:
+        """Registros con menos de `minimo` campos o más de `maximo`."""
+        malos = self.campos < minimo
+        if maximo is not None:
+            malos |= self.campos > maximo
+        return np.flatnonzero(malos)
+
+    def leer(self, registros) -> List[bytes]:
+        """Bytes de cada registro pedido, sin el salto de línea final."""
+        with open(self.ruta, 'rb') as f:
+            contenido = []
+            for registro in registros:
+                f.seek(int(self.inicios[registro]))
+                contenido.append(f.read(self.fin(registro) - int(self.inicios[registro])).rstrip(b'\r\n'))
+        return contenido
+
+    def rangos(self, partes: int, desde: int = 1) -> List[Tuple[int, int]]:
+        """
+        Reparte los registros desde `desde` (por defecto, sin el encabezado) en
+        hasta `partes` rangos de bytes de tamaño parecido, cortados siempre al
+        comienzo de un registro: cada rango se puede parsear por separado.
+        """
+        if desde >= len(self):
+            return []
+        primero = int(self.inicios[desde])
+        objetivos = primero + (self.tamano - primero) * np.arange(1, partes) // partes
+        posiciones = np.minimum(np.searchsorted(self.inicios, objetivos), len(self) - 1)
+        cortes = self.inicios[posiciones].tolist()
+        cortes = sorted({primero, *(c for c in cortes if primero < c < self.tamano), self.tamano})
+        return list(zip(cortes, cortes[1:]))
+
+def _escanear(datos: np.ndarray, delimitador: int, bloque: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    inicios, lineas, campos = [np.zeros(1, np.int64)], [np.ones(1, np.int64)], []
+    comillas_previas = 0      # Paridad de comillas al empezar el bloque: impar = dentro de un campo
+    saltos_previos = 0        # Saltos de línea físicos antes del bloque
+    delimitadores_abiertos = 0
+    for desde in range(0, len(datos), bloque):
+        trozo = datos[desde:desde + bloque]
+        comillas = np.flatnonzero(trozo == COMILLA)
+        saltos = np.flatnonzero(trozo == SALTO)
+        delimitadores = np.flatnonzero(trozo == delimitador)
+        fines = saltos
+        if len(comillas) or comillas_previas % 2:
+            # Un salto o delimitador es estructural si antes hay un número par de comillas;
+            # las comillas escapadas ("") suman dos y no cambian la paridad
+            fines = saltos[(np.searchsorted(comillas, saltos) + comillas_previas) % 2 == 0]
+            delimitadores = delimitadores[(np.searchsorted(comillas, delimitadores) + comillas_previas) % 2 == 0]
+
+        # Delimitadores antes de cada fin de registro; la diferencia son los de cada registro
+        antes = np.searchsorted(delimitadores, fines)
+        por_registro = np.diff(antes, prepend=0) + 1
+        if len(fines):
+            por_registro[0] += delimitadores_abiertos
+            delimitadores_abiertos = 0
+        campos.append(por_registro)
+        delimitadores_abiertos += len(delimitadores) - (int(antes[-1]) if len(fines) else 0)
+        inicios.append(fines + desde + 1)
+        lineas.append(saltos_previos + np.searchsorted(saltos, fines) + 2)
+
+        comillas_previas += len(comillas)
+        saltos_previos += len(saltos)
+
+    inicios, lineas = np.concatenate(inicios), np.concatenate(lineas)
+    if inicios[-1] == len(datos):
+        # El archivo termina en salto de línea: no hay un registro más después
+        inicios, lineas = inicios[:-1], lineas[:-1]
+    else:
+        campos.append(np.array([delimitadores_abiertos + 1]))
+    return inicios, lineas, np.concatenate(campos)
+
+def escanear_estructura(ruta: str, delimitador: bytes = b';', bloque: int = BLOQUE_ESCANEO) -> IndiceEstructura:
+    """
+    Recorre el archivo una sola vez, mapeado en memoria y de a `bloque` bytes,
+    ubicando saltos de línea, delimitadores y comillas con operaciones de
+    numpy sobre los bytes (sin un bucle de Python por línea). El delimitador
+    debe ocupar un byte en la codificación del archivo.
+    """
+    if len(delimitador) != 1:
+        raise ValueError(f"❌ El delimitador debe ser de un byte: {delimitador!r}")
+    tamano = os.path.getsize(ruta)
+    vacio = np.zeros(0, np.int64)
+    if tamano == 0:
+        return IndiceEstructura(ruta, 0, vacio, vacio, vacio)
+    with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        datos = np.frombuffer(mapa, dtype=np.uint8)
+        inicios, lineas, campos = _escanear(datos, delimitador[0], bloque)
+        del datos   # Sin vistas vivas para poder cerrar el mapa
+    return IndiceEstructura(ruta, tamano, inicios, lineas, campos)
+
+def _leer_rango(ruta: str, inicio: int, fin: int, columnas: List[str], opciones: dict) -> pd.DataFrame:
+    with open(ruta, 'rb') as f:
+        f.seek(inicio)
+        datos = f.read(fin - inicio)
+    return pd.read_csv(io.BytesIO(datos), header=None, names=columnas, **opciones)
+
+def leer_csv_por_rangos(indice: IndiceEstructura, trabajadores: int, **opciones) -> pd.DataFrame:
+    """
+    Lee el CSV de `indice` en paralelo: cada proceso parsea uno de
+    `indice.rangos(trabajadores)` con las mismas `opciones` de pd.read_csv y
+    los pedazos se unen en orden.
+    """
+    columnas = pd.read_csv(indice.ruta, nrows=0, **opciones).columns.tolist()
+    rangos = indice.rangos(trabajadores)
+    if not rangos:
+        return pd.DataFrame(columns=columnas, dtype=opciones.get('dtype'))
+    with ProcessPoolExecutor(max_workers=min(trabajadores, len(rangos))) as pool:
+        partes = pool.map(_leer_rango, repeat(indice.ruta), *zip(*rangos), repeat(columnas), repeat(opciones))
+        return pd.concat(list(partes), ignore_index=True)
@@ -0,0 +1,142 @@
+import codecs
+import io
+import math
+import os
+import random
+from itertools import islice
+from typing import BinaryIO, Iterator, List, Tuple
+
+import pandas as pd
+
+# cabeza:     las primeras N filas
+# reservorio: N filas al azar (semilla fija) en una sola pasada, sin cargar el archivo
+# bytes:      N posiciones al azar; lee solo el registro siguiente a cada una (no recorre el archivo)
+MODOS_MUESTRA = ("cabeza", "reservorio", "bytes")
+
+SIN_CAMBIOS = "sin cambios"
+MODIFICADO = "modificado"
+DESCARTADO = "descartado"
+SIN_PROCESAR = "sin procesar"   # El pipeline se detuvo antes de llegar a la salida
+
+def _registros(f: BinaryIO) -> Iterator[bytes]:
+    """Registros crudos de un CSV abierto en binario; un campo entre comillas puede ocupar varias líneas."""
+    pendiente = b""
+    for linea in f:
+        pendiente += linea
+        if pendiente.count(b'"') % 2 == 0:
+            yield pendiente
+            pendiente = b""
+    if pendiente:
+        yield pendiente
+
+def _muestra_cabeza(f: BinaryIO, n: int) -> List[Tuple[int, bytes]]:
+    return list(islice(enumerate(_registros(f), start=1), n))
+
+def _muestra_reservorio(f: BinaryIO, n: int, semilla: int) -> List[Tuple[int, bytes]]:
+    """Muestreo de reservorio con saltos (algoritmo L): pocas llamadas al azar aunque el archivo sea enorme."""
+    azar = random.Random(semilla)
+    registros = enumerate(_registros(f), start=1)
+    reservorio = list(islice(registros, n))
+    if len(reservorio) < n:
+        return reservorio
+
+    peso = math.exp(math.log(azar.random()) / n)
+    while True:
+        salto = int(math.log(azar.random()) / math.log(1 - peso))
+        elegido = next(islice(registros, salto, None), None)
+        if elegido is None:
+            break
+        reservorio[azar.randrange(n)] = elegido
+        peso *= math.exp(math.log(azar.random()) / n)
+    return sorted(reservorio)
+
+def _muestra_bytes(f: BinaryIO, n: int, semilla: int) -> List[Tuple[int, bytes]]:
+    """
+    Salta a N posiciones al azar y toma el registro que empieza después de
+    cada una. Las filas que siguen a una línea larga salen más, y caer dentro
+    de un campo entre comillas con saltos de línea puede desalinear el
+    registro: sirve para ajustar reglas, no para estadísticas.
+    """
+    azar = random.Random(semilla)
+    inicio_datos = f.tell()
+    tamano = os.fstat(f.fileno()).st_size
+    if inicio_datos >= tamano:
+        return []
+
+    elegidos = {}
+    for posicion in sorted(azar.randrange(inicio_datos - 1, tamano) for _ in range(n)):
+        f.seek(posicion)
+        f.readline()   # Resto del registro donde cayó la posición
+        inicio = f.tell()
+        if inicio < tamano and inicio not in elegidos:
+            elegidos[inicio] = next(_registros(f))
+    return list(elegidos.items())
+
+def leer_muestra(ruta: str, n: int, modo: str = "cabeza", semilla: int = 0, sep: str = ",",
+                 **opciones_lectura) -> pd.DataFrame:
+    """
+    Lee una muestra de hasta `n` filas de `ruta` con las mismas opciones de
+    pd.read_csv que el archivo completo. El índice identifica cada fila en el
+    archivo: número de registro (cabeza, reservorio) o byte donde empieza (bytes).
+    """
+    with open(ruta, "rb") as f:
+        encabezado = f.readline()
+        if modo == "cabeza":
+            registros = _muestra_cabeza(f, n)
+        elif modo == "reservorio":
+            registros = _muestra_reservorio(f, n, semilla)
+        elif modo == "bytes":
+            registros = _muestra_bytes(f, n, semilla)
+        else:
+            raise ValueError(f"Modo de muestra desconocido: {modo} (opciones: {', '.join(MODOS_MUESTRA)})")
+
+    # Se antepone la posición como primera columna para que siga a cada fila aunque read_csv salte alguna
+    columna = "byte" if modo == "bytes" else "fila"
+    separador = sep.encode()
+    partes = [columna.encode(), separador, encabezado.removeprefix(codecs.BOM_UTF8).rstrip(b"\r\n"), b"\n"]
+    for posicion, registro in registros:
+        partes += [str(posicion).encode(), separador, registro]
+        if not registro.endswith(b"\n"):
+            partes.append(b"\n")
+
+    df = pd.read_csv(io.BytesIO(b"".join(partes)), sep=sep, **opciones_lectura)
+    return df.set_index(pd.Index(df.pop(columna).astype("int64"), name=columna))
+
+def diferencias_muestra(antes: pd.DataFrame, despues: pd.DataFrame,
+                        pasos: List[Tuple[str, pd.Index]]) -> pd.DataFrame:
+    """
+    Compara la muestra leída (`antes`, con las columnas ya renombradas a los
+    campos del pipeline) con el resultado (`despues`) fila por fila, por
+    índice. `pasos` es [(nombre, índice de las filas que quedaban tras el paso)],
+    para saber qué paso descartó cada fila.
+
+    Devuelve las filas descartadas o modificadas con su estado, el paso que
+    las descartó y, por campo, el valor antes y después.
+    """
+    estado = pd.Series(SIN_CAMBIOS, index=antes.index, dtype=object)
+    paso = pd.Series("", index=antes.index, dtype=object)
+    quedan = antes.index
+    for nombre, indice in pasos:
+        salen = quedan.difference(indice)
+        estado[salen] = DESCARTADO
+        paso[salen] = nombre
+        quedan = quedan.intersection(indice)
+    estado[quedan.difference(despues.index)] = SIN_PROCESAR
+
+    campos = list(antes.columns) + [c for c in despues.columns if c not in antes.columns]
+    antes = antes.reindex(columns=campos)
+    despues = despues.reindex(index=antes.index, columns=campos)
+    conservadas = antes.index.isin(despues.index) & (estado == SIN_CAMBIOS).to_numpy()
+
+    columnas = {"estado": estado, "paso": paso}
+    cambio = pd.Series(False, index=antes.index)
+    for campo in campos:
+        valor_antes, valor_despues = antes[campo], despues[campo]
+        iguales = (valor_antes == valor_despues) | (valor_antes.isna() & valor_despues.isna())
+        cambio |= ~iguales & conservadas
+        columnas[f"{campo}_antes"] = valor_antes
+        columnas[f"{campo}_despues"] = valor_despues
+    estado[cambio] = MODIFICADO
+
+    reporte = pd.DataFrame(columnas)
+    return reporte[reporte["estado"] != SIN_CAMBIOS].sort_index()
@@ -0,0 +1,25 @@
+from typing import Dict, List
+
+# Nombres de columna aceptados para cada campo del pipeline (ya en minúsculas)
+POSIBLES_NOMBRES = {
+    'nombres': ['nombres', 'nombre'],
+    'apellidos': ['apellidos', 'apellido'],
+    'identificacion': ['identificacion', 'id', 'documento'],
+    'tipo_documento': ['tipo_documento', 'tipo id']
+}
+
+def detectar_delimitador(ruta: str, encoding: str = 'utf-8') -> str:
+    """Delimitador del CSV según su primera línea: ';' si aparece, si no ','."""
+    with open(ruta, 'r', encoding=encoding, errors='replace') as f:
+        first_line = f.readline()
+    return ';' if ';' in first_line else ','
+
+def mapear_columnas(columnas: List[str]) -> Dict[str, str]:
+    """{columna del archivo: campo del pipeline} para las columnas reconocidas en POSIBLES_NOMBRES."""
+    mapeo = {}
+    for clave, posibles in POSIBLES_NOMBRES.items():
+        for posible in posibles:
+            if posible in columnas:
+                mapeo[posible] = clave
+                break
+    return mapeo
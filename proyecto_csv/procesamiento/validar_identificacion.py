@@ -7,6 +7,40 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Identificación válida: de 6 a 15 dígitos y no todos ceros
+REGEX_IDENTIFICACION = re.compile(r"\d{6,15}")
+REGEX_SOLO_CEROS = re.compile(r"0+")
+REGEX_SOLO_DIGITOS = re.compile(r"\d+")
+
+# Códigos de motivo de rechazo (ver comun/cuarentena.py)
+PASO = 'identificaciones'
+MOTIVO_VACIO = "vacio"
+MOTIVO_NO_NUMERICO = "no_numerico"
+MOTIVO_SOLO_CEROS = "solo_ceros"
+MOTIVO_CORTO = "corto"
+MOTIVO_LARGO = "largo"
+MOTIVO_DUPLICADO = "duplicado"
+
+def es_identificacion_valida(ident) -> bool:
+    try:
+        ident = str(ident).strip()
+        if not ident or pd.isna(ident):
+            return False
+        return REGEX_IDENTIFICACION.fullmatch(ident) is not None and not REGEX_SOLO_CEROS.fullmatch(ident)
+    except Exception:
+        return False
+
+def motivo_identificacion(ident) -> str:
+    """Código de motivo de una identificación que es_identificacion_valida rechaza."""
+    ident = str(ident).strip()
+    if not ident or ident == 'nan':
+        return MOTIVO_VACIO
+    if not REGEX_SOLO_DIGITOS.fullmatch(ident):
+        return MOTIVO_NO_NUMERICO
+    if REGEX_SOLO_CEROS.fullmatch(ident):
+        return MOTIVO_SOLO_CEROS
+    return MOTIVO_CORTO if len(ident) < 6 else MOTIVO_LARGO
+
 def validar_identificaciones(input_path: str, output_path: str) -> Optional[str]:
     try:
         df = pd.read_csv(input_path, dtype=str, keep_default_na=False, na_values=['', ' '])
@@ -24,15 +58,6 @@ def validar_identificaciones(input_path: str, output_path: str) -> Optional[str]
         df['identificacion'] = df['identificacion'].astype(str).str.strip().fillna('')
         df['tipo_documento'] = df['tipo_documento'].astype(str).str.strip().fillna('')
 
-        def es_identificacion_valida(ident) -> bool:
-            try:
-                ident = str(ident).strip()
-                if not ident or pd.isna(ident):
-                    return False
-                return re.fullmatch(r"\d{6,15}", ident) is not None and not re.fullmatch(r"0+", ident)
-            except Exception:
-                return False
-
         def evaluar_calidad_registro(row: pd.Series) -> int:
             puntaje = 0
             nombres = str(row.get('nombres', '')).strip()
@@ -88,7 +113,11 @@ def validar_identificaciones(input_path: str, output_path: str) -> Optional[str]
         return None
 
 
-def validar_identificaciones_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, dict]:
+def validar_identificaciones_dataframe(df: pd.DataFrame, rechazar=None) -> Tuple[pd.DataFrame, dict]:
+    """
+    `rechazar(paso, filas_rechazadas, motivos, evaluadas)`, si se pasa, recibe
+    las identificaciones inválidas y los duplicados descartados (ver comun/cuarentena.py).
+    """
     reporte = {
         'total_registros': len(df),
         'identificaciones_invalidas': 0,
@@ -105,15 +134,6 @@ def validar_identificaciones_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame,
         df['identificacion'] = df['identificacion'].astype(str).str.strip().fillna('')
         df['tipo_documento'] = df['tipo_documento'].astype(str).str.strip().fillna('')
 
-        def es_identificacion_valida(ident) -> bool:
-            try:
-                ident = str(ident).strip()
-                if not ident or pd.isna(ident):
-                    return False
-                return re.fullmatch(r"\d{6,15}", ident) is not None and not re.fullmatch(r"0+", ident)
-            except Exception:
-                return False
-
         def evaluar_calidad_registro(row: pd.Series) -> int:
             puntaje = 0
             nombres = str(row.get('nombres', '')).strip()
@@ -138,6 +158,8 @@ def validar_identificaciones_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame,
         df_validas = df[mascara_validas].copy()
         df_invalidas = df[~mascara_validas]
         reporte['identificaciones_invalidas'] = len(df_invalidas)
+        if rechazar:
+            rechazar(PASO, df_invalidas, df_invalidas['identificacion'].map(motivo_identificacion), len(df))
 
         if not df_validas.empty:
             df_validas['id_combinado'] = (
@@ -149,13 +171,14 @@ def validar_identificaciones_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame,
             duplicados = df_validas.duplicated(subset='id_combinado', keep=False)
             reporte['duplicados_eliminados'] = duplicados.sum() - df_validas['id_combinado'].nunique()
 
-            df_final = df_validas.sort_values(
+            ordenadas = df_validas.sort_values(
                 by=['id_combinado', 'calidad'],
                 ascending=[True, False]
-            ).drop_duplicates(
-                subset='id_combinado',
-                keep='first'
-            ).drop(columns=['id_combinado', 'calidad'])
+            )
+            repetidas = ordenadas.duplicated(subset='id_combinado', keep='first')
+            df_final = ordenadas[~repetidas].drop(columns=['id_combinado', 'calidad'])
+            if rechazar:
+                rechazar(PASO, ordenadas[repetidas].drop(columns=['id_combinado', 'calidad']), MOTIVO_DUPLICADO, 0)
 
             reporte['registros_validos'] = len(df_final)
             return df_final, reporte
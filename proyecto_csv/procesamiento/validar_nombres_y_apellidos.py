@@ -1,8 +1,13 @@
+import os
+import sys
 import pandas as pd
 import re
 from typing import Optional, Tuple
 import logging
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from comun.nombres import CORTO, PALABRA_INVALIDA, SIN_LETRAS, VACIO, VALIDO
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,7 +47,25 @@ def normalizar_nombre_o_apellido(campo: str) -> Optional[str]:
 
     return campo if campo else None
 
-def validar_nombres_y_apellidos_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, dict]:
+def motivo_nombre_o_apellido(campo) -> str:
+    """Código de motivo (comun/nombres.py) por el que normalizar_nombre_o_apellido descarta `campo`."""
+    if pd.isna(campo) or not isinstance(campo, str):
+        return VACIO
+    campo = limpiar_basura(campo.strip().lower())
+    if not campo:
+        return VACIO
+    if campo in PALABRAS_INVALIDAS:
+        return PALABRA_INVALIDA
+    letras = len(re.sub(r'[^A-Za-zÁÉÍÓÚáéíóúÑñüÜ]', '', campo))
+    if letras == 0:
+        return SIN_LETRAS
+    return CORTO if letras < 2 else VALIDO
+
+def validar_nombres_y_apellidos_dataframe(df: pd.DataFrame, rechazar=None) -> Tuple[pd.DataFrame, dict]:
+    """
+    `rechazar(paso, filas_rechazadas, motivos, evaluadas)`, si se pasa, recibe
+    las filas descartadas por el nombre, con los valores originales (ver comun/cuarentena.py).
+    """
     reporte = {
         'total_registros': len(df),
         'nombres_invalidos': 0,
@@ -81,6 +104,14 @@ def validar_nombres_y_apellidos_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFram
         df_validos = df[df['nombres'].notna()].copy()
         reporte['registros_validos'] = len(df_validos)
 
+        if rechazar:
+            descartados = df['nombres'].isna()
+            df_descartados = df[descartados].copy()
+            df_descartados['nombres'] = nombres_originales[descartados]
+            df_descartados['apellidos'] = apellidos_originales[descartados] if col_apellidos else None
+            motivos = 'nombres:' + nombres_originales[descartados].map(motivo_nombre_o_apellido)
+            rechazar('nombres', df_descartados, motivos, len(df))
+
         return df_validos, reporte
 
     except Exception as e:
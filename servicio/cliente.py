@@ -0,0 +1,74 @@
+"""
+Cliente del servicio local (servidor.py), para llamarlo desde otros scripts
+o desde la terminal:
+
+    python cliente.py json entrada/x.csv [--subir] [--no-esperar] [--opcion gzip=1 ...]
+    python cliente.py estado
+
+Por defecto se envía la ruta (el servicio lee el archivo del disco); con
+--subir el CSV viaja en el cuerpo de la petición, para archivos que el
+servicio no puede ver.
+"""
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+from servidor import HOST, PUERTO
+from trabajos import TIPOS
+
+def _pedir(peticion):
+    try:
+        with urllib.request.urlopen(peticion) as respuesta:
+            return respuesta.status, json.load(respuesta)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+def enviar(tipo, ruta, subir=False, esperar=True, puerto=PUERTO, **opciones):
+    """Envía un trabajo; devuelve (código HTTP, trabajo o error)."""
+    parametros = dict(opciones, esperar=int(esperar))
+    if not subir:
+        parametros["ruta"] = os.path.abspath(ruta)
+        peticion = urllib.request.Request(f"http://{HOST}:{puerto}/trabajos/{tipo}?{urlencode(parametros)}",
+                                          method="POST")
+        return _pedir(peticion)
+    parametros["nombre"] = os.path.basename(ruta)
+    with open(ruta, "rb") as f:
+        # urllib envía el archivo de a bloques, sin cargarlo completo en memoria
+        peticion = urllib.request.Request(f"http://{HOST}:{puerto}/trabajos/{tipo}?{urlencode(parametros)}",
+                                          data=f, method="POST",
+                                          headers={"Content-Length": str(os.path.getsize(ruta)),
+                                                   "Content-Type": "text/csv"})
+        return _pedir(peticion)
+
+def consultar(camino, puerto=PUERTO):
+    """GET de `camino` ('estado' o 'trabajos/<id>'); devuelve (código HTTP, contenido)."""
+    return _pedir(urllib.request.Request(f"http://{HOST}:{puerto}/{camino}"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Envía trabajos al servicio local")
+    parser.add_argument("tipo", choices=TIPOS + ("estado",))
+    parser.add_argument("csv", nargs="?")
+    parser.add_argument("--subir", action="store_true", help="Envía el CSV en el cuerpo en vez de la ruta")
+    parser.add_argument("--no-esperar", action="store_true", help="Vuelve apenas el trabajo queda en cola")
+    parser.add_argument("--opcion", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="Opción del tipo (gzip=1, formato=ndjson, max_memoria=512M, ids=..., salida=...)")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    args = parser.parse_args()
+
+    if args.tipo == "estado":
+        codigo, contenido = consultar("estado", args.puerto)
+    else:
+        if not args.csv:
+            parser.error("Falta el CSV")
+        opciones = dict(opcion.split("=", 1) for opcion in args.opcion)
+        codigo, contenido = enviar(args.tipo, args.csv, args.subir, not args.no_esperar, args.puerto, **opciones)
+    print(json.dumps(contenido, ensure_ascii=False, indent=2))
+    if codigo >= 400:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Prueba local del servicio, sin nada corriendo de antes: arranca Servicio en
+un puerto libre, envía un trabajo de cada tipo (uno subiendo el CSV en el
+cuerpo) y dos 'limpiar' a la vez sobre archivos con el mismo nombre, y
+revisa /trabajos/<id> y /estado. También comprueba que un tipo con 0
+trabajadores queda no disponible (503) sin afectar a los demás.
+
+Los SQL y JSON van a una carpeta temporal; las salidas de 'limpiar' (con el
+id del trabajo en el nombre) se borran al terminar.
+
+Uso: python probar_servicio.py
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import trabajos
+from cliente import consultar, enviar
+from servidor import HOST, Manejador, Servicio, parsear_trabajadores
+
+TRABAJADORES = {"limpiar": 2, "inserts": 1, "json": 1}
+ESPERA_MAXIMA = 120     # Segundos por trabajo antes de darlo por colgado
+
+DATOS = """tipo_documento;identificacion;nombres;apellidos
+CC;123456789;Juan;Perez
+CC;123456789;Juan;Perez
+CC;98765432;María José;Núñez
+CC;12a45678;Luis;Diaz
+;;;
+CC;555555555;1234;Soto
+"""
+DATOS_INSERTS = """numDocumento,nomApellido
+1001,JUAN PEREZ GOMEZ
+1002,MARIA LOPEZ
+1003,1234
+1004,ANA RUIZ
+"""
+
+def escribir(ruta, texto):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(texto)
+    return ruta
+
+class ServicioDePrueba:
+    """Servicio + servidor HTTP en un puerto libre, en un hilo."""
+
+    def __init__(self, trabajadores):
+        self.servicio = Servicio(trabajadores)
+        self.servicio.calentar()
+        Manejador.servicio = self.servicio
+        self.servidor = ThreadingHTTPServer((HOST, 0), Manejador)
+        self.puerto = self.servidor.server_address[1]
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def cerrar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.servicio.cerrar()
+
+def esperar_trabajo(id_, puerto):
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while time.monotonic() < limite:
+        codigo, trabajo = consultar(f"trabajos/{id_}", puerto)
+        assert codigo == 200, f"❌ GET /trabajos/{id_}: {codigo} {trabajo}"
+        if trabajo["terminado"]:
+            return trabajo
+        time.sleep(0.1)
+    raise AssertionError(f"❌ El trabajo {id_} no terminó en {ESPERA_MAXIMA} s")
+
+def revisar_trabajo(trabajo, tipo):
+    assert trabajo["tipo"] == tipo, f"❌ Tipo {trabajo['tipo']!r}, se esperaba {tipo!r}"
+    assert trabajo["estado"] == "terminado", f"❌ [{tipo}] {trabajo['estado']}: {trabajo['error']}"
+    assert set(trabajo["tiempos"]) >= {"en_cola", "en_curso", "ejecucion", "total"}, trabajo["tiempos"]
+    for salida in trabajo["resultado"]["salidas"]:
+        assert os.path.isfile(salida), f"❌ [{tipo}] Falta la salida {salida}"
+
+def borrar_salidas(trabajos_hechos):
+    for trabajo in trabajos_hechos:
+        for salida in (trabajo.get("resultado") or {}).get("salidas", []):
+            for ruta in (salida, os.path.splitext(salida)[0] + "_metricas.json"):
+                if os.path.isfile(ruta):
+                    os.remove(ruta)
+
+def probar_tipos(carpeta):
+    entrada = escribir(os.path.join(carpeta, "datos.csv"), DATOS)
+    hechos, fallas = [], []
+    prueba = ServicioDePrueba(TRABAJADORES)
+    try:
+        puerto = prueba.puerto
+        pedidos = {
+            "limpiar": [dict(ruta=entrada)],
+            "inserts": [dict(ruta=escribir(os.path.join(carpeta, "terceros.csv"), DATOS_INSERTS),
+                             ids=escribir(os.path.join(carpeta, "ids.csv"), "identificacion\n1002\n"),
+                             salida=os.path.join(carpeta, "sql"))],
+            "json": [dict(ruta=entrada, salida=os.path.join(carpeta, "json")),
+                     dict(ruta=entrada, subir=True, gzip=1, salida=os.path.join(carpeta, "json"))],
+        }
+        for tipo, lista in pedidos.items():
+            if tipo in prueba.servicio.no_disponibles:
+                motivo = prueba.servicio.no_disponibles[tipo].strip().splitlines()[-1]
+                fallas.append(f"'{tipo}' no disponible: {motivo}")
+                codigo, _ = enviar(tipo, entrada, puerto=puerto)
+                assert codigo == 503, f"❌ Un tipo no disponible debe responder 503, no {codigo}"
+                continue
+            for pedido in lista:
+                pedido = dict(pedido)
+                codigo, trabajo = enviar(tipo, pedido.pop("ruta"), pedido.pop("subir", False), puerto=puerto,
+                                         **pedido)
+                hechos.append(trabajo)
+                assert codigo == 200, f"❌ [{tipo}] POST respondió {codigo}: {trabajo.get('error')}"
+                revisar_trabajo(trabajo, tipo)
+                _, consultado = consultar(f"trabajos/{trabajo['id']}", puerto)
+                assert consultado["estado"] == trabajo["estado"], consultado
+                print(f"✅ [{tipo}] {trabajo['id']}: {trabajo['tiempos']['en_curso']:.2f} s, "
+                      f"{len(trabajo['resultado']['salidas'])} salida(s)")
+
+        # Dos 'limpiar' a la vez con el mismo nombre de archivo: cada uno con sus salidas
+        if "limpiar" not in prueba.servicio.no_disponibles:
+            rutas = [escribir(os.path.join(carpeta, sub, "datos.csv"), DATOS) for sub in ("a", "b")]
+            ids = []
+            for ruta in rutas:
+                codigo, trabajo = enviar("limpiar", ruta, esperar=False, puerto=puerto)
+                assert codigo == 202, f"❌ POST sin esperar respondió {codigo}"
+                ids.append(trabajo["id"])
+            simultaneos = [esperar_trabajo(id_, puerto) for id_ in ids]
+            hechos.extend(simultaneos)
+            for trabajo in simultaneos:
+                revisar_trabajo(trabajo, "limpiar")
+            primero, segundo = (set(t["resultado"]["salidas"]) for t in simultaneos)
+            assert not primero & segundo, f"❌ Dos trabajos comparten salidas: {primero & segundo}"
+            print("✅ [limpiar] dos trabajos simultáneos sobre datos.csv, con salidas separadas")
+
+        codigo, estado = consultar("estado", puerto)
+        assert codigo == 200 and estado["en_cola"] == 0, estado
+        for tipo, info in estado["tipos"].items():
+            assert info["disponible"] == (tipo not in prueba.servicio.no_disponibles), info
+            esperados = sum(t["tipo"] == tipo for t in hechos)
+            assert info["terminados"] == esperados and not info["fallidos"] and not info["en_curso"], (tipo, info)
+        print(f"✅ /estado: {sum(t['terminados'] for t in estado['tipos'].values())} trabajos terminados")
+    finally:
+        prueba.cerrar()
+        borrar_salidas(hechos)
+    return fallas
+
+def probar_desactivado():
+    assert parsear_trabajadores("inserts=0,json=2") == {"inserts": 0, "json": 2}
+    prueba = ServicioDePrueba({tipo: 0 for tipo in trabajos.TIPOS})
+    try:
+        codigo, respuesta = enviar("json", __file__, puerto=prueba.puerto)
+        assert codigo == 503 and "no está disponible" in respuesta["error"], (codigo, respuesta)
+        _, estado = consultar("estado", prueba.puerto)
+        assert not any(info["disponible"] for info in estado["tipos"].values()), estado
+    finally:
+        prueba.cerrar()
+    print("✅ Tipos con 0 trabajadores: no disponibles y responden 503")
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="probar_servicio_")
+    try:
+        fallas = probar_tipos(carpeta)
+        probar_desactivado()
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+    if fallas:
+        raise AssertionError("❌ " + "; ".join(fallas))
+    print("🎉 Servicio probado")
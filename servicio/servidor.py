@@ -0,0 +1,339 @@
+"""
+Servicio local que mantiene calientes las herramientas del repositorio
+(intérprete, pandas, chardet, módulos y listas de ids ya cargados) para no
+pagar el arranque en cada archivo:
+
+    python servidor.py [--puerto 8765] [--trabajadores limpiar=1,inserts=1,json=2]
+
+Con TIPO=0 ese tipo no se arranca. Si un tipo no se puede calentar (p. ej.
+su módulo no importa con esta versión de Python) queda no disponible y los
+demás siguen funcionando.
+
+API HTTP en 127.0.0.1 (respuestas JSON):
+
+    POST /trabajos/<tipo>?ruta=/datos/x.csv    CSV ya en disco
+    POST /trabajos/<tipo>?nombre=x.csv         el CSV va en el cuerpo (Content-Length)
+         ...&esperar=1                         responde al terminar en vez de 202
+         ...&gzip=1&formato=ndjson&max_memoria=512M&ids=...&salida=...   opciones del tipo
+    GET  /trabajos/<id>                        estado, tiempos y resultado de un trabajo
+    GET  /estado                               profundidad de cola, en curso y tiempos por tipo
+
+Tipos: limpiar (proyecto_csv), inserts (insertar) y json (convertir_csv_a_json).
+Cada tipo tiene su pool de procesos y una cola acotada: con la cola llena
+se responde 503 para que quien llama reintente más tarde. Un tipo no
+disponible también responde 503, con el motivo.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import trabajos
+
+HOST = "127.0.0.1"
+PUERTO = 8765
+TRABAJADORES = {"limpiar": 1, "inserts": 1, "json": 2}   # Procesos (trabajos a la vez) por tipo
+MAX_EN_COLA = 32                # Trabajos esperando por tipo antes de responder 503
+MAX_HISTORIAL = 1000            # Trabajos terminados que se recuerdan para GET /trabajos/<id>
+CARPETA_RECIBIDOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recibidos")
+BLOQUE_CUERPO = 1024 * 1024
+OPCIONES_SERVICIO = ("ruta", "nombre", "esperar")
+
+class Servicio:
+    """Colas, pools de procesos y registro de trabajos; independiente de HTTP."""
+
+    def __init__(self, trabajadores=None, max_en_cola=MAX_EN_COLA):
+        self.trabajadores = dict(TRABAJADORES, **(trabajadores or {}))
+        self.trabajos = OrderedDict()
+        self._terminados = {}   # id -> Event que se activa al terminar
+        self._bloqueo = threading.Lock()
+        self._ids = itertools.count(1)
+        self._prefijo = time.strftime("%Y%m%d%H%M%S")
+        self._contexto = multiprocessing.get_context("spawn")
+        self.colas = {tipo: queue.Queue(maxsize=max_en_cola) for tipo in trabajos.TIPOS}
+        self.no_disponibles = {tipo: "desactivado (0 trabajadores)"
+                               for tipo, cantidad in self.trabajadores.items() if not cantidad}
+        self.pools = {tipo: self._crear_pool(tipo) for tipo in trabajos.TIPOS if tipo not in self.no_disponibles}
+        for tipo, cantidad in self.trabajadores.items():
+            for _ in range(cantidad):
+                threading.Thread(target=self._despachar, args=(tipo,), name=f"despacho {tipo}", daemon=True).start()
+
+    def _crear_pool(self, tipo):
+        return ProcessPoolExecutor(max_workers=self.trabajadores[tipo], mp_context=self._contexto,
+                                   initializer=trabajos.calentar, initargs=(tipo,))
+
+    def calentar(self):
+        """
+        Arranca todos los procesos ahora, para que el primer trabajo no pague la
+        importación. Un tipo que no se puede calentar queda en `no_disponibles`
+        con el motivo; los demás siguen.
+        """
+        inicio = time.perf_counter()
+        futuros = {tipo: [pool.submit(trabajos.listo) for _ in range(self.trabajadores[tipo])]
+                   for tipo, pool in self.pools.items()}
+        for tipo, pendientes in futuros.items():
+            try:
+                for futuro in pendientes:
+                    futuro.result()
+            except Exception as error:
+                motivo = str(error) or type(error).__name__
+                self._desactivar(tipo, motivo)
+                print(f"⚠️  '{tipo}' no disponible: {motivo.strip().splitlines()[-1]}", flush=True)
+        print(f"🔥 Procesos listos en {time.perf_counter() - inicio:.1f} s "
+              f"({', '.join(self.pools) or 'ningún tipo disponible'})", flush=True)
+
+    def _desactivar(self, tipo, motivo):
+        with self._bloqueo:
+            self.no_disponibles[tipo] = motivo
+            pool = self.pools.pop(tipo, None)
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def encolar(self, tipo, ruta, opciones, recibido=None):
+        """
+        Registra el trabajo y lo deja en la cola de `tipo`; `recibido` es la
+        carpeta temporal del cuerpo subido, que se borra al terminar. Lanza
+        queue.Full si la cola está llena y ValueError si el tipo no está disponible.
+        """
+        if tipo in self.no_disponibles:
+            raise ValueError(f"'{tipo}' no está disponible: {self.no_disponibles[tipo]}")
+        trabajo = {
+            "id": f"{self._prefijo}-{next(self._ids)}",
+            "tipo": tipo,
+            "ruta": ruta,
+            "opciones": opciones,
+            "estado": "en_cola",
+            "recibido": time.time(),
+            "iniciado": None,
+            "terminado": None,
+            "tiempos": {},
+            "resultado": None,
+            "error": None,
+        }
+        with self._bloqueo:
+            self.trabajos[trabajo["id"]] = trabajo
+            self._terminados[trabajo["id"]] = threading.Event()
+        try:
+            self.colas[tipo].put_nowait((trabajo, recibido))
+        except queue.Full:
+            with self._bloqueo:
+                del self.trabajos[trabajo["id"]], self._terminados[trabajo["id"]]
+            raise
+        return trabajo
+
+    def esperar(self, trabajo, tiempo=None):
+        """Espera a que `trabajo` termine (o `tiempo` segundos); devuelve si terminó."""
+        terminado = self._terminados.get(trabajo["id"])
+        return terminado is None or terminado.wait(tiempo)
+
+    def _despachar(self, tipo):
+        # Un hilo por proceso del pool: el trabajo pasa a "en_curso" cuando hay un proceso libre para él
+        while True:
+            trabajo, recibido = self.colas[tipo].get()
+            trabajo["estado"] = "en_curso"
+            trabajo["iniciado"] = time.time()
+            pool = self.pools[tipo]
+            try:
+                resultado = pool.submit(trabajos.ejecutar, tipo, trabajo["id"], trabajo["ruta"],
+                                        trabajo["opciones"]).result()
+                trabajo["resultado"] = resultado
+                trabajo["estado"] = "terminado" if resultado["ok"] else "fallido"
+                trabajo["error"] = resultado.get("error")
+            except BrokenProcessPool:
+                # Un proceso murió (memoria, señal...): se reemplaza el pool del tipo
+                trabajo["estado"], trabajo["error"] = "fallido", traceback.format_exc()
+                with self._bloqueo:
+                    if self.pools.get(tipo) is pool:
+                        self.pools[tipo] = self._crear_pool(tipo)
+            except Exception:
+                trabajo["estado"], trabajo["error"] = "fallido", traceback.format_exc()
+            finally:
+                trabajo["terminado"] = time.time()
+                self._medir(trabajo)
+                if recibido:
+                    shutil.rmtree(recibido, ignore_errors=True)
+                self._terminados[trabajo["id"]].set()
+                self._podar()
+                self.colas[tipo].task_done()
+            self._registrar(trabajo)
+
+    def _medir(self, trabajo):
+        tiempos = {"en_cola": trabajo["iniciado"] - trabajo["recibido"],
+                   "total": trabajo["terminado"] - trabajo["recibido"]}
+        resultado = trabajo["resultado"]
+        if resultado:
+            # Medido dentro del trabajador; la diferencia con "en_curso" es el envío entre procesos
+            tiempos["ejecucion"] = resultado["fin"] - resultado["inicio"]
+        tiempos["en_curso"] = trabajo["terminado"] - trabajo["iniciado"]
+        trabajo["tiempos"] = {clave: round(valor, 3) for clave, valor in tiempos.items()}
+
+    def _registrar(self, trabajo):
+        icono = "✅" if trabajo["estado"] == "terminado" else "❌"
+        tiempos = trabajo["tiempos"]
+        print(f"{icono} [{trabajo['tipo']}] {trabajo['id']} {os.path.basename(trabajo['ruta'])}: "
+              f"{tiempos['en_curso']:.2f} s (en cola {tiempos['en_cola']:.2f} s)", flush=True)
+
+    def _podar(self):
+        with self._bloqueo:
+            terminados = [id_ for id_, t in self.trabajos.items() if t["terminado"]]
+            for id_ in terminados[:max(0, len(terminados) - MAX_HISTORIAL)]:
+                del self.trabajos[id_], self._terminados[id_]
+
+    def estado(self):
+        """Por tipo: en cola, en curso, terminados, fallidos y tiempos (promedio y máximo) de lo recordado."""
+        with self._bloqueo:
+            registrados = list(self.trabajos.values())
+        por_tipo = {}
+        for tipo in trabajos.TIPOS:
+            propios = [t for t in registrados if t["tipo"] == tipo]
+            hechos = [t for t in propios if t["terminado"]]
+            tiempos = {}
+            for clave in ("en_cola", "en_curso", "total"):
+                valores = [t["tiempos"][clave] for t in hechos]
+                if valores:
+                    tiempos[clave] = {"promedio": round(sum(valores) / len(valores), 3), "max": max(valores)}
+            por_tipo[tipo] = {
+                "disponible": tipo not in self.no_disponibles,
+                "motivo": self.no_disponibles.get(tipo),
+                "trabajadores": self.trabajadores[tipo],
+                "en_cola": self.colas[tipo].qsize(),
+                "en_curso": sum(t["estado"] == "en_curso" for t in propios),
+                "terminados": sum(t["estado"] == "terminado" for t in hechos),
+                "fallidos": sum(t["estado"] == "fallido" for t in hechos),
+                "tiempos": tiempos,
+            }
+        return {"tipos": por_tipo, "en_cola": sum(t["en_cola"] for t in por_tipo.values())}
+
+    def cerrar(self):
+        for pool in list(self.pools.values()):
+            pool.shutdown(wait=False, cancel_futures=True)
+
+class Manejador(BaseHTTPRequestHandler):
+    servicio = None     # Lo asigna servir()
+
+    def _responder(self, codigo, contenido):
+        cuerpo = json.dumps(contenido, ensure_ascii=False, indent=2).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _error(self, codigo, mensaje):
+        self._responder(codigo, {"error": mensaje})
+
+    def do_GET(self):
+        partes = urlsplit(self.path).path.strip("/").split("/")
+        if partes == ["estado"]:
+            return self._responder(200, self.servicio.estado())
+        if len(partes) == 2 and partes[0] == "trabajos":
+            trabajo = self.servicio.trabajos.get(partes[1])
+            if trabajo is None:
+                return self._error(404, f"Trabajo no encontrado: {partes[1]}")
+            return self._responder(200, trabajo)
+        self._error(404, "Rutas: GET /estado, GET /trabajos/<id>, POST /trabajos/<tipo>")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        partes = url.path.strip("/").split("/")
+        if len(partes) != 2 or partes[0] != "trabajos" or partes[1] not in trabajos.TIPOS:
+            return self._error(404, f"Use POST /trabajos/<tipo>, con tipo en {', '.join(trabajos.TIPOS)}")
+        tipo = partes[1]
+        if tipo in self.servicio.no_disponibles:
+            return self._error(503, f"'{tipo}' no está disponible: {self.servicio.no_disponibles[tipo]}")
+        parametros = dict(parse_qsl(url.query))
+        opciones = {clave: valor for clave, valor in parametros.items() if clave not in OPCIONES_SERVICIO}
+
+        recibido = None
+        if parametros.get("ruta"):
+            ruta = os.path.abspath(parametros["ruta"])
+            if not os.path.isfile(ruta):
+                return self._error(400, f"No existe el archivo: {ruta}")
+        else:
+            nombre = os.path.basename(parametros.get("nombre", ""))
+            if not nombre.lower().endswith(".csv"):
+                return self._error(400, "Indique ?ruta=<csv en disco> o ?nombre=<archivo.csv> con el CSV en el cuerpo")
+            if "Content-Length" not in self.headers:
+                return self._error(411, "El cuerpo necesita Content-Length")
+            recibido, ruta = self._guardar_cuerpo(nombre, int(self.headers["Content-Length"]))
+
+        try:
+            trabajo = self.servicio.encolar(tipo, ruta, opciones, recibido)
+        except (queue.Full, ValueError) as error:
+            if recibido:
+                shutil.rmtree(recibido, ignore_errors=True)
+            return self._error(503, str(error) or f"Cola de '{tipo}' llena; reintente más tarde")
+
+        if parametros.get("esperar", "").lower() in trabajos.VERDADEROS:
+            self.servicio.esperar(trabajo)
+            return self._responder(200 if trabajo["estado"] == "terminado" else 500, trabajo)
+        self._responder(202, trabajo)
+
+    def _guardar_cuerpo(self, nombre, largo):
+        """Copia el cuerpo a recibidos/<carpeta única>/<nombre> de a BLOQUE_CUERPO bytes."""
+        os.makedirs(CARPETA_RECIBIDOS, exist_ok=True)
+        carpeta = os.path.join(CARPETA_RECIBIDOS, f"{time.time_ns()}_{threading.get_ident()}")
+        os.makedirs(carpeta)
+        ruta = os.path.join(carpeta, nombre)
+        with open(ruta, "wb") as f:
+            while largo > 0:
+                datos = self.rfile.read(min(BLOQUE_CUERPO, largo))
+                if not datos:
+                    break
+                f.write(datos)
+                largo -= len(datos)
+        return carpeta, ruta
+
+    def log_message(self, formato, *argumentos):
+        pass    # Cada trabajo ya deja su línea al terminar
+
+def parsear_trabajadores(texto):
+    """'limpiar=1,json=2,inserts=0' -> {'limpiar': 1, 'json': 2, 'inserts': 0} (0: tipo desactivado)"""
+    trabajadores = {}
+    for parte in filter(None, texto.split(",")):
+        tipo, _, cantidad = parte.partition("=")
+        if tipo not in trabajos.TIPOS or not cantidad.isdigit():
+            raise argparse.ArgumentTypeError(f"❌ Trabajadores no válidos: {parte!r} (ejemplo: json=2, inserts=0)")
+        trabajadores[tipo] = int(cantidad)
+    return trabajadores
+
+def servir(puerto=PUERTO, trabajadores=None, max_en_cola=MAX_EN_COLA):
+    servicio = Servicio(trabajadores, max_en_cola)
+    servicio.calentar()
+    Manejador.servicio = servicio
+    servidor = ThreadingHTTPServer((HOST, puerto), Manejador)
+    print(f"🚀 Servicio en http://{HOST}:{puerto} ({', '.join(f'{t}={n}' for t, n in servicio.trabajadores.items())})",
+          flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
+        print("👋 Servicio detenido", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local con las herramientas de CSV ya cargadas")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--trabajadores", type=parsear_trabajadores, default={}, metavar="TIPO=N,...",
+                        help=f"Procesos por tipo, 0 lo desactiva "
+                             f"(por defecto {', '.join(f'{t}={n}' for t, n in TRABAJADORES.items())})")
+    parser.add_argument("--max-en-cola", type=int, default=MAX_EN_COLA,
+                        help="Trabajos que pueden esperar por tipo antes de rechazar con 503")
+    args = parser.parse_args()
+    servir(args.puerto, args.trabajadores, args.max_en_cola)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Trabajos del servicio (servidor.py). Cada tipo corre en sus propios procesos
+trabajadores, que se calientan una sola vez: entran a la carpeta de la
+herramienta (las carpetas relativas de salida funcionan como al correr su
+script) e importan su módulo, con pandas y chardet. Cada herramienta queda
+en procesos separados porque `procesador` es un módulo distinto en insertar/
+y en convertir_csv_a_json/.
+"""
+import os
+import sys
+import time
+import traceback
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(RAIZ)
+from comun.cuarentena import Cuarentena
+from comun.memoria import parsear_tamano
+
+# Tipo de trabajo -> carpeta de la herramienta
+CARPETAS = {
+    "limpiar": os.path.join(RAIZ, "proyecto_csv"),
+    "inserts": os.path.join(RAIZ, "insertar"),
+    "json": os.path.join(RAIZ, "convertir_csv_a_json"),
+}
+TIPOS = tuple(CARPETAS)
+ARCHIVO_IDS = "t_tercerotodoslosid.csv"   # Ids existentes para 'inserts' (relativo a insertar/, como main.py)
+CARPETA_SQL = "salida_sql"                # Cada archivo en su subcarpeta, para no pisarse entre trabajos
+VERDADEROS = ("1", "true", "si", "sí")
+
+_modulo = None      # Módulo de la herramienta, importado al calentar el proceso
+_error = None       # Traza si no se pudo calentar; la reporta `listo`
+_ids = {}           # ruta -> (mtime, tamaño, ids): la lista se relee solo si el archivo cambió
+
+def calentar(tipo):
+    """
+    Inicializador de cada proceso trabajador. Si falla (p. ej. el módulo no
+    importa con esta versión de Python) el error se guarda y lo lanza
+    `listo`: un error en el inicializador rompería el pool sin decir por qué.
+    """
+    global _modulo, _error
+    try:
+        carpeta = os.path.abspath(CARPETAS[tipo])
+        os.chdir(carpeta)
+        sys.path.insert(0, carpeta)
+        if tipo == "limpiar":
+            import ejecutar_pipeline as _modulo
+        elif tipo == "inserts":
+            import procesador as _modulo
+            if os.path.exists(ARCHIVO_IDS):
+                _cargar_ids(ARCHIVO_IDS)
+        else:
+            from procesador import conversion as _modulo
+    except Exception:
+        _error = traceback.format_exc()
+
+def listo():
+    """Trabajo vacío para arrancar (y calentar) los procesos al iniciar el servicio."""
+    if _error:
+        raise RuntimeError(f"No se pudo calentar el proceso:\n{_error}")
+    return os.getpid()
+
+def _cargar_ids(ruta):
+    ruta = os.path.abspath(ruta)
+    info = os.stat(ruta)
+    guardado = _ids.get(ruta)
+    if guardado is None or guardado[:2] != (info.st_mtime_ns, info.st_size):
+        _ids[ruta] = (info.st_mtime_ns, info.st_size, _modulo.cargar_ids_existentes(ruta))
+    return _ids[ruta][2]
+
+def _limpiar(trabajo, ruta, opciones, inicio):
+    max_memoria = parsear_tamano(opciones["max_memoria"]) if opciones.get("max_memoria") else None
+    cuarentena = Cuarentena(os.path.join(_modulo.CUARENTENA_DIR, f"cuarentena_{trabajo}.csv"))
+    # El id del trabajo en los nombres: dos trabajos a la vez con el mismo archivo no se pisan
+    etiqueta = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(inicio))}_{trabajo}"
+    try:
+        salida = _modulo.procesar_archivo(ruta, max_memoria, cuarentena, etiqueta)
+    finally:
+        metricas = cuarentena.cerrar()
+        # La copia del original en memoria/ solo sirve durante la corrida (el script la borra al final)
+        copia, _ = _modulo.rutas_archivo(ruta, etiqueta)
+        if os.path.exists(copia):
+            os.remove(copia)
+    salidas = [salida] if salida else []
+    return {"ok": bool(salida), "salidas": salidas + [cuarentena.ruta], "detalle": {"cuarentena": metricas}}
+
+def _inserts(trabajo, ruta, opciones, inicio):
+    archivo_ids = opciones.get("ids") or ARCHIVO_IDS
+    carpeta = opciones.get("salida") or os.path.join(CARPETA_SQL, os.path.splitext(os.path.basename(ruta))[0])
+    archivos = _modulo.generar_sql_desde_csv_condicional(ruta, archivo_ids, carpeta,
+                                                         ids_existentes=_cargar_ids(archivo_ids))
+    return {"ok": True, "salidas": archivos + [os.path.join(carpeta, "cuarentena.csv")],
+            "detalle": {"ids_existentes": len(_cargar_ids(archivo_ids))}}
+
+def _json(trabajo, ruta, opciones, inicio):
+    carpetas = _modulo.CARPETAS_SALIDA
+    if opciones.get("salida"):
+        # Misma estructura (una subcarpeta por encoding) bajo la carpeta pedida
+        carpetas = {encoding: os.path.join(opciones["salida"], os.path.basename(carpeta))
+                    for encoding, carpeta in carpetas.items()}
+    for carpeta in carpetas.values():
+        os.makedirs(carpeta, exist_ok=True)
+    max_memoria = parsear_tamano(opciones["max_memoria"]) if opciones.get("max_memoria") else None
+    resumen = _modulo.convertir_archivo(ruta, opciones.get("formato", "json"),
+                                        opciones.get("gzip", "").lower() in VERDADEROS,
+                                        int(opciones.get("tamano_bloque", 100000)), carpetas, max_memoria)
+    return {"ok": not resumen["error"], "salidas": resumen["salidas"], "error": resumen["error"],
+            "detalle": {clave: resumen[clave] for clave in ("filas", "bytes_entrada", "bytes_salida")}}
+
+_EJECUTORES = {"limpiar": _limpiar, "inserts": _inserts, "json": _json}
+
+def ejecutar(tipo, trabajo, ruta, opciones):
+    """
+    Corre el trabajo `trabajo` (su id) sobre el CSV `ruta` en el proceso ya
+    calentado. Devuelve ok, las rutas absolutas de las salidas, un detalle
+    por tipo y el inicio/fin (epoch) medidos en el trabajador.
+    """
+    listo()
+    inicio = time.time()
+    resultado = _EJECUTORES[tipo](trabajo, ruta, opciones, inicio)
+    resultado["salidas"] = [os.path.abspath(salida) for salida in resultado["salidas"]]
+    resultado.update(inicio=inicio, fin=time.time(), pid=os.getpid())
+    return resultado